@@ -0,0 +1,269 @@
+import warnings
+from typing import Callable, Dict, List
+import pandas as pd
+import numpy as np
+from index_cumule import IndexCumule
+from memoire import en_float64
+from sequences import Sequences
+import extremes_maree
+from periodes import fenetres_table
+import code_indicateurs_meteo as meteo
+
+# constantes houle
+RHO = 1025   # densité de l’eau (kg/m³)
+G = 9.81     # gravité (m/s²)
+
+UN_NS = np.timedelta64(1, "ns")
+UN_JOUR = np.timedelta64(1, "D")
+
+
+class _Contexte:
+    """
+    Évalue les indicateurs demandés sur un ensemble de fenêtres.
+    Chaque indicateur (ou intermédiaire, nom commençant par "_") est calculé
+    au plus une fois, à la première demande, pour toutes les fenêtres à la fois.
+    """
+
+    def __init__(self, registre: Dict[str, Callable], donnees, debuts: np.ndarray, fins: np.ndarray):
+        self.registre = registre
+        self.donnees = donnees
+        self.d = debuts
+        self.f = fins
+        self._valeurs: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, nom: str) -> np.ndarray:
+        if nom not in self._valeurs:
+            self._valeurs[nom] = self.registre[nom](self)
+        return self._valeurs[nom]
+
+
+def _balayer(registre: Dict[str, Callable], donnees, fenetres, indicateurs: List[str] = None) -> pd.DataFrame:
+    fen = fenetres_table(fenetres)
+    publics = [n for n in registre if not n.startswith("_")]
+    if indicateurs is None:
+        indicateurs = publics
+    inconnus = [n for n in indicateurs if n not in publics]
+    if inconnus:
+        raise ValueError(f"Indicateurs inconnus : {inconnus}. Disponibles : {publics}")
+
+    debuts = fen["debut"].to_numpy(dtype="datetime64[ns]")
+    fins = fen["fin"].to_numpy(dtype="datetime64[ns]")
+    ctx = _Contexte(registre, donnees, debuts, fins)
+    colonnes = {nom: ctx[nom] for nom in indicateurs}
+    return pd.concat([fen, pd.DataFrame(colonnes, index=fen.index)], axis=1)
+
+
+def _si_valeurs(n: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """x là où la fenêtre contient des valeurs, NaN sinon (comme `... if not p.empty else np.nan`)."""
+    return np.where(n > 0, x, np.nan)
+
+
+def _quantile_fenetres(ix: IndexCumule, d: np.ndarray, f: np.ndarray, q: float) -> np.ndarray:
+    """Quantile (interpolation linéaire, comme pandas) de chaque fenêtre, valeurs manquantes ignorées."""
+    i0, i1 = ix.bornes(d, f)
+    out = np.full(len(i0), np.nan)
+    for k, (a, b) in enumerate(zip(i0, i1)):
+        v = ix.valeurs[a:b]
+        v = v[~np.isnan(v)]
+        if len(v):
+            out[k] = np.quantile(v, q)
+    return out
+
+
+# -----------------------------
+# Houle (données horaires time/hs/t02/dp)
+# -----------------------------
+
+def indexer_houle(df: pd.DataFrame) -> Dict[str, IndexCumule]:
+    """Construit une fois les index cumulés de hs, t02 et dp, réutilisés pour toutes les fenêtres."""
+    serie = df.set_index("time")
+    return {
+        "hs": IndexCumule(serie["hs"]),
+        "t02": IndexCumule(serie["t02"]),
+        "dp": IndexCumule(serie["dp"], directions=True),
+    }
+
+
+def _hs_mediane(c: _Contexte) -> np.ndarray:
+    return _quantile_fenetres(c.donnees["hs"], c.d, c.f, 0.5)
+
+
+def _energie_moy(c: _Contexte) -> np.ndarray:
+    n = c.donnees["hs"].nb(c.d, c.f)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, c["energie_cumulee_Jm2"] / n, np.nan)
+
+
+def _ifm(c: _Contexte) -> np.ndarray:
+    e = c["energie_cumulee_Jm2"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(e > 0, np.log(e * (1 + c["jours_houle>3m"])), np.nan)
+
+
+def _indice_extreme(c: _Contexte) -> np.ndarray:
+    m = c["hs_moy"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(m > 0, c["hs_max"] / m, np.nan)
+
+
+def _pct_ouest(c: _Contexte) -> np.ndarray:
+    n = c["nb_points"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, c.donnees["dp"].nb_entre(240, 300, c.d, c.f) / n, np.nan)
+
+
+INDICATEURS_HOULE: Dict[str, Callable] = {
+    "nb_points": lambda c: c.donnees["hs"].nb_points(c.d, c.f),
+    "hs_moy": lambda c: c.donnees["hs"].moyenne(c.d, c.f),
+    "hs_max": lambda c: c.donnees["hs"].maximum(c.d, c.f),
+    "hs_mediane": _hs_mediane,
+    "t02_moy": lambda c: c.donnees["t02"].moyenne(c.d, c.f),
+    "t02_max": lambda c: c.donnees["t02"].maximum(c.d, c.f),
+    "energie_moy_Jm2": _energie_moy,
+    "energie_cumulee_Jm2": lambda c: (1 / 8) * RHO * G * c.donnees["hs"].somme_carres(c.d, c.f),
+    "jours_houle>3m": lambda c: c.donnees["hs"].nb_sup(3, c.d, c.f) / 24,
+    "jours_houle>4m": lambda c: c.donnees["hs"].nb_sup(4, c.d, c.f) / 24,
+    "%_houles_ouest": _pct_ouest,
+    "dir_moy_deg": lambda c: c.donnees["dp"].direction_moyenne(c.d, c.f),
+    "IFM": _ifm,
+    "indice_extreme": _indice_extreme,
+}
+
+
+def balayer_houle(df: pd.DataFrame, fenetres, indicateurs: List[str] = None, index: Dict[str, IndexCumule] = None) -> pd.DataFrame:
+    """
+    Indicateurs de houle (ceux de codeetatdemer.calcul_indicateurs) pour toutes
+    les fenêtres en un appel. hs_mediane est le seul calcul fenêtre par fenêtre.
+    """
+    if index is None:
+        index = indexer_houle(df)
+    return _balayer(INDICATEURS_HOULE, index, fenetres, indicateurs)
+
+
+# -----------------------------
+# Marée (hauteurs Date/Valeur)
+# -----------------------------
+
+def indexer_maree(df: pd.DataFrame) -> Dict[str, IndexCumule]:
+    """
+    Index cumulés construits une fois pour toutes les fenêtres :
+    hauteurs (horaires), marnages journaliers (max - min de chaque jour) et,
+    à partir des pleines/basses mers détectées (extremes_maree), marnage de
+    chaque marée, marnage journalier des marées et séquences de vives-eaux.
+    """
+    hauteur = en_float64(df.set_index("Date")["Valeur"])
+    daily = hauteur.resample("D").agg(["max", "min"])
+    marnage = (daily["max"] - daily["min"]).dropna()
+
+    tables = extremes_maree.tables_marees(hauteur)
+    jours = tables["jours"]
+    vive_eau = jours > extremes_maree.SEUIL_VIVE_EAU_M
+    if len(jours):
+        vive_eau = vive_eau.reindex(pd.date_range(jours.index.min(), jours.index.max(), freq="D"), fill_value=False)
+    return {
+        "hauteur": IndexCumule(hauteur),
+        "marnage": IndexCumule(marnage),
+        "marees": IndexCumule(tables["marees"]),
+        "marnage_marees": IndexCumule(jours),
+        "vive_eau": Sequences(vive_eau),
+    }
+
+
+def _marnage_partiel(hauteur: IndexCumule, debuts: np.ndarray, fins: np.ndarray):
+    """Marnage d'un jour tronqué par la fenêtre [debut, fin] ; NaN si aucun point."""
+    n = hauteur.nb(debuts, fins)
+    with np.errstate(invalid="ignore"):
+        m = hauteur.maximum(debuts, fins) - hauteur.minimum(debuts, fins)
+    return np.where(n > 0, m, np.nan)
+
+
+def _stats_marnage(c: _Contexte) -> Dict[str, np.ndarray]:
+    """
+    Les jours entièrement couverts viennent du marnage journalier précalculé ;
+    un jour coupé par une borne ne compte que ses points dans la fenêtre
+    (avec fin à minuit, le dernier jour se réduit au point de minuit).
+    """
+    hauteur, marnage = c.donnees["hauteur"], c.donnees["marnage"]
+    t0, t1 = c.d, c.f
+    j0 = t0.astype("datetime64[D]").astype("datetime64[ns]")
+    j0 = np.where(j0 < t0, j0 + UN_JOUR, j0)                                    # ceil(t0)
+    j1 = (t1 + UN_NS).astype("datetime64[D]").astype("datetime64[ns]")         # floor(t1 + 1 ns)
+    meme_jour = j0 > j1
+
+    # jour coupé au début (ou fenêtre incluse dans un seul jour), jour coupé à la fin
+    tete = _marnage_partiel(hauteur, t0, np.where(meme_jour, t1, j0 - UN_NS))
+    tete = np.where(meme_jour | (t0 < j0), tete, np.nan)
+    queue = _marnage_partiel(hauteur, j1, t1)
+    queue = np.where(~meme_jour & (j1 <= t1), queue, np.nan)
+
+    # jours complets [j0, j1[ (fenêtre vide si meme_jour)
+    fin_complets = np.where(meme_jour, j0 - UN_NS, j1 - UN_NS)
+    n, somme, somme2 = marnage.moments(j0, fin_complets)
+    partiels = np.vstack([tete, queue])
+    valide = ~np.isnan(partiels)
+    p0 = np.where(valide, partiels, 0.0)
+
+    n = n + valide.sum(axis=0)
+    somme = somme + p0.sum(axis=0)
+    somme2 = somme2 + (p0 ** 2).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # fenêtres sans aucun jour
+        maxi = np.nanmax(np.vstack([marnage.maximum(j0, fin_complets), partiels]), axis=0)
+        mini = np.nanmin(np.vstack([marnage.minimum(j0, fin_complets), partiels]), axis=0)
+        moy = np.where(n > 0, somme / n, np.nan)
+        std = np.where(n > 1, np.sqrt(np.maximum(somme2 - somme * somme / n, 0.0) / (n - 1)), np.nan)
+
+    n8 = marnage.nb_sup(8, j0, fin_complets) + (partiels > 8).sum(axis=0)
+    n9 = marnage.nb_sup(9, j0, fin_complets) + (partiels > 9).sum(axis=0)
+    return {"n": n.astype(np.int64), "moy": moy, "max": maxi, "min": mini, "std": std, "n8": n8, "n9": n9}
+
+
+INDICATEURS_MAREE: Dict[str, Callable] = {
+    "_stats": _stats_marnage,
+    "nb_points": lambda c: c.donnees["hauteur"].nb_points(c.d, c.f),
+    "jours_disponibles": lambda c: c["_stats"]["n"],
+    "marnage_moy_m": lambda c: c["_stats"]["moy"],
+    "marnage_max_m": lambda c: c["_stats"]["max"],
+    "marnage_min_m": lambda c: c["_stats"]["min"],
+    "marnage_std_m": lambda c: c["_stats"]["std"],
+    "jours_marnage>8m": lambda c: c["_stats"]["n8"],
+    "jours_marnage>9m": lambda c: c["_stats"]["n9"],
+    "IAI": lambda c: c["_stats"]["moy"] * c["_stats"]["n8"],
+
+    # marées détectées (pleine mer datée dans la fenêtre ; jours entiers)
+    "nb_marees": lambda c: c.donnees["marees"].nb(c.d, c.f),
+    "marnage_maree_moy_m": lambda c: c.donnees["marees"].moyenne(c.d, c.f),
+    "marnage_maree_max_m": lambda c: c.donnees["marees"].maximum(c.d, c.f),
+    "marees_marnage>8m": lambda c: c.donnees["marees"].nb_sup(extremes_maree.SEUIL_VIVE_EAU_M, c.d, c.f),
+    "jours_vive_eau": lambda c: c.donnees["marnage_marees"].nb_sup(extremes_maree.SEUIL_VIVE_EAU_M, c.d, c.f),
+    "episodes_vive_eau": lambda c: c.donnees["vive_eau"].nb_sequences(1, c.d, c.f),
+    "IAI_marees": lambda c: c["marnage_maree_moy_m"] * c["marees_marnage>8m"],
+    "IAI_vive_eau": lambda c: c.donnees["marnage_marees"].moyenne(c.d, c.f) * c["jours_vive_eau"],
+}
+
+
+def balayer_maree(df: pd.DataFrame, fenetres, indicateurs: List[str] = None, index: Dict[str, IndexCumule] = None) -> pd.DataFrame:
+    """Indicateurs de marnage (ceux de marnage.indicateurs) pour toutes les fenêtres en un appel."""
+    if index is None:
+        index = indexer_maree(df)
+    return _balayer(INDICATEURS_MAREE, index, fenetres, indicateurs)
+
+
+# -----------------------------
+# Météo (table journalière de resumer_journalier)
+# -----------------------------
+
+def balayer_meteo(daily: pd.DataFrame, fenetres, indicateurs: List[str] = None, donnees: meteo.DonneesMeteo = None) -> pd.DataFrame:
+    """
+    Indicateurs météo (ceux de code_indicateurs_meteo.indicateurs_periode)
+    pour toutes les fenêtres en un appel : mêmes définitions (INDICATEURS_PERIODE),
+    évaluées sur les index de `donnees` (construits une fois pour toutes les
+    fenêtres) ; seuls les quantiles relisent les jours de chaque fenêtre.
+    """
+    fen = fenetres_table(fenetres)
+    if donnees is None:
+        donnees = meteo.DonneesMeteo(daily)
+    i0 = daily.index.searchsorted(fen["debut"].to_numpy(dtype="datetime64[ns]"), side="left")
+    i1 = daily.index.searchsorted(fen["fin"].to_numpy(dtype="datetime64[ns]"), side="right")
+    colonnes = meteo.evaluer_fenetres(meteo.FenetresMeteo(donnees, i0, i1), indicateurs)
+    return pd.concat([fen, pd.DataFrame(colonnes, index=fen.index)], axis=1)
@@ -0,0 +1,185 @@
+import contextlib
+import io
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+import pandas as pd
+import numpy as np
+import code_indicateurs_meteo as meteo
+import codeetatdemer as houle
+import marnage
+import donnees_synthetiques
+from ingestion import fusion_dedoublonnee
+from periodes import PERIODES
+
+# Tailles mesurées, en années-station
+TAILLES = [1, 10, 100]
+# Chaque étape est chronométrée REPETITIONS fois (meilleur temps retenu),
+# puis relancée une fois sous tracemalloc pour le pic mémoire
+REPETITIONS = 3
+DOSSIER_DONNEES = Path(tempfile.gettempdir()) / "bdmoma_banc"
+SORTIE = Path("resultats_banc.json")
+REFERENCE = None  # fichier de résultats précédent à comparer (None = pas de comparaison)
+# Écart relatif de temps au-delà duquel une étape est signalée
+TOLERANCE = 0.15
+
+
+# -----------------------------
+# Étapes mesurées
+# -----------------------------
+
+def _etapes(fichiers: dict) -> Dict[str, Callable[[], int]]:
+    """
+    Étapes du pipeline, dans l'ordre ; chacune renvoie le nombre de lignes traitées.
+    Les entrées d'une étape sont produites une fois, hors chronométrage.
+    """
+    etat = {}
+
+    def lire_maree():
+        frames = [marnage.lire_fichier(f) for f in fichiers["maree"]]
+        etat["maree"] = fusion_dedoublonnee(frames, "Date", ("Source", marnage.PRIORITE_SOURCES)).reset_index(drop=True)
+        return len(etat["maree"])
+
+    def lire_meteo():
+        etat["meteo"] = fusion_dedoublonnee([meteo.lire_csv_meteo(f) for f in fichiers["meteo"]], station=meteo.COLONNE_POSTE)
+        return len(etat["meteo"])
+
+    def to_float_series():
+        if "brut" not in etat:
+            etat["brut"] = pd.concat([pd.read_csv(f, sep=";", usecols=["PMER"], dtype=str)["PMER"] for f in fichiers["meteo"]], ignore_index=True)
+        meteo._to_float_series(etat["brut"])
+        return len(etat["brut"])
+
+    def resumer_journalier():
+        etat["daily"] = meteo.resumer_journalier(etat["meteo"])
+        return len(etat["meteo"])
+
+    def indicateurs_periode():
+        daily = etat["daily"]
+        for a, b in PERIODES:
+            meteo.indicateurs_periode(daily, a, b)
+        return len(daily)
+
+    def indicateurs_maree():
+        df = etat["maree"]
+        index = marnage.indexer_maree(df)
+        for a, b in PERIODES:
+            marnage.indicateurs(df, a, b, index)
+        return len(df)
+
+    def lire_houle():
+        etat["houle"] = houle.lire_houle(fichiers["houle"])
+        return len(etat["houle"])
+
+    def indicateurs_houle():
+        df = etat["houle"]
+        houle.indicateurs_periodes(df, PERIODES)
+        return len(df)
+
+    return {
+        "marnage.lire_fichier": lire_maree,
+        "meteo.lire_csv_meteo": lire_meteo,
+        "meteo._to_float_series": to_float_series,
+        "meteo.resumer_journalier": resumer_journalier,
+        "meteo.indicateurs_periode": indicateurs_periode,
+        "marnage.indicateurs": indicateurs_maree,
+        "codeetatdemer.lire_houle": lire_houle,
+        "codeetatdemer.calcul_indicateurs": indicateurs_houle,
+    }
+
+
+def _mesurer(fonction: Callable[[], int], repetitions: int) -> dict:
+    durees = []
+    with contextlib.redirect_stdout(io.StringIO()):  # messages des lecteurs
+        for _ in range(repetitions):
+            t0 = time.perf_counter()
+            lignes = fonction()
+            durees.append(time.perf_counter() - t0)
+        tracemalloc.start()
+        try:
+            fonction()
+            _, pic = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    secondes = min(durees)
+    return {
+        "lignes": int(lignes),
+        "secondes": secondes,
+        "lignes_par_s": lignes / secondes if secondes > 0 else np.nan,
+        "pic_memoire_mo": pic / 2 ** 20,
+    }
+
+
+# -----------------------------
+# Campagne et comparaison
+# -----------------------------
+
+def executer(tailles: List[int] = TAILLES, repetitions: int = REPETITIONS, dossier: Path = DOSSIER_DONNEES) -> dict:
+    """
+    Génère (une fois, réutilisées ensuite) les données synthétiques de chaque
+    taille puis mesure toutes les étapes. Renvoie {"machine": ..., "resultats": [...]}.
+    """
+    resultats = []
+    for taille in tailles:
+        d = Path(dossier) / f"{taille}_ans"
+        if not (d / "termine").exists():
+            print(f"Génération des données synthétiques : {taille} années-station")
+            donnees_synthetiques.generer_tout(d, taille)
+            (d / "termine").touch()
+        fichiers = {
+            "maree": sorted((d / "maree").glob("*.txt")),
+            "meteo": sorted((d / "meteo").glob("*.csv")),
+            "houle": d / "houle" / "rejeu_rc.csv",
+        }
+        for etape, fonction in _etapes(fichiers).items():
+            mesure = {"etape": etape, "annees_station": taille, **_mesurer(fonction, repetitions)}
+            resultats.append(mesure)
+            print(f"{etape:<34} {taille:>4} ans  {mesure['secondes']:8.3f} s  "
+                  f"{mesure['lignes_par_s']:>12,.0f} lignes/s  {mesure['pic_memoire_mo']:8.1f} Mo")
+    return {
+        "machine": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "processeur": platform.processor() or platform.machine(),
+            "systeme": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "resultats": resultats,
+    }
+
+
+def comparer(campagne: dict, reference: dict, tolerance: float = TOLERANCE) -> pd.DataFrame:
+    """
+    Rapport temps/mémoire d'une campagne à une campagne de référence, par
+    (étape, taille) : ratios et statut (régression, amélioration, stable).
+    """
+    cles = ["etape", "annees_station"]
+    a = pd.DataFrame(campagne["resultats"]).set_index(cles)
+    b = pd.DataFrame(reference["resultats"]).set_index(cles)
+    res = a[["secondes", "pic_memoire_mo"]].join(b[["secondes", "pic_memoire_mo"]], rsuffix="_reference", how="inner")
+    res["ratio_temps"] = res["secondes"] / res["secondes_reference"]
+    res["ratio_memoire"] = res["pic_memoire_mo"] / res["pic_memoire_mo_reference"]
+    res["statut"] = np.select(
+        [res["ratio_temps"] > 1 + tolerance, res["ratio_temps"] < 1 - tolerance],
+        ["régression", "amélioration"], "stable",
+    )
+    return res.reset_index()
+
+
+def main():
+    campagne = executer(TAILLES, REPETITIONS, DOSSIER_DONNEES)
+    SORTIE.write_text(json.dumps(campagne, indent=1, ensure_ascii=False), encoding="utf-8")
+    print(f"Résultats écrits : {SORTIE}")
+
+    if REFERENCE is not None:
+        reference = json.loads(Path(REFERENCE).read_text(encoding="utf-8"))
+        print(comparer(campagne, reference).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
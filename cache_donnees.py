@@ -0,0 +1,147 @@
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+from pathlib import Path
+from typing import Callable, Optional
+import pandas as pd
+
+# Dossier par défaut du cache des fichiers sources déjà parsés
+DOSSIER_CACHE_DEFAUT = Path.home() / ".cache" / "bdmoma"
+
+# À incrémenter quand le parsing/nettoyage change : invalide toutes les entrées
+VERSION_CACHE = 4
+
+
+def _hash(*parties) -> str:
+    return hashlib.blake2b("|".join(str(p) for p in parties).encode(), digest_size=10).hexdigest()
+
+
+def _configuration(lecteur: Callable) -> str:
+    """
+    Valeurs courantes des constantes dont dépend le parsing du lecteur : noms
+    listés dans CONFIGURATION_LECTURE de son module ("NOM" pour une constante
+    du module, "module.NOM" sinon). Une constante modifiée change la clé des
+    entrées, qui sont alors relues.
+    """
+    module = importlib.import_module(lecteur.__module__)
+    valeurs = {}
+    for nom in getattr(module, "CONFIGURATION_LECTURE", ()):
+        source, _, attribut = nom.rpartition(".")
+        valeurs[nom] = getattr(importlib.import_module(source) if source else module, attribut)
+    return json.dumps(valeurs, sort_keys=True, default=str)
+
+
+def _hash_contenu(f: Path) -> str:
+    h = hashlib.blake2b(digest_size=10)
+    with open(f, "rb") as file:
+        for bloc in iter(lambda: file.read(1 << 20), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+class CacheColonnaire:
+    """
+    Cache disque (Parquet) des tables issues du parsing des fichiers sources.
+    - une entrée par (fichier, lecteur, configuration du lecteur), nommée
+      <chemin+lecteur+configuration>_<empreinte>.parquet (cf. _configuration)
+    - empreinte = taille + date de modification, ou hash du contenu (empreinte="contenu")
+    - une entrée dont l'empreinte ne correspond plus est supprimée à la réécriture
+    - taille totale plafonnée à taille_max_mo, éviction des entrées les moins récemment lues
+    Sans pyarrow, le cache est désactivé et les fichiers sont relus à chaque fois.
+    """
+
+    def __init__(self, dossier: Path = DOSSIER_CACHE_DEFAUT, taille_max_mo: float = 2048, empreinte: str = "mtime"):
+        if empreinte not in ("mtime", "contenu"):
+            raise ValueError(f"Empreinte inconnue : {empreinte}")
+        self.dossier = Path(dossier)
+        self.taille_max = int(taille_max_mo * 1024 * 1024)
+        self.empreinte = empreinte
+        self.actif = importlib.util.find_spec("pyarrow") is not None
+        if not self.actif:
+            print("pyarrow absent : cache des données désactivé")
+
+    def _entree(self, f: Path, lecteur: Callable) -> Path:
+        f = Path(f).resolve()
+        prefixe = _hash(f, lecteur.__module__, lecteur.__qualname__, _configuration(lecteur), VERSION_CACHE)
+        if self.empreinte == "contenu":
+            suffixe = _hash_contenu(f)
+        else:
+            st = f.stat()
+            suffixe = _hash(st.st_size, st.st_mtime_ns)
+        return self.dossier / f"{prefixe}_{suffixe}.parquet"
+
+    def lire(self, f: Path, lecteur: Callable[[Path], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Renvoie la table du fichier f : depuis le cache si l'entrée est à jour,
+        sinon via lecteur(f), puis l'enregistre.
+        """
+        if not self.actif:
+            return lecteur(f)
+
+        entree = self._entree(f, lecteur)
+        if entree.exists():
+            try:
+                df = pd.read_parquet(entree)
+                os.utime(entree)  # marque l'entrée comme récemment utilisée (LRU)
+                return df
+            except Exception as e:
+                print(f"Entrée de cache illisible ({entree.name}) : {e}")
+                entree.unlink(missing_ok=True)
+
+        df = lecteur(f)
+        self._ecrire(entree, df)
+        return df
+
+    def _ecrire(self, entree: Path, df: pd.DataFrame) -> None:
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        prefixe = entree.name.split("_")[0]
+        for ancienne in self.dossier.glob(f"{prefixe}_*.parquet"):
+            ancienne.unlink(missing_ok=True)  # version périmée du même fichier
+
+        tmp = entree.with_name(f"{entree.name}.{os.getpid()}.tmp")
+        try:
+            df.to_parquet(tmp)
+            os.replace(tmp, entree)
+        except Exception as e:
+            tmp.unlink(missing_ok=True)
+            print(f"Mise en cache impossible ({entree.name}) : {e}")
+            return
+        self.evincer()
+
+    def evincer(self) -> None:
+        """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale."""
+        entrees = []
+        for e in self.dossier.glob("*.parquet"):
+            try:
+                st = e.stat()
+            except FileNotFoundError:
+                continue
+            entrees.append((st.st_mtime, st.st_size, e))
+        total = sum(taille for _, taille, _ in entrees)
+        for _, taille, e in sorted(entrees, key=lambda x: x[0]):
+            if total <= self.taille_max:
+                break
+            e.unlink(missing_ok=True)
+            total -= taille
+
+    def vider(self) -> None:
+        for e in self.dossier.glob("*.parquet"):
+            e.unlink(missing_ok=True)
+
+
+def lecteur_avec_cache(lecteur: Callable[[Path], pd.DataFrame], cache: Optional[CacheColonnaire]) -> Callable[[Path], pd.DataFrame]:
+    """Enveloppe un lecteur de fichier pour passer par le cache (utilisable en multiprocessus)."""
+    if cache is None:
+        return lecteur
+    return _LecteurCache(lecteur, cache)
+
+
+class _LecteurCache:
+    def __init__(self, lecteur: Callable[[Path], pd.DataFrame], cache: CacheColonnaire):
+        self.lecteur = lecteur
+        self.cache = cache
+
+    def __call__(self, f: Path) -> pd.DataFrame:
+        return self.cache.lire(f, self.lecteur)
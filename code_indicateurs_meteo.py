@@ -1,22 +1,49 @@
 
 import re
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Callable, List, Tuple, Dict
 import pandas as pd
 import numpy as np
+from ingestion import lire_fichiers, fusion_dedoublonnee
+from cache_donnees import CacheColonnaire, lecteur_avec_cache
+from periodes import PERIODES
+from memoire import compacter, elargir
+from sequences import Sequences
+from index_cumule import IndexCumule, _cumul
+from instrumentation import etape
+import sorties
 
 # Dossier contenant les CSV Météo-France
 CHEMIN_DOSSIER = r"C:\Users\kweez\Documents\IMT\Projet command entreprise\Donnees\Donnees\data_MeteoFrance_horaire_observations_stat_Dieppe_1995_2022"
+# Classeur d'indicateurs (et ses .csv/.parquet), hors du dossier des CSV : un
+# .csv écrit parmi les données serait relu comme station à l'exécution suivante
+SORTIE = Path.home() / "Downloads" / "indicateurs_meteo.xlsx"
 
-# Périodes d'analyse 
-PERIODES: List[Tuple[str, str]] = [
-    ("1995-01-01", "2000-12-31"),
-    ("2001-01-01", "2008-12-31"),
-    ("2009-01-01", "2012-12-31"),
-    ("2013-01-01", "2015-12-31"),
-    ("2016-01-01", "2019-12-31"),
-    ("2020-01-01", "2022-12-31"),
-]
+# Lecture parallèle des CSV (1 = séquentiel, None = tous les cœurs)
+N_PROCESSUS = 1
+
+# Cache des CSV déjà parsés et nettoyés : CacheColonnaire() pour l'activer (None = désactivé)
+CACHE = None
+# Constantes du parsing, dans la clé des entrées du cache (cf. cache_donnees._configuration) :
+# colonnes lues par lire_csv_meteo_compact et seuil catégoriel de memoire.compacter
+CONFIGURATION_LECTURE = ["AGREGATION_JOURNALIERE", "memoire.RATIO_CATEGORIE"]
+
+# Représentation compacte (colonnes utiles seulement, float32, station en catégoriel)
+COMPACT = False
+
+# Jours de moins de couverture.MIN_HEURES_JOUR heures valides d'une variable mis à NaN
+# pour cette variable avant les indicateurs (cf. resumer_journalier)
+MASQUER_JOURS_SOUS_COUVERTS = False
+
+# Indicateurs calculés (noms de INDICATEURS_PERIODE ; None = tous)
+INDICATEURS = None
+
+# Fenêtres x jours rassemblés en une matrice (quantiles : cf. FenetresMeteo.par_longueur)
+MAX_VALEURS_LOT = 5_000_000
+
+# Identifiant de station des CSV (un fichier départemental mêle plusieurs postes) :
+# les heures en double sont cherchées par (poste, date)
+COLONNE_POSTE = "NUM_POSTE"
 
 # Seuils 
 PLUIE_JOUR_MM = 0.1
@@ -29,20 +56,12 @@ SEUIL_JOUR_TRES_CHAUD = 25.0
 
 
 
-def _to_float_series(s: pd.Series) -> pd.Series:
+def _reparer_nombres(s: pd.Series) -> pd.Series:
     """
-    Convertit une série de strings en float de manière robuste :
-    - remplace les virgules par des points
+    Conversion des chaînes mal formées (virgules déjà remplacées par des points) :
     - remplace les motifs "digit espace digit" par "digit.point.digit"
     - supprime les espaces parasites
     """
-    if s.dtype.kind in "biufc":
-        return s.astype(float)
-
-    s = s.astype(str)
-    # Remplacer les virgules en points
-    s = s.str.replace(",", ".", regex=False)
-
     # Motifs du style "5 5" ou "-0 7" => "5.5" / "-0.7"
     s = s.str.replace(r"(?<=\d)\s+(?=\d)", ".", regex=True)
     s = s.str.replace(r"(?<=-)\s+(?=\d)", "", regex=True)  # "- 1" -> "-1"
@@ -52,8 +71,48 @@ def _to_float_series(s: pd.Series) -> pd.Series:
     # Dernière tentative de conversion
     with np.errstate(all='ignore'):
         out = pd.to_numeric(s, errors="coerce")
+    return out.astype(float)
+
+def _to_float_series(s: pd.Series) -> pd.Series:
+    """
+    Convertit une série de strings en float de manière robuste :
+    - remplace les virgules par des points puis tente une conversion directe
+    - seules les valeurs encore invalides ("5 5", "- 1"...) passent par les
+      expressions régulières de _reparer_nombres
+    """
+    if s.dtype.kind in "biufc":
+        return s.astype(float)
+
+    s = s.astype(str)
+    # Remplacer les virgules en points
+    s = s.str.replace(",", ".", regex=False)
+    with np.errstate(all='ignore'):
+        out = pd.to_numeric(s, errors="coerce").astype(float)
+
+    echec = out.isna().to_numpy() & s.notna().to_numpy()
+    if echec.any():
+        out[echec] = _reparer_nombres(s[echec]).to_numpy()
     return out
 
+def _to_float_frame(df: pd.DataFrame, colonnes: List[str]) -> None:
+    """
+    Convertit en float (en place) les colonnes présentes parmi `colonnes`.
+    Les colonnes texte sont mises bout à bout et converties en une seule passe.
+    """
+    colonnes = [c for c in colonnes if c in df.columns]
+    textes = [c for c in colonnes if df[c].dtype.kind not in "biufc"]
+    for c in colonnes:
+        if c not in textes:
+            df[c] = df[c].astype(float)
+    if not textes:
+        return
+
+    n = len(df)
+    valeurs = pd.concat([df[c].astype(str) for c in textes], ignore_index=True)
+    conv = _to_float_series(valeurs).to_numpy()
+    for i, c in enumerate(textes):
+        df[c] = conv[i * n:(i + 1) * n]
+
 def _col(df: pd.DataFrame, candidates: List[str]) -> str:
     """Retourne le nom de la première colonne existante parmi candidates."""
     for c in candidates:
@@ -61,12 +120,19 @@ def _col(df: pd.DataFrame, candidates: List[str]) -> str:
             return c
     return None
 
-def lire_csv_meteo(path: Path) -> pd.DataFrame:
+def lire_csv_meteo(path: Path, colonnes: List[str] = None) -> pd.DataFrame:
     """
     Lit un CSV Météo-France avec séparateur ';' et parse la date.
     La colonne DATE est au format YYYYMMDDHH .
+    Si `colonnes` est fourni, seules ces colonnes (et la date) sont lues.
     """
-    df = pd.read_csv(path, sep=';', low_memory=False)
+    usecols = None
+    if colonnes is not None:
+        garder = set(colonnes) | {"DATE", "Date", "date"}
+        usecols = lambda c: c.strip() in garder
+    with etape("lecture", source="meteo", fichier=path.name) as e:
+        df = pd.read_csv(path, sep=';', low_memory=False, usecols=usecols)
+        e.lignes = len(df)
     # Normalisation noms colonnes 
     df.columns = [c.strip() for c in df.columns]
 
@@ -75,18 +141,19 @@ def lire_csv_meteo(path: Path) -> pd.DataFrame:
     if date_col is None:
         raise ValueError(f"Aucune colonne DATE trouvée dans {path.name}")
 
-    df[date_col] = df[date_col].astype(str).str.strip()
-    # Support YYYYMMDDHH ou YYYYMMDD
-    df["datetime"] = pd.to_datetime(df[date_col].str.slice(0, 10), format="%Y%m%d%H", errors="coerce")
-    # fallback si pas d'heure
-    mask_na = df["datetime"].isna()
-    if mask_na.any():
-        fallback = pd.to_datetime(df.loc[mask_na, date_col].str.slice(0, 8), format="%Y%m%d", errors="coerce")
-        df.loc[mask_na, "datetime"] = fallback
+    with etape("dates", source="meteo", fichier=path.name) as e:
+        df[date_col] = df[date_col].astype(str).str.strip()
+        # Support YYYYMMDDHH ou YYYYMMDD
+        df["datetime"] = pd.to_datetime(df[date_col].str.slice(0, 10), format="%Y%m%d%H", errors="coerce")
+        # fallback si pas d'heure
+        mask_na = df["datetime"].isna()
+        if mask_na.any():
+            fallback = pd.to_datetime(df.loc[mask_na, date_col].str.slice(0, 8), format="%Y%m%d", errors="coerce")
+            df.loc[mask_na, "datetime"] = fallback
 
-    # Index temps + colonne date
-    df["date"] = df["datetime"].dt.date
-    df = df.set_index("datetime").sort_index()
+        # Index temps
+        df = df.set_index("datetime").sort_index(kind="stable")
+        e.lignes = len(df)
 
     # Conversion robuste des variables utiles si présentes
     numeric_candidates = [
@@ -103,67 +170,86 @@ def lire_csv_meteo(path: Path) -> pd.DataFrame:
         # rayonnement
         "GLO","DIR","DIF","INS","UV"
     ]
-    for c in numeric_candidates:
-        if c in df.columns:
-            df[c] = _to_float_series(df[c])
+    with etape("nettoyage_numerique", source="meteo", fichier=path.name) as e:
+        _to_float_frame(df, numeric_candidates)
+        e.lignes = len(df)
 
     return df
 
-def charger_dossier(chemin_dossier: str) -> pd.DataFrame:
+def lire_csv_meteo_compact(path: Path) -> pd.DataFrame:
     """
-    Charge et concatène tous les CSV d'un dossier.
+    Version compacte de lire_csv_meteo : seules la station et les variables
+    agrégées par resumer_journalier sont lues, en float32 ; la station est catégorielle
+    et la date texte brute (redondante avec l'index) est retirée.
+    """
+    df = lire_csv_meteo(path, ["NUM_POSTE", "NOM_USUEL"] + list(AGREGATION_JOURNALIERE))
+    df = df.drop(columns=[c for c in ["DATE", "Date", "date"] if c in df.columns])
+    return compacter(df, categories=["NUM_POSTE", "NOM_USUEL"])
+
+def charger_dossier(chemin_dossier: str, n_processus: int = 1, cache: CacheColonnaire = None, compact: bool = False) -> pd.DataFrame:
+    """
+    Charge tous les CSV d'un dossier (en parallèle si n_processus > 1,
+    depuis le cache s'il est fourni) et fusionne les tables déjà triées par date.
+    Une heure d'un même poste présente dans plusieurs fichiers (extractions qui
+    se recouvrent) n'est gardée qu'une fois, depuis le premier fichier par
+    ordre de nom.
+    compact=True : lecture par lire_csv_meteo_compact.
     """
     p = Path(chemin_dossier)
     files = sorted(list(p.glob("*.csv")))
     if not files:
         raise FileNotFoundError(f"Aucun CSV trouvé dans {chemin_dossier}")
-    frames = []
-    for f in files:
-        try:
-            frames.append(lire_csv_meteo(f))
-        except Exception as e:
-            print(f"Fichier ignoré ({f.name}) : {e}")
-    df = pd.concat(frames, axis=0).sort_index()
+    lecteur = lire_csv_meteo_compact if compact else lire_csv_meteo
+    frames = [df for _, df in lire_fichiers(lecteur_avec_cache(lecteur, cache), files, n_processus)]
+    df = fusion_dedoublonnee(frames, station=COLONNE_POSTE)
     return df
 
 # -----------------------------
 # Calculs d'indicateurs
 # -----------------------------
 
-def resumer_journalier(df: pd.DataFrame) -> pd.DataFrame:
+# Agrégation journalière des variables horaires
+AGREGATION_JOURNALIERE: Dict[str, str] = {
+    "RR1": "sum",
+    # Températures
+    "TN": "min",
+    "TX": "max",
+    "T": "mean",    # moyenne journalière
+    # Vent
+    "FF": "mean",   # vent moyen journalier
+    "FXI": "max",   # rafale max du jour
+    "DD": "mean",   # direction moyenne du vent sur la journée
+    # Pression
+    "PMER": "mean",
+    "PMERMIN": "min",
+    # Humidité
+    "U": "mean",
+}
+
+def resumer_journalier(df: pd.DataFrame, masquer: bool = False) -> pd.DataFrame:
     """
     Agrège à J+1 :
     - RR1 : cumul/jour
     - TN/TX : min/max journaliers si existent, sinon à partir de T
     - Vent : moyennes & max rafales
     - Pression, humidité, rayonnement : moyennes
+    Une table compacte (float32) est d'abord repassée en float64 (memoire.elargir) :
+    cumuls et seuils identiques à ceux de la lecture complète.
+    masquer=True : chaque variable est mise à NaN les jours où sa série horaire
+    a moins de couverture.MIN_HEURES_JOUR heures valides (couverture.masquer_jours),
+    au lieu d'un cumul ou d'une moyenne sur quelques heures.
     """
-    # Création du dictionnaire d'agrégation
-    agg: Dict[str, str] = {}
-
-    agg["RR1"] = "sum"
-
-    # Températures
-    agg["TN"] = "min"
-    agg["TX"] = "max"
-    agg["T"] = "mean"  # moyenne journalière
-
-    # Vent
-    agg["FF"] = "mean"   # vent moyen journalier
-    agg["FXI"] = "max"   # rafale max du jour
-    agg["DD"] = "mean"   # direction moyenne du vent sur la journée
-
-    # Pression
-    agg["PMER"] = "mean"
-    agg["PMERMIN"] = "min"
-
-    # Humidité
-    agg["U"] = "mean"
-
-    daily = df.resample("D").agg(agg)
-
-    # Amplitude journalière
-    daily["AMPLI"] = daily["TX"] - daily["TN"]
+    with etape("resume_journalier", source="meteo") as e:
+        daily = elargir(df).resample("D").agg(AGREGATION_JOURNALIERE)
+        if masquer:
+            # import local : couverture importe ce module
+            import couverture
+            couvertures = {c: couverture.IndexCouverture(df[c]) for c in AGREGATION_JOURNALIERE if c in df.columns}
+            daily = couverture.masquer_jours(daily, couvertures)
+
+        # Amplitude journalière
+        daily["AMPLI"] = daily["TX"] - daily["TN"]
+        e.lignes = len(df)
 
     return daily
 
@@ -196,271 +282,493 @@ def vent_kmh(series: pd.Series) -> pd.Series:
         pass
     return s
 
-def indicateurs_periode(daily: pd.DataFrame, start: str, end: str) -> Dict[str, float]:
+# -----------------------------
+# Séries journalières indexées (partagées par toutes les fenêtres)
+# -----------------------------
+
+def _index(x: np.ndarray) -> IndexCumule:
+    """IndexCumule sur les positions des jours (fenêtres résolues en positions [i0, i1[)."""
+    return IndexCumule(pd.Series(x))
+
+def _sequences(m: np.ndarray) -> Sequences:
+    return Sequences(pd.Series(m))
+
+def _cumul_jours(x: np.ndarray, k: int) -> np.ndarray:
     """
-    Calcule les indicateurs sur la sous-période [start, end].
+    Cumul des k jours finissant à chaque jour, additionnés dans l'ordre des
+    jours, jours avant le début de la série comptés 0. Un cumul ne dépend que
+    de ses k jours : une fenêtre qui coupe les k - 1 premiers cumuls retrouve
+    la même somme en remplaçant par 0 les jours d'avant sa borne.
     """
-    period = daily.loc[start:end].copy()
-    out = {
-        "periode_debut": start,
-        "periode_fin": end,
-        "nb_jours": int(len(period)),
-    }
+    out = np.zeros(len(x))
+    for d in range(min(k, len(x)) - 1, -1, -1):
+        out[d:] = out[d:] + x[:len(x) - d]
+    return out
 
-    # PRECIPITATIONS
-    if "RR1" in period.columns:
-        pluie = period["RR1"].fillna(0)
-
-        # Cumul total sur la période
-        out["pluie_cum_mm"] = float(pluie.sum())
-
-        # Nombre de jours de pluie et forte pluie
-        out["jours_pluie"] = int((pluie > PLUIE_JOUR_MM).sum())
-        out["jours_forte_pluie"] = int((pluie > FORTE_PLUIE_JOUR_MM).sum())
-        out["max_pluie_jour"] = float(pluie.max())
-
-        # Nombre de séquences ≥3 jours avec pluie > 1 mm
-        pluie_bool = (pluie > 1).astype(int)
-        groupes = (pluie_bool != pluie_bool.shift()).cumsum()
-        longueurs = pluie_bool.groupby(groupes).sum()
-        out["nb_seq_pluie_3j"] = int((longueurs >= 3).sum())
-
-        # max_cum_pluie_5j — Cumul maximum sur 5 jours glissants
-        out["max_cum_pluie_5j"] = float(pluie.rolling(5, min_periods=1).sum().max())
-
-        # nb_seq_seche_10j — Nb séquences ≥10 jours sans pluie
-        seche = (pluie <= 1).astype(int)
-        grp_seche = (seche != seche.shift()).cumsum()
-        longueurs_seche = seche.groupby(grp_seche).sum()
-        out["nb_seq_seche_10j"] = int((longueurs_seche >= 10).sum())
-
-        # pluie_95p — 95e percentile des pluies journalières
-        out["pluie_95p"] = float(pluie.quantile(0.95))
-
-        # pluie_extreme_ratio — part de la pluie due aux 5 % de jours les plus pluvieux
-        top5 = pluie.quantile(0.95)
-        somme_top5 = pluie[pluie >= top5].sum()
-        out["pluie_extreme_ratio"] = float(somme_top5 / pluie.sum()) if pluie.sum() > 0 else np.nan
-
-    else:
-        out["pluie_cum_mm"] = np.nan
-        out["jours_pluie"] = np.nan
-        out["jours_forte_pluie"] = np.nan
-        out["max_pluie_jour"] = np.nan
-        out["nb_seq_pluie_3j"] = np.nan
-        out["max_cum_pluie_5j"] = np.nan
-        out["nb_seq_seche_10j"] = np.nan
-        out["pluie_95p"] = np.nan
-        out["pluie_extreme_ratio"] = np.nan
+def _veille(x: np.ndarray, remplissage) -> np.ndarray:
+    """Valeur de la veille (shift(1)), premier jour complété par `remplissage`."""
+    return np.r_[np.full(min(1, len(x)), remplissage, dtype=x.dtype), x[:-1]]
 
+def _au_jour(x: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """x[j], positions au-delà de la fin ramenées au dernier jour (valeur à masquer par l'appelant)."""
+    if not len(x):
+        return np.zeros(len(j), dtype=x.dtype)
+    return x[np.minimum(j, len(x) - 1)]
 
-    # TEMPERATURES
+def _sans_manquants(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Valeurs mesurées (comme dropna) et position, parmi elles, du premier jour mesuré à partir de chaque jour."""
+    valide = ~np.isnan(x)
+    return x[valide], _cumul(valide).astype(np.int64)
 
-    out["jours_gel"] = (
-        int((period["TN"] < 0).sum()) if "TN" in period.columns else np.nan
-    )
-    out["jours_tres_chauds"] = (
-        int((period["TX"] > SEUIL_JOUR_TRES_CHAUD).sum()) if "TX" in period.columns else np.nan
-    )
-    out["jours_gel_degel"] = cycles_gel_degel(period)
-
-    if "TN" in period.columns:
-        # Séquences de ≥3 jours consécutifs de gel
-        gel = (period["TN"] < 0).astype(int)
-        grp = (gel != gel.shift()).cumsum()
-        seq = gel.groupby(grp).sum()
-        out["nb_seq_gel_3j"] = int((seq >= 3).sum())
-        out["plus_longue_serie_gel_consecutif"] = int(seq.max())
-
-    else:
-        out["nb_seq_gel_3j"] = np.nan
-        out["plus_longue_serie_gel_consecutif"] = np.nan
-
-    if "TN" in period.columns and "TX" in period.columns:
-        # Cycles gel-dégel rapides : TN < 0 et TX > +5 °C
-        cond = (period["TN"] < 0) & (period["TX"] > 5)
-        out["nb_seq_gel_degel_rapide"] = int(cond.sum())
-    else:
-        out["nb_seq_gel_degel_rapide"] = np.nan
-
-    if "AMPLI" in period.columns:
-        # 95e percentile de l’amplitude thermique journalière
-        out["T_ampli_95p"] = float(period["AMPLI"].quantile(0.95))
-        # Nombre de jours avec amplitude > 10°C
-        out["nb_jours_ampli_sup_10"] = int((period["AMPLI"] > 10).sum())
-    else:
-        out["T_ampli_95p"] = np.nan
-        out["nb_jours_ampli_sup_10"] = np.nan
-
-    # VENT
-    if "FF" in period.columns:
-        ff_kmh = vent_kmh(period["FF"])
-        out["vent_moy_kmh"] = float(ff_kmh.mean(skipna=True))
-    else:
-        out["vent_moy_kmh"] = np.nan
-
-    
-    if "FXI" in period.columns:
-        fxi_kmh = vent_kmh(period["FXI"].fillna(0))
-
-        out["jours_vent_fort_60"] = int((fxi_kmh > VENT_FORT_KMH).sum())
-        out["jours_tempete_80"] = int((fxi_kmh > TEMPETE_KMH).sum())
-        out["rafale_max_kmh"] = float(fxi_kmh.max(skipna=True))
-
-        # Séquences de ≥2 jours consécutifs de tempête
-        temp = (fxi_kmh > 80).astype(int)
-        grp = (temp != temp.shift()).cumsum()
-        seq = temp.groupby(grp).sum()
-        out["nb_tempetes_consecutives"] = int((seq >= 2).sum())
-
-        out["plus_longue_serie_tempete_consecutive"] = int(seq.max())
-        out["max_rafale_3j"] = float(fxi_kmh.rolling(3, min_periods=1).max().max()) # Rafale maximale sur 3 jours glissants
-        out["energie_vent_cumulee"] = float((fxi_kmh ** 2).sum(skipna=True)) # Énergie mécanique cumulée (FXI²)
-
-    else:
-        out["jours_vent_fort_60"] = np.nan
-        out["jours_tempete_80"] = np.nan
-        out["rafale_max_kmh"] = np.nan
-        out["jours_tempete_80"] = np.nan
-        out["nb_tempetes_consecutives"] = np.nan
-        out["plus_longue_serie_tempete_consecutive"] = np.nan
-        out["max_rafale_3j"] = np.nan
-        out["energie_vent_cumulee"] = np.nan
-
-    # Direction du vent
-    if "DD" in period.columns:
-        out["nb_jours_vent_dir_Ouest"] = float(((period["DD"] > 225) & (period["DD"] < 315)).mean(skipna=True))
-    else:
-        out["nb_jours_vent_dir_Ouest"] = np.nan
-
-    # PRESSION
-    if "PMER" in period.columns:
-        p = period["PMER"].dropna()
-
-        out["pression_moy_hpa"] = float(p.mean()) if not p.empty else np.nan
-        out["jours_basse_pression"] = int((p < BASSE_PRESSION_HPA).sum()) if not p.empty else np.nan
-        out["pression_min_hpa"] = float(p.min()) if not p.empty else np.nan
-
-        # Chute max sur 24 h (différence négative la plus forte)
-        if len(p) > 1:
-            dp = p.diff()  # PMER[j] - PMER[j-1]
-            out["max_drop_pression_24h"] = float((-dp).max()) if not dp.dropna().empty else np.nan
-        else:
-            out["max_drop_pression_24h"] = np.nan
+class DonneesMeteo:
+    """
+    Séries dérivées d'une table journalière (resumer_journalier) et leurs index :
+    IndexCumule (sommes, moyennes, écarts-types, extrêmes), cumuls de comptage
+    (jours vérifiant une condition) et Sequences (séquences de jours consécutifs).
+    Chaque objet de SERIES_METEO est construit à la première demande puis
+    partagé par toutes les fenêtres évaluées sur la table.
+    """
 
-        # Variabilité barométrique
-        out["pression_std_hpa"] = float(p.std()) if not p.empty else np.nan
+    def __init__(self, daily: pd.DataFrame):
+        self.daily = daily
+        self.colonnes = set(daily.columns)
+        self._objets = {}
 
-        # Jours très dépressionnaires (seuil plus strict)
-        out["nb_jours_depression"] = int((p < TRES_BASSE_PRESSION_HPA).sum()) if not p.empty else np.nan
+    def __len__(self) -> int:
+        return len(self.daily)
 
-        # Séquences ≥3 jours sous 1000 hPa
-        dep = (p < BASSE_PRESSION_HPA).astype(int)
-        if not dep.empty:
-            grp = (dep != dep.shift()).cumsum()
-            longueurs = dep.groupby(grp).sum()
-            out["nb_seq_depression_3j"] = int((longueurs >= 3).sum())
-        else:
-            out["nb_seq_depression_3j"] = np.nan
+    def __getitem__(self, nom: str):
+        if nom not in self._objets:
+            self._objets[nom] = SERIES_METEO[nom](self)
+        return self._objets[nom]
 
-        # Jours très creux
-        if "PMERMIN" in period.columns:
-            pmin = period["PMERMIN"].dropna()
-            out["nb_jours_pmermin"] = int((pmin < TRES_BASSE_PRESSION_HPA).sum()) if not pmin.empty else np.nan
-        else:
-            out["nb_jours_pmermin"] = np.nan
-
-    else:
-        out["pression_moy_hpa"] = np.nan
-        out["jours_basse_pression"] = np.nan
-        out["pression_min_hpa"] = np.nan
-        out["max_drop_pression_24h"] = np.nan
-        out["pression_std_hpa"] = np.nan
-        out["nb_jours_depression"] = np.nan
-        out["nb_seq_depression_3j"] = np.nan
-        out["nb_jours_pmermin"] = np.nan
-
-
-    # HUMIDITE
-    if "U" in period.columns:
-        U = period["U"].dropna()
-
-        out["humidite_moy_pct"] = float(U.mean()) if not U.empty else np.nan
-        out["jours_humide_90"] = int((U > 90).sum()) if not U.empty else np.nan
-
-        # Séquences de ≥3 jours consécutifs avec humidité > 90 %
-        if not U.empty:
-            humide = (U > 90).astype(int)
-            grp = (humide != humide.shift()).cumsum()
-            longueurs = humide.groupby(grp).sum()
-            out["nb_seq_humide_3j"] = int((longueurs >= 3).sum())
-        else:
-            out["nb_seq_humide_3j"] = np.nan
+    def colonne(self, col: str) -> np.ndarray:
+        return self.daily[col].to_numpy(dtype=float)
 
-        # 95ᵉ percentile de l’humidité (jours très humides)
-        out["U_95p"] = float(U.quantile(0.95)) if not U.empty else np.nan
+def _masques_combinaisons(d: DonneesMeteo) -> Dict[str, np.ndarray]:
+    """
+    Situations critiques de chaque jour, pour FXI lu en km/h ("1") ou en m/s
+    ("36", x3.6) : A pluie > 5 mm et rafale > 60 km/h, B pluie > 1 mm le
+    lendemain d'un jour de gel, C rafale > 80 km/h après plus de 10 mm sur les
+    3 jours précédents, U au moins une des trois.
+    """
+    pluie = d["pluie"]
+    gel = d["gel"] if "TN" in d.colonnes else np.zeros(len(pluie), dtype=bool)
+    out = {"B": (pluie > 1) & _veille(gel, False)}
+    for unite in ("1", "36"):
+        out["A" + unite] = (pluie > 5) & (d["fxi_" + unite] > 60)
+        out["C" + unite] = d["tempete_" + unite] & (d["pluie_3j_veille"] > 10)
+        out["U" + unite] = out["A" + unite] | out["B"] | out["C" + unite]
+    return out
 
-    else:
-        out["humidite_moy_pct"] = np.nan
-        out["jours_humide_90"] = np.nan
-        out["nb_seq_humide_3j"] = np.nan
-        out["U_95p"] = np.nan
+# nom -> construction à partir de DonneesMeteo ; préfixes : ix_ IndexCumule,
+# n_ cumul de comptage (cf. _cumul), seq_ Sequences
+SERIES_METEO: Dict[str, Callable[[DonneesMeteo], object]] = {
+    # précipitations (jours sans mesure comptés 0)
+    "pluie": lambda d: np.nan_to_num(d.colonne("RR1"), nan=0.0),
+    "c_pluie": lambda d: _cumul(d["pluie"]),
+    "ix_pluie": lambda d: _index(d["pluie"]),
+    "ix_pluie_5j": lambda d: _index(_cumul_jours(d["pluie"], 5)),
+    "pluie_3j_veille": lambda d: _veille(_cumul_jours(d["pluie"], 3), np.nan),
+    "n_pluie": lambda d: _cumul(d["pluie"] > PLUIE_JOUR_MM),
+    "n_forte_pluie": lambda d: _cumul(d["pluie"] > FORTE_PLUIE_JOUR_MM),
+    "seq_pluie": lambda d: _sequences(d["pluie"] > 1),
+    "seq_seche": lambda d: _sequences(d["pluie"] <= 1),
+
+    # températures
+    "gel": lambda d: d.colonne("TN") < 0,
+    "n_gel": lambda d: _cumul(d["gel"]),
+    "seq_gel": lambda d: _sequences(d["gel"]),
+    "n_tres_chaud": lambda d: _cumul(d.colonne("TX") > SEUIL_JOUR_TRES_CHAUD),
+    "n_gel_degel": lambda d: _cumul(d["gel"] & (d.colonne("TX") > 1)),
+    "n_gel_degel_rapide": lambda d: _cumul(d["gel"] & (d.colonne("TX") > 5)),
+    "ampli": lambda d: d.colonne("AMPLI"),
+    "n_ampli_10": lambda d: _cumul(d["ampli"] > 10),
+
+    # vent, dans les deux unités possibles : "1" km/h, "36" m/s x3.6
+    "ix_ff_1": lambda d: _index(d.colonne("FF")),
+    "ix_ff_36": lambda d: _index(d.colonne("FF") * 3.6),
+    "fxi_1": lambda d: np.nan_to_num(d.colonne("FXI"), nan=0.0),
+    "fxi_36": lambda d: d["fxi_1"] * 3.6,
+    "ix_fxi_1": lambda d: _index(d["fxi_1"]),
+    "ix_fxi_36": lambda d: _index(d["fxi_36"]),
+    "c2_fxi_1": lambda d: _cumul(d["fxi_1"] * d["fxi_1"]),
+    "c2_fxi_36": lambda d: _cumul(d["fxi_36"] * d["fxi_36"]),
+    "n_vent_fort_1": lambda d: _cumul(d["fxi_1"] > VENT_FORT_KMH),
+    "n_vent_fort_36": lambda d: _cumul(d["fxi_36"] > VENT_FORT_KMH),
+    "tempete_1": lambda d: d["fxi_1"] > TEMPETE_KMH,
+    "tempete_36": lambda d: d["fxi_36"] > TEMPETE_KMH,
+    "n_tempete_1": lambda d: _cumul(d["tempete_1"]),
+    "n_tempete_36": lambda d: _cumul(d["tempete_36"]),
+    "seq_tempete_1": lambda d: _sequences(d["tempete_1"]),
+    "seq_tempete_36": lambda d: _sequences(d["tempete_36"]),
+    "n_ouest": lambda d: _cumul((d.colonne("DD") > 225) & (d.colonne("DD") < 315)),
+
+    # pression et humidité : NaN ignorés ; séquences et écarts d'un jour à
+    # l'autre sur les seuls jours mesurés (cf. _sans_manquants)
+    "ix_pmer": lambda d: _index(d.colonne("PMER")),
+    "pmer_mesures": lambda d: _sans_manquants(d.colonne("PMER")),
+    "ix_chute_pmer": lambda d: _index(-np.diff(d["pmer_mesures"][0], prepend=np.nan)),
+    "seq_depression": lambda d: _sequences(d["pmer_mesures"][0] < BASSE_PRESSION_HPA),
+    "n_basse_pression": lambda d: _cumul(d.colonne("PMER") < BASSE_PRESSION_HPA),
+    "n_depression": lambda d: _cumul(d.colonne("PMER") < TRES_BASSE_PRESSION_HPA),
+    "ix_pmermin": lambda d: _index(d.colonne("PMERMIN")),
+    "n_pmermin": lambda d: _cumul(d.colonne("PMERMIN") < TRES_BASSE_PRESSION_HPA),
+    "ix_u": lambda d: _index(d.colonne("U")),
+    "u": lambda d: d.colonne("U"),
+    "u_mesures": lambda d: _sans_manquants(d["u"]),
+    "seq_humide": lambda d: _sequences(d["u_mesures"][0] > 90),
+    "n_humide": lambda d: _cumul(d["u"] > 90),
+
+    # combinaisons critiques
+    "combinaisons": _masques_combinaisons,
+    "n_A1": lambda d: _cumul(d["combinaisons"]["A1"]),
+    "n_A36": lambda d: _cumul(d["combinaisons"]["A36"]),
+    "n_B": lambda d: _cumul(d["combinaisons"]["B"]),
+    "n_C1": lambda d: _cumul(d["combinaisons"]["C1"]),
+    "n_C36": lambda d: _cumul(d["combinaisons"]["C36"]),
+    "n_U1": lambda d: _cumul(d["combinaisons"]["U1"]),
+    "n_U36": lambda d: _cumul(d["combinaisons"]["U36"]),
+}
 
-    # COMBINAISONS CRITIQUES
+# -----------------------------
+# Indicateurs par fenêtre
+# -----------------------------
 
-    if all(col in period.columns for col in ["RR1", "FXI"]):
-        pluie = period["RR1"].fillna(0)
-        vent = vent_kmh(period["FXI"].fillna(0))
+def _rapport(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den là où den > 0, NaN sinon."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+def _si_valeurs(n: np.ndarray, valeurs: np.ndarray) -> np.ndarray:
+    """valeurs là où la fenêtre contient au moins une mesure (n > 0), NaN sinon ; entiers gardés si aucune fenêtre vide."""
+    return valeurs if (n > 0).all() else np.where(n > 0, valeurs, np.nan)
+
+def _somme_lignes(x: np.ndarray) -> np.ndarray:
+    """Somme des valeurs non manquantes de chaque ligne, dans leur ordre (comme sur la série sans manquants)."""
+    nb = (~np.isnan(x)).sum(axis=1)
+    out = x.sum(axis=1)
+    for k in np.flatnonzero(nb < x.shape[1]):
+        out[k] = x[k][~np.isnan(x[k])].sum()
+    return out
 
-        # Jours avec pluie >5 mm ET rafales >60 km/h
-        cond_pluie_vent = (pluie > 5) & (vent > 60)
-        out["jours_pluie_et_vent_fort"] = int(cond_pluie_vent.sum())
+def _quantile_lignes(x: np.ndarray, q: float) -> np.ndarray:
+    """Quantile (interpolation linéaire, comme np.quantile) de chaque ligne, NaN ignorés ; NaN si ligne vide."""
+    if x.shape[1] == 0:
+        return np.full(len(x), np.nan)
+    tri = np.sort(x, axis=1)
+    m = (~np.isnan(x)).sum(axis=1)
+    pos = np.maximum(m - 1, 0) * q
+    bas = np.floor(pos).astype(np.int64)
+    haut = np.minimum(bas + 1, np.maximum(m - 1, 0))
+    a = np.take_along_axis(tri, bas[:, None], axis=1)[:, 0]
+    b = np.take_along_axis(tri, haut[:, None], axis=1)[:, 0]
+    t = pos - bas
+    out = np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+    return np.where(m > 0, out, np.nan)
+
+class FenetresMeteo:
+    """
+    Fenêtres de jours [i0, i1[ (positions dans la table de `donnees`) : une
+    période, les fenêtres d'un balayage ou les répliques d'un bootstrap mises
+    bout à bout. Les intermédiaires de INTERMEDIAIRES_PERIODE sont calculés à
+    la première demande, pour toutes les fenêtres à la fois.
+    `facteurs` impose le facteur de vent_kmh de chaque fenêtre ({"ff": ...,
+    "fxi": ...}, 1 ou 3.6) au lieu de le décider sur ses propres jours.
+    """
 
-        # Jours de pluie suivant un jour de gel (TN < 0)
-        if "TN" in period.columns:
-            gel = (period["TN"] < 0)
-            pluie_apres_gel = (pluie > 1) & gel.shift(1)
-            out["pluie_apres_gel"] = int(pluie_apres_gel.sum())
+    def __init__(self, donnees: DonneesMeteo, i0: np.ndarray, i1: np.ndarray, facteurs: Dict[str, np.ndarray] = None):
+        self.donnees = donnees
+        self.colonnes = donnees.colonnes
+        self.i0 = np.asarray(i0, dtype=np.int64)
+        self.i1 = np.maximum(np.asarray(i1, dtype=np.int64), self.i0)
+        self.facteurs = facteurs or {}
+        self._valeurs = {}
+
+    def __len__(self) -> int:
+        return len(self.i0)
+
+    def __getitem__(self, nom: str) -> np.ndarray:
+        if nom not in self._valeurs:
+            self._valeurs[nom] = INTERMEDIAIRES_PERIODE[nom](self)
+        return self._valeurs[nom]
+
+    def compte(self, nom: str, decalage: int = 0) -> np.ndarray:
+        """Jours comptés par le cumul `nom` de donnees, à partir du jour i0 + decalage de chaque fenêtre."""
+        c = self.donnees[nom]
+        i0 = np.minimum(self.i0 + decalage, self.i1)
+        return (c[self.i1] - c[i0]).astype(np.int64)
+
+    def somme(self, nom: str) -> np.ndarray:
+        c = self.donnees[nom]
+        return c[self.i1] - c[self.i0]
+
+    def index(self, nom: str, fonction: str, *args) -> np.ndarray:
+        """Méthode *_pos `fonction` de l'IndexCumule `nom` sur les fenêtres."""
+        return getattr(self.donnees[nom], fonction)(*args, self.i0, self.i1)
+
+    def mesures(self, nom: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Fenêtres en positions dans la série des seuls jours mesurés `nom` (cf. _sans_manquants)."""
+        _, pos = self.donnees[nom]
+        return pos[self.i0], pos[self.i1]
+
+    def selon_unite(self, cle: str, en_ms: np.ndarray, en_kmh: np.ndarray) -> np.ndarray:
+        return np.where(self["facteur_" + cle] == 3.6, en_ms, en_kmh)
+
+    def par_longueur(self, valeurs: np.ndarray, calcul: Callable, *par_fenetre: np.ndarray) -> np.ndarray:
+        """
+        calcul(matrice, *par_fenetre) sur les jours de chaque fenêtre : les
+        fenêtres de même nombre de jours sont rassemblées en une matrice
+        (une ligne par fenêtre), par lots de MAX_VALEURS_LOT jours.
+        """
+        longueurs = self.i1 - self.i0
+        out = np.full(len(self), np.nan)
+        for n in np.unique(longueurs):
+            groupe = np.flatnonzero(longueurs == n)
+            lot = max(1, MAX_VALEURS_LOT // max(n, 1))
+            for k in range(0, len(groupe), lot):
+                g = groupe[k:k + lot]
+                m = valeurs[self.i0[g][:, None] + np.arange(n)]
+                out[g] = calcul(m, *(x[g] for x in par_fenetre))
+        return out
+
+def _facteur_kmh(p: FenetresMeteo, cle: str) -> np.ndarray:
+    """Facteur de vent_kmh par fenêtre : x3.6 si le max (hors NaN) est < 70 (m/s supposés)."""
+    if cle in p.facteurs:
+        return p.facteurs[cle]
+    with np.errstate(invalid="ignore"):
+        return np.where(p.index(f"ix_{cle}_1", "extreme_pos", "max") < 70, 3.6, 1.0)
+
+def _max_cum_pluie_5j(p: FenetresMeteo) -> np.ndarray:
+    # pluie >= 0 : les cumuls tronqués des 4 premiers jours ne dépassent pas
+    # le premier cumul de 5 jours entier, d'où le max des cumuls entiers
+    # [i0 + 4, i1[ ; une fenêtre de moins de 5 jours vaut son cumul total.
+    pluie, n = p.donnees["pluie"], p["n"]
+    longs = p.donnees["ix_pluie_5j"].extreme_pos("max", np.minimum(p.i0 + 4, p.i1), p.i1)
+    courts = np.zeros(len(p))
+    for k in range(4):
+        courts = courts + np.where(k < n, _au_jour(pluie, p.i0 + k), 0.0)
+    return np.where(n >= 5, longs, np.where(n > 0, courts, np.nan))
+
+def _combinaisons(p: FenetresMeteo) -> Dict[str, np.ndarray]:
+    """
+    Comptes par fenêtre des situations de _masques_combinaisons. Dans la
+    fenêtre, le premier jour n'a pas de veille et les cumuls de pluie des 3
+    jours précédents sont tronqués pour les jours 2 et 3 : ces trois jours sont
+    évalués ici, les suivants viennent des cumuls de comptage globaux.
+    """
+    d, n = p.donnees, p["n"]
+    m = d["combinaisons"]
+    pluie = d["pluie"]
+    en_ms = p["facteur_fxi"] == 3.6
+
+    res = {
+        "A": np.where(en_ms, p.compte("n_A36"), p.compte("n_A1")),
+        "B": p.compte("n_B", 1),
+        "C": np.where(en_ms, p.compte("n_C36", 3), p.compte("n_C1", 3)),
+        "U": np.where(en_ms, p.compte("n_U36", 3), p.compte("n_U1", 3)),
+    }
+    cumul = np.zeros(len(p))
+    for k in range(min(3, n.max(initial=0))):
+        dans = k < n
+        j = p.i0 + k
+        a = np.where(en_ms, _au_jour(m["A36"], j), _au_jour(m["A1"], j))
+        b = _au_jour(m["B"], j) if k else False
+        c = dans & np.where(en_ms, _au_jour(d["tempete_36"], j), _au_jour(d["tempete_1"], j)) & (cumul > 10) if k else False
+        res["C"] = res["C"] + c
+        res["U"] = res["U"] + (dans & (a | b | c))
+        cumul = cumul + np.where(dans, _au_jour(pluie, j), 0.0)
+    return res
+
+def _pluie_extreme_ratio(m: np.ndarray, q: np.ndarray) -> np.ndarray:
+    extremes = np.where(m >= q[:, None], m, np.nan)
+    return _rapport(_somme_lignes(extremes), m.sum(axis=1))
+
+def _max_drop_pression(p: FenetresMeteo) -> np.ndarray:
+    # écarts entre jours mesurés consécutifs, tous deux dans la fenêtre
+    v0, v1 = p.mesures("pmer_mesures")
+    return p.donnees["ix_chute_pmer"].extreme_pos("max", np.minimum(v0 + 1, v1), v1)
+
+INTERMEDIAIRES_PERIODE: Dict[str, Callable[[FenetresMeteo], np.ndarray]] = {
+    "n": lambda p: p.i1 - p.i0,
+    "facteur_ff": lambda p: _facteur_kmh(p, "ff"),
+    "facteur_fxi": lambda p: _facteur_kmh(p, "fxi"),
+    "pluie_95p": lambda p: p.par_longueur(p.donnees["pluie"], lambda m: _quantile_lignes(m, 0.95)),
+    "n_pmer": lambda p: p.index("ix_pmer", "nb_pos"),
+    "n_u": lambda p: p.index("ix_u", "nb_pos"),
+    "combinaisons": _combinaisons,
+}
+
+def _sequences_fenetres(p: FenetresMeteo, nom: str, methode: str, *args, mesures: str = None) -> np.ndarray:
+    """Méthode *_pos de la Sequences `nom` sur les fenêtres (en jours mesurés de `mesures` si donné)."""
+    i0, i1 = p.mesures(mesures) if mesures else (p.i0, p.i1)
+    return getattr(p.donnees[nom], methode)(*args, i0, i1)
+
+# Indicateurs de indicateurs_periode, dans l'ordre des colonnes de sortie :
+# nom -> (colonnes requises, calcul par fenêtre de FenetresMeteo) ; NaN si une
+# colonne requise manque. Seule définition des indicateurs météo : une période
+# (indicateurs_periode), les fenêtres d'un balayage (balayage.balayer_meteo)
+# et les répliques d'un bootstrap (incertitude.bootstrap_meteo).
+INDICATEURS_PERIODE: Dict[str, Tuple[Tuple[str, ...], Callable[[FenetresMeteo], np.ndarray]]] = {
+    "nb_jours": ((), lambda p: p["n"]),
+
+    # PRECIPITATIONS
+    "pluie_cum_mm": (("RR1",), lambda p: p.somme("c_pluie")),
+    "jours_pluie": (("RR1",), lambda p: p.compte("n_pluie")),
+    "jours_forte_pluie": (("RR1",), lambda p: p.compte("n_forte_pluie")),
+    "max_pluie_jour": (("RR1",), lambda p: p.index("ix_pluie", "extreme_pos", "max")),
+    # séquences ≥3 jours avec pluie > 1 mm
+    "nb_seq_pluie_3j": (("RR1",), lambda p: _sequences_fenetres(p, "seq_pluie", "nb_sequences_pos", 3)),
+    # cumul maximum sur 5 jours glissants
+    "max_cum_pluie_5j": (("RR1",), _max_cum_pluie_5j),
+    # séquences ≥10 jours sans pluie
+    "nb_seq_seche_10j": (("RR1",), lambda p: _sequences_fenetres(p, "seq_seche", "nb_sequences_pos", 10)),
+    "pluie_95p": (("RR1",), lambda p: p["pluie_95p"]),
+    # part de la pluie due aux 5 % de jours les plus pluvieux
+    "pluie_extreme_ratio": (("RR1",), lambda p: p.par_longueur(p.donnees["pluie"], _pluie_extreme_ratio, p["pluie_95p"])),
+
+    # TEMPERATURES
+    "jours_gel": (("TN",), lambda p: p.compte("n_gel")),
+    "jours_tres_chauds": (("TX",), lambda p: p.compte("n_tres_chaud")),
+    "jours_gel_degel": (("TN", "TX"), lambda p: p.compte("n_gel_degel")),
+    # séquences de ≥3 jours consécutifs de gel
+    "nb_seq_gel_3j": (("TN",), lambda p: _sequences_fenetres(p, "seq_gel", "nb_sequences_pos", 3)),
+    "plus_longue_serie_gel_consecutif": (("TN",), lambda p: _sequences_fenetres(p, "seq_gel", "plus_longue_pos")),
+    # cycles gel-dégel rapides : TN < 0 et TX > +5 °C
+    "nb_seq_gel_degel_rapide": (("TN", "TX"), lambda p: p.compte("n_gel_degel_rapide")),
+    # 95e percentile de l'amplitude thermique journalière, jours d'amplitude > 10 °C
+    "T_ampli_95p": (("AMPLI",), lambda p: p.par_longueur(p.donnees["ampli"], lambda m: _quantile_lignes(m, 0.95))),
+    "nb_jours_ampli_sup_10": (("AMPLI",), lambda p: p.compte("n_ampli_10")),
+
+    # VENT (FF et FXI en km/h, ou en m/s x3.6 selon vent_kmh sur la fenêtre)
+    "vent_moy_kmh": (("FF",), lambda p: p.selon_unite("ff", p.index("ix_ff_36", "moyenne_pos"), p.index("ix_ff_1", "moyenne_pos"))),
+    "jours_vent_fort_60": (("FXI",), lambda p: p.selon_unite("fxi", p.compte("n_vent_fort_36"), p.compte("n_vent_fort_1"))),
+    "jours_tempete_80": (("FXI",), lambda p: p.selon_unite("fxi", p.compte("n_tempete_36"), p.compte("n_tempete_1"))),
+    "rafale_max_kmh": (("FXI",), lambda p: p.selon_unite(
+        "fxi", p.index("ix_fxi_36", "extreme_pos", "max"), p.index("ix_fxi_1", "extreme_pos", "max"))),
+    # séquences de ≥2 jours consécutifs de tempête
+    "nb_tempetes_consecutives": (("FXI",), lambda p: p.selon_unite(
+        "fxi", _sequences_fenetres(p, "seq_tempete_36", "nb_sequences_pos", 2), _sequences_fenetres(p, "seq_tempete_1", "nb_sequences_pos", 2))),
+    "plus_longue_serie_tempete_consecutive": (("FXI",), lambda p: p.selon_unite(
+        "fxi", _sequences_fenetres(p, "seq_tempete_36", "plus_longue_pos"), _sequences_fenetres(p, "seq_tempete_1", "plus_longue_pos"))),
+    # rafale maximale sur 3 jours glissants (= max, fenêtres tronquées au début)
+    "max_rafale_3j": (("FXI",), lambda p: p.selon_unite(
+        "fxi", p.index("ix_fxi_36", "extreme_pos", "max"), p.index("ix_fxi_1", "extreme_pos", "max"))),
+    # énergie mécanique cumulée (FXI²)
+    "energie_vent_cumulee": (("FXI",), lambda p: p.selon_unite("fxi", p.somme("c2_fxi_36"), p.somme("c2_fxi_1"))),
+    "nb_jours_vent_dir_Ouest": (("DD",), lambda p: _rapport(p.compte("n_ouest"), p["n"])),
+
+    # PRESSION (jours sans mesure ignorés)
+    "pression_moy_hpa": (("PMER",), lambda p: p.index("ix_pmer", "moyenne_pos")),
+    "jours_basse_pression": (("PMER",), lambda p: _si_valeurs(p["n_pmer"], p.compte("n_basse_pression"))),
+    "pression_min_hpa": (("PMER",), lambda p: p.index("ix_pmer", "extreme_pos", "min")),
+    # chute max sur 24 h (différence négative la plus forte)
+    "max_drop_pression_24h": (("PMER",), _max_drop_pression),
+    # variabilité barométrique
+    "pression_std_hpa": (("PMER",), lambda p: np.sqrt(p.index("ix_pmer", "variance_pos"))),
+    # jours très dépressionnaires (seuil plus strict)
+    "nb_jours_depression": (("PMER",), lambda p: _si_valeurs(p["n_pmer"], p.compte("n_depression"))),
+    # séquences ≥3 jours sous 1000 hPa
+    "nb_seq_depression_3j": (("PMER",), lambda p: _si_valeurs(
+        p["n_pmer"], _sequences_fenetres(p, "seq_depression", "nb_sequences_pos", 3, mesures="pmer_mesures"))),
+    # jours très creux
+    "nb_jours_pmermin": (("PMER", "PMERMIN"), lambda p: _si_valeurs(p.index("ix_pmermin", "nb_pos"), p.compte("n_pmermin"))),
+
+    # HUMIDITE (jours sans mesure ignorés)
+    "humidite_moy_pct": (("U",), lambda p: p.index("ix_u", "moyenne_pos")),
+    "jours_humide_90": (("U",), lambda p: _si_valeurs(p["n_u"], p.compte("n_humide"))),
+    # séquences de ≥3 jours consécutifs avec humidité > 90 %
+    "nb_seq_humide_3j": (("U",), lambda p: _si_valeurs(
+        p["n_u"], _sequences_fenetres(p, "seq_humide", "nb_sequences_pos", 3, mesures="u_mesures"))),
+    # 95e percentile de l'humidité (jours très humides)
+    "U_95p": (("U",), lambda p: p.par_longueur(p.donnees["u"], lambda m: _quantile_lignes(m, 0.95))),
+
+    # COMBINAISONS CRITIQUES
+    # jours avec pluie > 5 mm ET rafales > 60 km/h
+    "jours_pluie_et_vent_fort": (("RR1", "FXI"), lambda p: p["combinaisons"]["A"]),
+    # jours de pluie suivant un jour de gel (TN < 0)
+    "pluie_apres_gel": (("RR1", "FXI", "TN"), lambda p: p["combinaisons"]["B"]),
+    # jours de vent fort suivant 3 jours de pluie cumulée élevée (> 10 mm)
+    "tempete_apres_pluie": (("RR1", "FXI"), lambda p: p["combinaisons"]["C"]),
+    # nombre de jours où au moins une situation extrême s'est produite
+    "nb_combinaisons_critiques": (("RR1", "FXI"), lambda p: p["combinaisons"]["U"]),
+}
+
+def noms_indicateurs(indicateurs: List[str] = None) -> List[str]:
+    """Noms de INDICATEURS_PERIODE demandés (None = tous) ; ValueError pour un nom inconnu."""
+    noms = list(INDICATEURS_PERIODE) if indicateurs is None else list(indicateurs)
+    inconnus = [nom for nom in noms if nom not in INDICATEURS_PERIODE]
+    if inconnus:
+        raise ValueError(f"Indicateurs inconnus : {inconnus}. Disponibles : {list(INDICATEURS_PERIODE)}")
+    return noms
+
+def evaluer_fenetres(fenetres: FenetresMeteo, indicateurs: List[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Valeurs de chaque indicateur demandé (None = tous) pour chaque fenêtre :
+    comptes entiers, mesures en float, NaN si une colonne requise manque.
+    Seuls les séries et intermédiaires dont ils dépendent sont construits.
+    """
+    out = {}
+    for nom in noms_indicateurs(indicateurs):
+        colonnes, calcul = INDICATEURS_PERIODE[nom]
+        if all(col in fenetres.colonnes for col in colonnes):
+            out[nom] = np.asarray(calcul(fenetres))
         else:
-            out["pluie_apres_gel"] = np.nan
-
-        # Jours de vent fort suivant 3 jours de pluie cumulée élevée (>10 mm) Cas où le sol est déjà saturé en eau puis subit une tempête.
-        pluie_cum3 = pluie.rolling(3, min_periods=1).sum()
-        tempete_apres_pluie = (vent > 80) & (pluie_cum3.shift(1) > 10)
-        out["tempete_apres_pluie"] = int(tempete_apres_pluie.sum())
-
-        # Indice global des combinaisons extrêmes / Nombre total de jours où au moins une situation extrême s’est produite.
-        combis = cond_pluie_vent.astype(int)
-        if "TN" in period.columns:
-            combis += pluie_apres_gel.astype(int)
-        combis += tempete_apres_pluie.astype(int)
-        out["nb_combinaisons_critiques"] = int((combis > 0).sum())
-
-    else:
-        out["jours_pluie_et_vent_fort"] = np.nan
-        out["pluie_apres_gel"] = np.nan
-        out["tempete_apres_pluie"] = np.nan
-        out["nb_combinaisons_critiques"] = np.nan
-    
+            out[nom] = np.full(len(fenetres), np.nan)
     return out
 
+def indicateurs_periode(
+    daily: pd.DataFrame,
+    start: str,
+    end: str,
+    indicateurs: List[str] = None,
+    donnees: DonneesMeteo = None,
+) -> Dict[str, float]:
+    """
+    Calcule les indicateurs sur la sous-période [start, end].
+    `indicateurs` : noms de INDICATEURS_PERIODE à calculer (None = tous).
+    `donnees` (DonneesMeteo(daily)) peut être construit une fois et partagé
+    entre les périodes ; sinon seuls les jours de la période sont indexés.
+    """
+    a, b, _ = daily.index.slice_indexer(start, end).indices(len(daily))
+    if donnees is None:
+        donnees, a, b = DonneesMeteo(daily.iloc[a:max(a, b)]), 0, max(b - a, 0)
+    valeurs = evaluer_fenetres(FenetresMeteo(donnees, [a], [b]), indicateurs)
+    out = {
+        "periode_debut": start,
+        "periode_fin": end,
+    }
+    for nom, v in valeurs.items():
+        out[nom] = int(v[0]) if v.dtype.kind in "iu" else float(v[0])
+    return out
 
-def calculer_indicateurs(chemin_dossier: str, periodes: List[Tuple[str, str]]) -> pd.DataFrame:
-    df = charger_dossier(chemin_dossier)
-    daily = resumer_journalier(df)
 
-    lignes = []
-    for start, end in periodes:
-        lignes.append(indicateurs_periode(daily, start, end))
-    res = pd.DataFrame(lignes)
+def calculer_indicateurs(
+    chemin_dossier: str,
+    periodes: List[Tuple[str, str]],
+    n_processus: int = 1,
+    cache: CacheColonnaire = None,
+    compact: bool = False,
+    indicateurs: List[str] = None,
+    masquer: bool = False,
+) -> pd.DataFrame:
+    df = charger_dossier(chemin_dossier, n_processus, cache, compact)
+    daily = resumer_journalier(df, masquer)
+
+    with etape("indicateurs", source="meteo", periodes=len(periodes)) as e:
+        donnees = DonneesMeteo(daily)
+        lignes = []
+        for start, end in periodes:
+            lignes.append(indicateurs_periode(daily, start, end, indicateurs, donnees))
+        res = pd.DataFrame(lignes)
+        e.lignes = len(daily)
     return res
 
 def main():
 
-    res = calculer_indicateurs(CHEMIN_DOSSIER, PERIODES)
-    out_path = Path(CHEMIN_DOSSIER) / "indicateurs_meteo.xlsx"
-    res.to_excel(out_path, index=False)
-    print(f"Fichier exporté : {out_path}")
+    res = calculer_indicateurs(CHEMIN_DOSSIER, PERIODES, N_PROCESSUS, CACHE, COMPACT, INDICATEURS, MASQUER_JOURS_SOUS_COUVERTS)
+    fichiers = sorties.exporter(res, SORTIE)
+    print(f"Fichier exporté : {', '.join(str(f) for f in fichiers)}")
 
 if __name__ == "__main__":
     main()
@@ -1,106 +1,110 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import os
+from typing import List, Tuple
+from balayage import indexer_houle, balayer_houle
+from ingestion import dedoublonner
+from periodes import PERIODES
+from instrumentation import etape
+import sorties
 
 CHEMIN_FICHIER = Path.home() / "Downloads" / "167730_20000101_20221231_rc.csv"
-
-# périodes IGN (entre campagnes)
-PERIODES = [
-    ("1995-01-01", "2000-12-31"),
-    ("2001-01-01", "2008-12-31"),
-    ("2009-01-01", "2012-12-31"),
-    ("2013-01-01", "2015-12-31"),
-    ("2016-01-01", "2019-12-31"),
-    ("2020-01-01", "2022-12-31"),
-]
-
-# constantes 
-RHO = 1025   # densité de l’eau (kg/m³)
-G = 9.81     # gravité (m/s²)
-
-print(f"Lecture du fichier : {CHEMIN_FICHIER}")
-
-df = pd.read_csv(CHEMIN_FICHIER, sep=",", low_memory=False)
-print("\n Fichier chargé avec succès.")
-print("Colonnes disponibles :", df.columns.tolist())
-
-# vérification des colonnes essentielles
-colonnes_requises = ["time", "hs", "t02", "dp"]
-for col in colonnes_requises:
-    if col not in df.columns:
-        raise ValueError(f"Colonne manquante : {col}")
-
-# conversion du temps
-df["time"] = pd.to_datetime(df["time"], errors="coerce")
-df = df.dropna(subset=["time"]).sort_values("time")
-
-def calcul_indicateurs(df, debut, fin):
-    """Calcule les indicateurs marins expliquant les éboulements sur la période [debut, fin]."""
-    subset = df[(df["time"] >= debut) & (df["time"] <= fin)].copy()
-    if subset.empty:
+SORTIE = Path.home() / "Downloads" / "indicateurs_marins_periodiquesbonnedate.xlsx"
+CACHE = None  # CacheColonnaire() : hindcast déjà parsé, réutilisé d'une exécution à l'autre (None = désactivé)
+
+# colonnes lues et types compacts (le reste du fichier n'est pas chargé)
+COLONNES_HOULE = ["time", "hs", "t02", "dp"]
+TYPES_HOULE = {"hs": "float32", "t02": "float32", "dp": "float32"}
+# Constantes du parsing, dans la clé des entrées du cache (cf. cache_donnees._configuration)
+CONFIGURATION_LECTURE = ["COLONNES_HOULE", "TYPES_HOULE"]
+
+
+# chargement
+
+def charger_houle(chemin: Path) -> pd.DataFrame:
+    """Lit uniquement time/hs/t02/dp du CSV de rejeu de houle, en float32."""
+    # vérification des colonnes essentielles (sur l'en-tête seul)
+    colonnes = pd.read_csv(chemin, sep=",", nrows=0).columns
+    for col in COLONNES_HOULE:
+        if col not in colonnes:
+            raise ValueError(f"Colonne manquante : {col}")
+
+    with etape("lecture", source="houle", fichier=Path(chemin).name) as e:
+        df = pd.read_csv(chemin, sep=",", usecols=COLONNES_HOULE, dtype=TYPES_HOULE)
+        e.lignes = len(df)
+    return df
+
+
+def nettoyer_houle(df: pd.DataFrame) -> pd.DataFrame:
+    """Conversion du temps, suppression des dates invalides, tri chronologique et une ligne par date."""
+    with etape("dates", source="houle") as e:
+        df["time"] = pd.to_datetime(df["time"], errors="coerce")
+        e.lignes = len(df)
+    with etape("tri", source="houle") as e:
+        df = df.dropna(subset=["time"]).sort_values("time", kind="stable")
+        e.lignes = len(df)
+    # dates répétées dans le rejeu : la première ligne est gardée (sinon les
+    # comptes horaires comme jours_houle>3m = n/24 sont gonflés)
+    n = len(df)
+    df = dedoublonner(df, "time").reset_index(drop=True)
+    if len(df) < n:
+        print(f"{n - len(df)} lignes en double écartées")
+    return df
+
+
+def lire_houle(chemin: Path) -> pd.DataFrame:
+    """Chargement + nettoyage d'un fichier de rejeu (unité mise en cache)."""
+    return nettoyer_houle(charger_houle(chemin))
+
+
+# indicateurs
+
+def calcul_indicateurs(df, debut, fin, index):
+    """
+    Calcule les indicateurs marins expliquant les éboulements sur la période [debut, fin].
+    Les agrégats sont lus dans les index cumulés `index` = indexer_houle(df),
+    construit une fois par l'appelant pour toutes ses périodes.
+    """
+    ligne = balayer_houle(df, [(debut, fin)], index=index).iloc[0]
+    if ligne["nb_points"] == 0:
         return {"période": f"{debut} → {fin}", "nb_points": 0}
+    return {"période": f"{debut} → {fin}", **ligne.drop(["debut", "fin"]).to_dict()}
+
+
+def indicateurs_periodes(df: pd.DataFrame, periodes: List[Tuple[str, str]] = PERIODES) -> pd.DataFrame:
+    """Application à toutes les périodes, avec un seul jeu d'index cumulés."""
+    with etape("indicateurs", source="houle", periodes=len(periodes)) as e:
+        index = indexer_houle(df)
+        res = pd.DataFrame([calcul_indicateurs(df, start, end, index) for start, end in periodes])
+        e.lignes = len(df)
+    return res
+
+
+# export
+
+def exporter(res: pd.DataFrame, sortie: Path = SORTIE) -> None:
+    """Parquet + CSV à côté de `sortie`, puis le classeur Excel (cf. sorties.exporter)."""
+    fichiers = sorties.exporter(res, sortie)
+    print(f"\n Résumé exporté dans : {', '.join(str(f) for f in fichiers)}")
+
+
+# exécution
+
+def main():
+    print(f"Lecture du fichier : {CHEMIN_FICHIER}")
+    df = CACHE.lire(CHEMIN_FICHIER, lire_houle) if CACHE is not None else lire_houle(CHEMIN_FICHIER)
+    print(f"\n Fichier chargé : {len(df)} mesures horaires")
+
+    res = indicateurs_periodes(df, PERIODES)
+    exporter(res, SORTIE)
+    print(res)
+
+    print("\n Résumé des tendances clés :")
+    print("- Hs_max élevé → périodes de tempêtes intenses")
+    print("- Énergie cumulée → intensité globale du forçage marin (érosion du pied de falaise)")
+    print("- % houles d’Ouest → exposition directe des falaises")
+    print("- IFM → indicateur global combinant intensité et fréquence de la houle forte")
+
 
-    hs = subset["hs"].astype(float)
-    tp = subset["t02"].astype(float)
-    dp = subset["dp"].astype(float)
-
-
-    energie = (1 / 8) * RHO * G * hs**2  # J/m²
-
-    # moyenne vectorielle de direction
-    dir_moy = np.rad2deg(
-        np.arctan2(np.mean(np.sin(np.deg2rad(dp))), np.mean(np.cos(np.deg2rad(dp))))
-    )
-    if dir_moy < 0:
-        dir_moy += 360
-
-    # % de houles d’Ouest (240–300°)
-    pct_houles_ouest = ((dp >= 240) & (dp <= 300)).sum() / len(dp)
-
-    # nombre de jours équivalents de forte houle (données horaires)
-    jours_houle3 = (hs > 3).sum() / 24
-    jours_houle4 = (hs > 4).sum() / 24
-
-    # indices synthétiques
-    IFM = np.log(energie.sum() * (1 + jours_houle3)) if energie.sum() > 0 else np.nan
-    indice_extreme = hs.max() / hs.mean() if hs.mean() > 0 else np.nan
-
- 
-    return {
-        "période": f"{debut} → {fin}",
-        "nb_points": len(subset),
-        "hs_moy": hs.mean(),
-        "hs_max": hs.max(),
-        "hs_mediane": hs.median(),
-        "t02_moy": tp.mean(),
-        "t02_max": tp.max(),
-        "energie_moy_Jm2": energie.mean(),
-        "energie_cumulee_Jm2": energie.sum(),
-        "jours_houle>3m": jours_houle3,
-        "jours_houle>4m": jours_houle4,
-        "%_houles_ouest": pct_houles_ouest,
-        "dir_moy_deg": dir_moy,
-        "IFM": IFM,
-        "indice_extreme": indice_extreme,
-    }
-
-# application à toutes les périodes
-resultats = [calcul_indicateurs(df, start, end) for start, end in PERIODES]
-res = pd.DataFrame(resultats)
-
-
-sortie = Path.home() / "Downloads" / "indicateurs_marins_periodiquesbonnedate.xlsx"
-
-if not sortie.parent.exists():
-    os.makedirs(sortie.parent, exist_ok=True)
-
-res.to_excel(sortie, index=False, engine="openpyxl")
-print(f"\n Résumé exporté dans : {sortie}")
-print(res)
-
-print("\n Résumé des tendances clés :")
-print("- Hs_max élevé → périodes de tempêtes intenses")
-print("- Énergie cumulée → intensité globale du forçage marin (érosion du pied de falaise)")
-print("- % houles d’Ouest → exposition directe des falaises")
-print("- IFM → indicateur global combinant intensité et fréquence de la houle forte")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Dict, List
+import pandas as pd
+import numpy as np
+import code_indicateurs_meteo as meteo
+import codeetatdemer as houle
+import marnage
+from index_cumule import IndexCumule
+from memoire import en_float64
+import sorties
+
+# Événements BDMOMA (éboulements) : une ligne par événement, date dans COLONNE_DATE
+FICHIER_EVENEMENTS = Path.home() / "Downloads" / "evenements_bdmoma.csv"
+COLONNE_DATE = "date"
+SORTIE = Path.home() / "Downloads" / "conditions_anterieures.xlsx"
+
+# Longueurs des fenêtres antécédentes (jours) : les N jours qui précèdent le
+# jour de l'événement, ce jour exclu
+FENETRES_JOURS = [1, 3, 7, 14, 30, 60, 90]
+
+UN_JOUR = np.timedelta64(1, "D")
+UN_NS = np.timedelta64(1, "ns")
+
+
+# -----------------------------
+# Index par source
+# -----------------------------
+
+def indexer_sources(
+    daily_meteo: pd.DataFrame = None,
+    maree: pd.DataFrame = None,
+    houle_horaire: pd.DataFrame = None,
+) -> Dict[str, IndexCumule]:
+    """
+    Index cumulés des variables antécédentes, construits une fois pour tous
+    les événements : pluie journalière (RR1), jours de gel-dégel (TN < 0 et
+    TX > 1, comme cycles_gel_degel), rafale max (km/h), marnage journalier
+    (max - min des hauteurs) et hs horaire. Chaque source est facultative.
+    """
+    index = {}
+    if daily_meteo is not None:
+        if "RR1" in daily_meteo.columns:
+            index["pluie"] = IndexCumule(daily_meteo["RR1"])
+        if {"TN", "TX"} <= set(daily_meteo.columns):
+            gel_degel = ((daily_meteo["TN"] < 0) & (daily_meteo["TX"] > 1)).astype(float)
+            index["gel_degel"] = IndexCumule(gel_degel.where(daily_meteo["TN"].notna() & daily_meteo["TX"].notna()))
+        if "FXI" in daily_meteo.columns:
+            index["rafale"] = IndexCumule(meteo.vent_kmh(daily_meteo["FXI"]))
+    if maree is not None:
+        jour = en_float64(maree.set_index("Date")["Valeur"]).resample("D").agg(["max", "min"])
+        index["marnage"] = IndexCumule((jour["max"] - jour["min"]).dropna())
+    if houle_horaire is not None:
+        index["hs"] = IndexCumule(houle_horaire.set_index("time")["hs"])
+    return index
+
+
+# -----------------------------
+# Matrice des conditions antécédentes
+# -----------------------------
+
+def _si_valeurs(ix: IndexCumule, d: np.ndarray, f: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """x là où la fenêtre contient au moins une valeur, NaN sinon."""
+    return np.where(ix.nb(d, f) > 0, x, np.nan)
+
+
+def conditions_anterieures(
+    evenements,
+    fenetres_jours: List[int] = FENETRES_JOURS,
+    index: Dict[str, IndexCumule] = None,
+    daily_meteo: pd.DataFrame = None,
+    maree: pd.DataFrame = None,
+    houle_horaire: pd.DataFrame = None,
+) -> pd.DataFrame:
+    """
+    Conditions des N jours précédant chaque événement, pour chaque N de
+    fenetres_jours : fenêtre [jour - N, jour[ (jour de l'événement exclu).
+    Toutes les fenêtres de tous les événements se résolvent par searchsorted
+    et différences de cumuls (max par table creuse), sans découpage par événement.
+    Une ligne par événement (même ordre), colonnes <indicateur>_<N>j ;
+    NaN si la fenêtre ne contient aucune mesure de la source.
+    `index` : index de indexer_sources, sinon construits à partir des tables.
+    """
+    if index is None:
+        index = indexer_sources(daily_meteo, maree, houle_horaire)
+    # chaque date avec son propre format (dates seules et dates-heures mêlées dans le fichier d'événements)
+    jours = pd.to_datetime(pd.Series(evenements), format="mixed").dt.normalize().to_numpy(dtype="datetime64[ns]")
+    fins = jours - UN_NS
+
+    # (nom, source, agrégat) dans l'ordre des colonnes ; les sommes sont NaN sur une fenêtre sans mesure
+    calculs = [
+        ("pluie_cumul_mm", "pluie", lambda ix, d, f: _si_valeurs(ix, d, f, ix.somme(d, f))),
+        ("jours_gel_degel", "gel_degel", lambda ix, d, f: _si_valeurs(ix, d, f, ix.somme(d, f))),
+        ("rafale_max_kmh", "rafale", lambda ix, d, f: ix.maximum(d, f)),
+        ("hs_max_m", "hs", lambda ix, d, f: ix.maximum(d, f)),
+        ("marnage_max_m", "marnage", lambda ix, d, f: ix.maximum(d, f)),
+    ]
+    debuts = {n: jours - n * UN_JOUR for n in fenetres_jours}
+    colonnes = {}
+    for nom, source, agregat in calculs:
+        if source in index:
+            for n in fenetres_jours:
+                colonnes[f"{nom}_{n}j"] = agregat(index[source], debuts[n], fins)
+
+    out = pd.DataFrame(colonnes, index=pd.RangeIndex(len(jours)))
+    out.insert(0, "date_evenement", jours)
+    return out
+
+
+def main():
+    evenements = pd.read_csv(FICHIER_EVENEMENTS)
+    daily = meteo.resumer_journalier(meteo.charger_dossier(meteo.CHEMIN_DOSSIER, meteo.N_PROCESSUS, meteo.CACHE, meteo.COMPACT), meteo.MASQUER_JOURS_SOUS_COUVERTS)
+    maree = marnage.charger_donnees(marnage.DOSSIER, marnage.N_PROCESSUS, marnage.CACHE)
+    houle_horaire = houle.CACHE.lire(houle.CHEMIN_FICHIER, houle.lire_houle) if houle.CACHE is not None else houle.lire_houle(houle.CHEMIN_FICHIER)
+
+    res = conditions_anterieures(evenements[COLONNE_DATE], FENETRES_JOURS, daily_meteo=daily, maree=maree, houle_horaire=houle_horaire)
+    res = pd.concat([evenements.reset_index(drop=True), res.drop(columns="date_evenement")], axis=1)
+    fichiers = sorties.exporter(res, SORTIE)
+    print(f"{len(res)} événements, {len(FENETRES_JOURS)} fenêtres : {', '.join(str(f) for f in fichiers)}")
+
+
+if __name__ == "__main__":
+    main()
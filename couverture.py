@@ -0,0 +1,224 @@
+from pathlib import Path
+from typing import Dict, Tuple
+import pandas as pd
+import numpy as np
+import code_indicateurs_meteo as meteo
+import codeetatdemer as houle
+import marnage
+from index_cumule import IndexCumule, _cumul, _temps
+from periodes import PERIODES, fenetres_table
+import sorties
+
+SORTIE = Path.home() / "Downloads" / "couverture_donnees.xlsx"
+
+PAS_ATTENDU = pd.Timedelta(hours=1)  # séries horaires
+# Jour sous-couvert : moins de MIN_HEURES_JOUR heures valides
+MIN_HEURES_JOUR = 18
+# Variables suivies : (source, colonne) ; les variables météo portent le nom de
+# leur colonne journalière, pour masquer_jours
+VARIABLES: Dict[str, Tuple[str, str]] = {
+    "RR1": ("meteo", "RR1"),
+    "T": ("meteo", "T"),
+    "FF": ("meteo", "FF"),
+    "FXI": ("meteo", "FXI"),
+    "PMER": ("meteo", "PMER"),
+    "maree": ("maree", "Valeur"),
+    "houle": ("houle", "hs"),
+}
+
+UN_JOUR = np.timedelta64(1, "D")
+
+
+# -----------------------------
+# Index de couverture
+# -----------------------------
+
+class IndexCouverture:
+    """
+    Couverture d'une série à pas fixe : instants valides (non manquants,
+    dédoublonnés), heures valides par jour et lacunes (écarts > pas entre deux
+    instants valides consécutifs). Complétude d'une fenêtre, nombre et plus
+    longue lacune par searchsorted et cumuls (max par table creuse) ; heures
+    valides d'un jour par position dans un tableau journalier.
+    """
+
+    def __init__(self, serie: pd.Series, pas: pd.Timedelta = PAS_ATTENDU):
+        serie = serie.dropna()
+        t = serie.index.to_numpy(dtype="datetime64[ns]")
+        if not serie.index.is_monotonic_increasing:
+            t = np.sort(t)
+        t = t[np.r_[True, np.diff(t) > np.timedelta64(0)]] if len(t) else t
+        self.pas = pas.to_timedelta64()
+        self.temps = t
+
+        # heures valides par jour, 0 sur les jours sans mesure
+        if len(t):
+            jours = t.astype("datetime64[D]")
+            self.premier_jour = jours[0]
+            self.par_jour = np.bincount((jours - jours[0]).astype(np.int64))
+        else:
+            self.premier_jour = np.datetime64("NaT", "D")
+            self.par_jour = np.zeros(0, dtype=np.int64)
+
+        # pas manquants entre chaque instant valide et le suivant (0 si contigus)
+        manquants = np.diff(t) // self.pas - 1 if len(t) > 1 else np.zeros(0, dtype=np.int64)
+        self._manquants = IndexCumule(pd.Series(manquants.astype(float), index=t[:-1]))
+        self._lacunes = IndexCumule(pd.Series((manquants > 0).astype(float), index=t[:-1]))
+        ix = np.flatnonzero(manquants > 0)
+        self.lacunes = pd.DataFrame({
+            "debut": t[ix] + self.pas,
+            "fin": t[ix + 1] - self.pas,
+            "pas_manquants": manquants[ix],
+        })
+
+    def _bornes(self, debut, fin) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        d, f = _temps(debut), _temps(fin)
+        i0 = np.searchsorted(self.temps, d, side="left")
+        i1 = np.maximum(np.searchsorted(self.temps, f, side="right"), i0)
+        return d, f, i0, i1
+
+    def heures_attendues(self, debut, fin) -> np.ndarray:
+        """Pas attendus dans [debut, fin] (bornes incluses)."""
+        d, f = _temps(debut), _temps(fin)
+        return np.maximum((f - d) // self.pas + 1, 0)
+
+    def heures_valides(self, debut, fin) -> np.ndarray:
+        _, _, i0, i1 = self._bornes(debut, fin)
+        return i1 - i0
+
+    def completude(self, debut, fin) -> np.ndarray:
+        """Part des pas attendus présents (0 à 1)."""
+        attendues = self.heures_attendues(debut, fin)
+        return np.where(attendues > 0, self.heures_valides(debut, fin) / np.maximum(attendues, 1), np.nan)
+
+    def lacunes_fenetre(self, debut, fin) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (nombre de lacunes, plus longue lacune en pas) dans [debut, fin] : lacunes
+        entre instants valides de la fenêtre, plus le début et la fin de fenêtre
+        sans mesure. Une fenêtre sans mesure est une seule lacune.
+        """
+        d, f, i0, i1 = self._bornes(debut, fin)
+        attendues = self.heures_attendues(d, f)
+        vide = i1 == i0
+        # lacunes internes : écarts entre les positions [i0, i1 - 1[ (bornées, fenêtre vide traitée à part)
+        n = max(len(self.temps) - 1, 0)
+        premier = np.minimum(i0, n)
+        dernier = np.clip(i1 - 1, premier, n)
+        nb = self._lacunes.somme_pos(premier, dernier).astype(np.int64)
+        plus_longue = np.nan_to_num(self._manquants.extreme_pos("max", premier, dernier), nan=0.0)
+        if len(self.temps):
+            tete = np.where(vide, 0, (self.temps[premier] - d) // self.pas)
+            queue = np.where(vide, 0, (f - self.temps[dernier]) // self.pas)
+        else:
+            tete = queue = np.zeros(len(d), dtype=np.int64)
+        nb = nb + (tete > 0) + (queue > 0)
+        plus_longue = np.maximum(plus_longue, np.maximum(tete, queue))
+        nb = np.where(vide, (attendues > 0).astype(np.int64), nb)
+        plus_longue = np.where(vide, attendues, plus_longue)
+        return nb, plus_longue
+
+    def heures_jour(self, jours) -> np.ndarray:
+        """Heures valides de chaque jour (0 hors de la série)."""
+        pos = (_temps(jours).astype("datetime64[D]") - self.premier_jour) // UN_JOUR
+        dedans = (pos >= 0) & (pos < len(self.par_jour))
+        return np.where(dedans, self.par_jour[np.where(dedans, pos, 0)] if len(self.par_jour) else 0, 0)
+
+    def jours_couverts(self, jours, min_heures: int = MIN_HEURES_JOUR) -> np.ndarray:
+        return self.heures_jour(jours) >= min_heures
+
+    def jours_sous_couverts(self, debut, fin, min_heures: int = MIN_HEURES_JOUR) -> np.ndarray:
+        """Jours de [debut, fin] (jours calendaires entamés) de moins de min_heures heures valides."""
+        a = _temps(debut).astype("datetime64[D]")
+        b = _temps(fin).astype("datetime64[D]")
+        n = np.maximum((b - a) // UN_JOUR + 1, 0)
+        if not len(self.par_jour):
+            return n
+        c = _cumul(self.par_jour >= min_heures)
+        i0 = np.clip((a - self.premier_jour) // UN_JOUR, 0, len(self.par_jour))
+        i1 = np.clip((b - self.premier_jour) // UN_JOUR + 1, i0, len(self.par_jour))
+        return n - (c[i1] - c[i0]).astype(np.int64)
+
+    def table(self, fenetres=PERIODES, min_heures: int = MIN_HEURES_JOUR) -> pd.DataFrame:
+        """
+        Par fenêtre : heures_attendues, heures_valides, completude, nb_lacunes,
+        plus_longue_lacune_h et jours_sous_couverts (jours de la fenêtre avec
+        moins de min_heures heures valides).
+        """
+        fen = fenetres_table(fenetres)
+        d = fen["debut"].to_numpy(dtype="datetime64[ns]")
+        f = fen["fin"].to_numpy(dtype="datetime64[ns]")
+        out = fen.copy()
+        out["heures_attendues"] = self.heures_attendues(d, f)
+        out["heures_valides"] = self.heures_valides(d, f)
+        out["completude"] = self.completude(d, f)
+        nb, plus_longue = self.lacunes_fenetre(d, f)
+        out["nb_lacunes"] = nb
+        out["plus_longue_lacune_h"] = plus_longue * (self.pas / np.timedelta64(1, "h"))
+        out["jours_sous_couverts"] = self.jours_sous_couverts(d, f, min_heures)
+        return out
+
+
+def masquer_jours(daily: pd.DataFrame, couvertures: Dict[str, IndexCouverture], min_heures: int = MIN_HEURES_JOUR) -> pd.DataFrame:
+    """
+    Copie de la table journalière où chaque colonne présente dans `couvertures`
+    (colonne -> IndexCouverture de sa série horaire) est mise à NaN les jours de
+    moins de min_heures heures valides.
+    """
+    out = daily.copy()
+    jours = daily.index.to_numpy(dtype="datetime64[ns]")
+    for col, cv in couvertures.items():
+        if col in out.columns:
+            out[col] = out[col].where(cv.jours_couverts(jours, min_heures))
+    return out
+
+
+# -----------------------------
+# Sources BDMOMA
+# -----------------------------
+
+def couvertures_sources(
+    meteo_horaire: pd.DataFrame = None,
+    maree: pd.DataFrame = None,
+    houle_horaire: pd.DataFrame = None,
+    variables: Dict[str, Tuple[str, str]] = VARIABLES,
+) -> Dict[str, IndexCouverture]:
+    """IndexCouverture de chaque variable dont la source est fournie (météo indexée par le temps)."""
+    series = {}
+    if meteo_horaire is not None:
+        series["meteo"] = meteo_horaire
+    if maree is not None:
+        series["maree"] = maree.set_index("Date")
+    if houle_horaire is not None:
+        series["houle"] = houle_horaire.set_index("time")
+    couvertures = {}
+    for variable, (source, colonne) in variables.items():
+        if source not in series or colonne not in series[source].columns:
+            print(f"Variable ignorée ({variable}) : {source}.{colonne} absente")
+            continue
+        couvertures[variable] = IndexCouverture(series[source][colonne])
+    return couvertures
+
+
+def main():
+    meteo_horaire = meteo.charger_dossier(meteo.CHEMIN_DOSSIER, meteo.N_PROCESSUS, meteo.CACHE, meteo.COMPACT)
+    maree = marnage.charger_donnees(marnage.DOSSIER, marnage.N_PROCESSUS, marnage.CACHE)
+    houle_horaire = houle.CACHE.lire(houle.CHEMIN_FICHIER, houle.lire_houle) if houle.CACHE is not None else houle.lire_houle(houle.CHEMIN_FICHIER)
+
+    couvertures = couvertures_sources(meteo_horaire, maree, houle_horaire)
+    par_periode, lacunes = [], []
+    for variable, cv in couvertures.items():
+        res = cv.table(PERIODES, MIN_HEURES_JOUR)
+        res.insert(0, "variable", variable)
+        par_periode.append(res)
+        lac = cv.lacunes.copy()
+        lac.insert(0, "variable", variable)
+        lacunes.append(lac)
+    fichiers = sorties.exporter({
+        "par_periode": pd.concat(par_periode, ignore_index=True),
+        "lacunes": pd.concat(lacunes, ignore_index=True),
+    }, SORTIE)
+    print(f"Fichiers exportés : {', '.join(str(f) for f in fichiers)}")
+
+
+if __name__ == "__main__":
+    main()
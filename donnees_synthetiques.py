@@ -0,0 +1,155 @@
+from pathlib import Path
+from typing import List
+import pandas as pd
+import numpy as np
+
+# Dernière année générée : n années couvrent [ANNEE_FIN - n + 1, ANNEE_FIN]
+ANNEE_FIN = 2022
+
+# Périodes des marées (h) : M2 et S2, d'où le cycle vives-eaux / mortes-eaux
+PERIODE_M2_H = 12.42
+PERIODE_S2_H = 12.0
+
+
+def _heures(annee_debut: int, annee_fin: int) -> pd.DatetimeIndex:
+    return pd.date_range(f"{annee_debut}-01-01", f"{annee_fin}-12-31 23:00", freq="h")
+
+
+def _texte(x: np.ndarray, decimales: int) -> pd.Series:
+    return pd.Series(np.round(x, decimales)).astype(str)
+
+
+# -----------------------------
+# Marée : fichiers SHOM (format RAM)
+# -----------------------------
+
+def generer_shom(dossier: Path, annees: int, graine: int = 0) -> List[Path]:
+    """
+    Un fichier RAM par année (<année>_dieppe.txt) : en-têtes commentés,
+    commentaires intercalés, lignes sans ';', sources 4 et 5 mêlées
+    d'autres sources (doublons horaires), lacunes ; latin-1 une année sur deux.
+    """
+    rng = np.random.default_rng(graine)
+    dossier = Path(dossier)
+    dossier.mkdir(parents=True, exist_ok=True)
+    fichiers = []
+    for annee in range(ANNEE_FIN - annees + 1, ANNEE_FIN + 1):
+        t = _heures(annee, annee)
+        h_depuis_2000 = (t - pd.Timestamp("2000-01-01")) / pd.Timedelta(hours=1)
+        h = (4.9 + 3.3 * np.cos(2 * np.pi * h_depuis_2000 / PERIODE_M2_H)
+             + 0.9 * np.cos(2 * np.pi * h_depuis_2000 / PERIODE_S2_H)
+             + rng.normal(0, 0.05, len(t)))
+        source = np.where(rng.random(len(t)) < 0.8, 4, 5)
+        garde = rng.random(len(t)) > 0.05  # lacunes
+        lignes = pd.DataFrame({
+            "t": t[garde],
+            "ligne": t[garde].strftime("%d/%m/%Y %H:%M:%S") + ";" + _texte(h[garde], 3) + ";" + pd.Series(source[garde]).astype(str),
+        })
+        # doublons d'autres sources (prédictions, données brutes non retenues)
+        autres = rng.random(len(t)) < 0.03
+        doublons = pd.DataFrame({
+            "t": t[autres],
+            "ligne": t[autres].strftime("%d/%m/%Y %H:%M:%S") + ";" + _texte(h[autres] + 0.2, 3) + ";" + pd.Series(rng.integers(1, 4, autres.sum())).astype(str),
+        })
+        lignes = pd.concat([lignes, doublons], ignore_index=True).sort_values("t", kind="stable")["ligne"]
+
+        corps = lignes.tolist()
+        for k in range(0, len(corps), 2000):
+            corps.insert(k, "# reprise de la série - données validées")
+        corps.insert(len(corps) // 2, "FIN DE BLOC")
+        encodage = "latin-1" if annee % 2 else "utf-8"
+        f = dossier / f"{annee}_dieppe.txt"
+        f.write_text("# SHOM RAM - marégraphe de Dieppe\n# Date;Valeur;Source\n" + "\n".join(corps) + "\n", encoding=encodage)
+        fichiers.append(f)
+    return fichiers
+
+
+# -----------------------------
+# Météo : CSV horaires Météo-France
+# -----------------------------
+
+def generer_meteo(dossier: Path, annees: int, graine: int = 0, annees_par_fichier: int = 8, poste: str = "76217002") -> List[Path]:
+    """
+    CSV horaires ';' à virgule décimale (H_76_<début>-<fin>.csv) du poste
+    NUM_POSTE=`poste`, avec valeurs manquantes et artefacts de saisie
+    ("1029 1", "- 1").
+    """
+    rng = np.random.default_rng(graine)
+    dossier = Path(dossier)
+    dossier.mkdir(parents=True, exist_ok=True)
+    debut = ANNEE_FIN - annees + 1
+    fichiers = []
+    for a in range(debut, ANNEE_FIN + 1, annees_par_fichier):
+        b = min(a + annees_par_fichier - 1, ANNEE_FIN)
+        t = _heures(a, b)
+        n = len(t)
+        jour = t.dayofyear.to_numpy()
+        saison = 11 - 7 * np.cos(2 * np.pi * (jour - 15) / 365.25)
+        temp = saison + rng.normal(0, 3, n)
+        vent = rng.gamma(2.0, 2.8, n)
+        valeurs = {
+            "RR1": np.where(rng.random(n) < 0.12, rng.exponential(1.2, n), 0.0),
+            "T": temp,
+            "TN": temp - rng.gamma(2, 1, n),
+            "TX": temp + rng.gamma(2, 1, n),
+            "FF": vent,
+            "FXI": vent * rng.uniform(1.3, 2.2, n),
+            "DD": rng.integers(0, 36, n) * 10.0,
+            "PMER": 1015 + rng.normal(0, 9, n),
+            "PMERMIN": 1012 + rng.normal(0, 9, n),
+            "U": np.clip(rng.normal(80, 10, n), 20, 100),
+        }
+        df = pd.DataFrame({
+            "NUM_POSTE": poste,
+            "NOM_USUEL": "DIEPPE",
+            "DATE": t.strftime("%Y%m%d%H"),
+        })
+        for col, v in valeurs.items():
+            s = _texte(v, 1).str.replace(".", ",", regex=False)
+            s[rng.random(n) < 0.01] = ""
+            df[col] = s
+        # artefacts de saisie
+        idx = rng.choice(n, max(1, n // 2000), replace=False)
+        df.loc[idx, "PMER"] = df.loc[idx, "PMER"].str.replace(",", " ", regex=False)
+        idx = rng.choice(n, max(1, n // 5000), replace=False)
+        df.loc[idx, "TN"] = "- 1"
+        f = dossier / f"H_76_{a}-{b}.csv"
+        df.to_csv(f, sep=";", index=False)
+        fichiers.append(f)
+    return fichiers
+
+
+# -----------------------------
+# Houle : rejeu horaire (time, hs, t02, dp...)
+# -----------------------------
+
+def generer_houle(chemin: Path, annees: int, graine: int = 0) -> Path:
+    """CSV de rejeu horaire au format du fichier 167730_..._rc.csv (colonnes superflues comprises)."""
+    rng = np.random.default_rng(graine)
+    chemin = Path(chemin)
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    t = _heures(ANNEE_FIN - annees + 1, ANNEE_FIN)
+    n = len(t)
+    hs = np.clip(rng.gamma(1.8, 0.55, n) * (1.4 - 0.4 * np.cos(2 * np.pi * t.dayofyear.to_numpy() / 365.25)), 0.05, None)
+    df = pd.DataFrame({
+        "time": t.strftime("%Y-%m-%d %H:%M:%S"),
+        "longitude": 1.05,
+        "latitude": 49.95,
+        "hs": np.round(hs, 3),
+        "t02": np.round(3.5 + 1.8 * np.sqrt(hs) + rng.normal(0, 0.3, n), 2),
+        "dp": np.round(np.rad2deg(rng.vonmises(np.deg2rad(260 - 360), 1.5, n)) % 360, 1),
+        "fp": 0.1,
+        "dir": np.round(rng.uniform(0, 360, n), 1),
+    })
+    df.to_csv(chemin, index=False)
+    return chemin
+
+
+def generer_tout(dossier: Path, annees: int, graine: int = 0) -> dict:
+    """Les trois sources pour `annees` années-station, sous dossier/{maree,meteo,houle}."""
+    dossier = Path(dossier)
+    return {
+        "maree": generer_shom(dossier / "maree", annees, graine),
+        "meteo": generer_meteo(dossier / "meteo", annees, graine),
+        "houle": generer_houle(dossier / "houle" / "rejeu_rc.csv", annees, graine),
+    }
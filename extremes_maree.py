@@ -0,0 +1,99 @@
+from typing import Dict
+import pandas as pd
+import numpy as np
+from memoire import en_float64
+
+# Une pleine (basse) mer est le maximum (minimum) des hauteurs à ± DEMI_FENETRE ;
+# la marée semi-diurne (12 h 25) n'en place qu'une dans cet intervalle
+DEMI_FENETRE = pd.Timedelta(hours=5)
+# Au-delà, deux extrêmes successifs sont séparés par une lacune et ne forment pas une marée
+ECART_MAX = pd.Timedelta(hours=9)
+# Un extrême doit avoir des mesures de part et d'autre à moins de cet écart
+# (exclut les bords de série et de lacune, où le glissant est tronqué)
+ECART_VOISIN = pd.Timedelta(hours=3)
+# Seuil de marnage des vives-eaux (m), comme jours_marnage>8m
+SEUIL_VIVE_EAU_M = 8.0
+
+UNE_HEURE = np.timedelta64(1, "h")
+
+
+def _affiner(temps: np.ndarray, h: np.ndarray, pos: np.ndarray):
+    """
+    Extrême sous-horaire : parabole passant par le point et ses deux voisins
+    lorsqu'ils sont à ± 1 h ; hauteur et heure de l'échantillon sinon.
+    """
+    t, v = temps[pos].copy(), h[pos].astype(float)
+    ok = (pos > 0) & (pos < len(h) - 1)
+    p = pos[ok]
+    ok[ok] = (temps[p] - temps[p - 1] == UNE_HEURE) & (temps[p + 1] - temps[p] == UNE_HEURE)
+    p = pos[ok]
+    a, b, c = h[p - 1].astype(float), h[p].astype(float), h[p + 1].astype(float)
+    courbure = a - 2 * b + c
+    ok2 = courbure != 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = np.clip(np.where(ok2, (a - c) / (2 * courbure), 0.0), -0.5, 0.5)
+    v[ok] = b + 0.5 * (c - a) * dx + 0.5 * courbure * dx * dx
+    t[ok] = t[ok] + (dx * 3600e9).astype("timedelta64[ns]")
+    return t, v
+
+
+def extremes(hauteur: pd.Series) -> pd.DataFrame:
+    """
+    Pleines et basses mers d'une série de hauteurs (index temps), détectées en
+    une passe vectorisée : extremum glissant sur ± DEMI_FENETRE, puis
+    alternance imposée (parmi des extrêmes successifs de même type, sans
+    lacune entre eux, seul le plus marqué est gardé).
+    Colonnes : temps, hauteur (affinée à l'heure près), type (+1 PM, -1 BM).
+    """
+    h = en_float64(hauteur.dropna())
+    if not h.index.is_monotonic_increasing:
+        h = h.sort_index()
+    fenetre = 2 * DEMI_FENETRE
+    pm = (h == h.rolling(fenetre, center=True, closed="both").max()).to_numpy()
+    bm = (h == h.rolling(fenetre, center=True, closed="both").min()).to_numpy()
+    type_ = np.where(pm & ~bm, 1, np.where(bm & ~pm, -1, 0))
+    temps = h.index.to_numpy(dtype="datetime64[ns]")
+    ecart = np.diff(temps)
+    encadre = np.r_[False, ecart <= ECART_VOISIN] & np.r_[ecart <= ECART_VOISIN, False]
+    type_[~encadre] = 0
+
+    pos = np.flatnonzero(type_)
+    valeurs = h.to_numpy()
+    if len(pos) == 0:
+        return pd.DataFrame({"temps": pd.to_datetime([]), "hauteur": [], "type": np.array([], dtype=np.int8)})
+
+    # groupes d'extrêmes successifs de même type ; le plus haut (PM) ou le plus bas (BM) l'emporte
+    t, s = type_[pos], temps[pos]
+    rupture = np.r_[True, (t[1:] != t[:-1]) | (s[1:] - s[:-1] > ECART_MAX)]
+    groupe = np.cumsum(rupture)
+    score = valeurs[pos] * t
+    ordre = np.lexsort((pos, -score, groupe))
+    garde = ordre[np.r_[True, groupe[ordre][1:] != groupe[ordre][:-1]]]
+    pos = pos[np.sort(garde)]
+
+    t_fin, v_fin = _affiner(temps, valeurs, pos)
+    return pd.DataFrame({"temps": t_fin, "hauteur": v_fin, "type": type_[pos].astype(np.int8)})
+
+
+def marnages_marees(ext: pd.DataFrame) -> pd.Series:
+    """
+    Marnage de chaque marée : pleine mer moins la basse mer qui la suit
+    (à moins de ECART_MAX), daté de la pleine mer.
+    """
+    t = ext["temps"].to_numpy()
+    h = ext["hauteur"].to_numpy()
+    typ = ext["type"].to_numpy()
+    ok = (typ[:-1] == 1) & (typ[1:] == -1) & (t[1:] - t[:-1] <= ECART_MAX)
+    return pd.Series(h[:-1][ok] - h[1:][ok], index=pd.DatetimeIndex(t[:-1][ok], name="Date"), name="marnage")
+
+
+def marnage_journalier_marees(marees: pd.Series) -> pd.Series:
+    """Marnage journalier : plus grande marée dont la pleine mer tombe ce jour-là."""
+    return marees.groupby(marees.index.floor("D")).max()
+
+
+def tables_marees(hauteur: pd.Series) -> Dict[str, pd.Series]:
+    """Extrêmes, marnages par marée et par jour, calculés une fois sur toute la série."""
+    ext = extremes(hauteur)
+    marees = marnages_marees(ext)
+    return {"extremes": ext, "marees": marees, "jours": marnage_journalier_marees(marees)}
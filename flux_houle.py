@@ -0,0 +1,268 @@
+from pathlib import Path
+from typing import Iterator, List, Tuple
+import pandas as pd
+import numpy as np
+import codeetatdemer as houle
+from balayage import RHO, G
+from index_cumule import IndexCumule, _temps
+from periodes import PERIODES
+from instrumentation import etape
+
+TAILLE_BLOC = 500_000  # lignes du rejeu lues par bloc
+
+# Médiane de hs : distribution exacte (valeur -> effectif) par période tant
+# qu'elle compte moins de MAX_VALEURS_DISTINCTES valeurs ; au-delà, les valeurs
+# sont arrondies à RESOLUTION_MEDIANE_M (médiane à ± RESOLUTION_MEDIANE_M / 2).
+# Les rejeux à 3 décimales restent exacts.
+MAX_VALEURS_DISTINCTES = 100_000
+RESOLUTION_MEDIANE_M = 0.001
+
+# Le rejeu est trié par date : une date déjà vue ne peut revenir (recouvrement
+# d'extractions successives) qu'à moins de MARGE_DOUBLONS de la dernière date lue
+MARGE_DOUBLONS = np.timedelta64(7, "D")
+
+# cumuls additifs par période ; maxima combinés par max
+SOMMES = ["nb_points", "n_hs", "s_hs", "s2_hs", "n_hs>3", "n_hs>4", "n_t02", "s_t02", "n_ouest", "n_dp", "sin_dp", "cos_dp"]
+MAXIMA = ["hs", "t02"]
+
+
+# -----------------------------
+# Lecture en flux
+# -----------------------------
+
+def lire_houle_blocs(chemin: Path, taille_bloc: int = TAILLE_BLOC) -> Iterator[pd.DataFrame]:
+    """
+    Rejeu lu par blocs de taille_bloc lignes (time/hs/t02/dp, float32), dates
+    converties et invalides écartées ; les blocs ne sont pas triés entre eux.
+    """
+    colonnes = pd.read_csv(chemin, sep=",", nrows=0).columns
+    for col in houle.COLONNES_HOULE:
+        if col not in colonnes:
+            raise ValueError(f"Colonne manquante : {col}")
+    lecteur = pd.read_csv(chemin, sep=",", usecols=houle.COLONNES_HOULE, dtype=houle.TYPES_HOULE, chunksize=taille_bloc)
+    for bloc in lecteur:
+        bloc["time"] = pd.to_datetime(bloc["time"], errors="coerce")
+        yield bloc.dropna(subset=["time"])
+
+
+# -----------------------------
+# Accumulateurs fusionnables
+# -----------------------------
+
+def _fusion_comptes(valeurs: np.ndarray, comptes: np.ndarray, resolution: float = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Regroupe des couples (valeur, effectif) par valeur distincte, éventuellement arrondie."""
+    if resolution is not None:
+        valeurs = np.round(valeurs / resolution) * resolution
+    u, inv = np.unique(valeurs, return_inverse=True)
+    return u, np.bincount(inv, weights=comptes, minlength=len(u)).astype(np.int64)
+
+
+def _mediane_comptes(valeurs: np.ndarray, comptes: np.ndarray) -> float:
+    """Médiane (comme pandas : moyenne des deux valeurs centrales) d'une distribution valeur -> effectif."""
+    n = int(comptes.sum())
+    if n == 0:
+        return np.nan
+    cumul = np.cumsum(comptes)
+    a = valeurs[np.searchsorted(cumul, (n - 1) // 2, side="right")]
+    b = valeurs[np.searchsorted(cumul, n // 2, side="right")]
+    return float(np.quantile([a, b], 0.5))
+
+
+class AccumulateurHoule:
+    """
+    Agrégats de houle par période, mis à jour bloc par bloc : la mémoire
+    dépend du nombre de périodes, de la taille d'un bloc et des dates des
+    MARGE_DOUBLONS dernières heures lues, pas de la longueur du rejeu. Une date
+    déjà vue n'est pas recomptée : la première ligne l'emporte, comme dans
+    codeetatdemer.nettoyer_houle. Le rejeu est supposé trié (blocs triés ou non
+    en interne) : une ligne antérieure de plus de MARGE_DOUBLONS à la dernière
+    date lue lève ValueError. Deux accumulateurs sur les mêmes périodes et
+    couvrant des plages de dates disjointes se combinent par fusionner()
+    (tronçons successifs lus par des processus différents).
+    """
+
+    def __init__(self, periodes: List[Tuple[str, str]] = PERIODES):
+        self.periodes = list(periodes)
+        self.debuts = _temps([a for a, _ in self.periodes])
+        self.fins = _temps([b for _, b in self.periodes])
+        p = len(self.periodes)
+        self.sommes = {nom: np.zeros(p) for nom in SOMMES}
+        self.maxima = {nom: np.full(p, -np.inf) for nom in MAXIMA}
+        self.hs_valeurs = [np.empty(0) for _ in range(p)]
+        self.hs_comptes = [np.empty(0, dtype=np.int64) for _ in range(p)]
+        self.mediane_exacte = np.ones(p, dtype=bool)
+        # première et dernière dates lues, dates lues depuis dernier - MARGE_DOUBLONS
+        self.premier = self.dernier = None
+        self.recents = np.empty(0, dtype="datetime64[ns]")
+        self.nb_doublons = 0
+
+    def _ajouter_distribution(self, k: int, valeurs: np.ndarray, comptes: np.ndarray) -> None:
+        v = np.concatenate([self.hs_valeurs[k], valeurs])
+        c = np.concatenate([self.hs_comptes[k], comptes])
+        if not self.mediane_exacte[k]:
+            v, c = _fusion_comptes(v, c, RESOLUTION_MEDIANE_M)
+        else:
+            v, c = _fusion_comptes(v, c)
+            if len(v) > MAX_VALEURS_DISTINCTES:
+                self.mediane_exacte[k] = False
+                v, c = _fusion_comptes(v, c, RESOLUTION_MEDIANE_M)
+        self.hs_valeurs[k], self.hs_comptes[k] = v, c
+
+    def ajouter(self, bloc: pd.DataFrame) -> None:
+        """
+        Ajoute le bloc suivant du rejeu (time datetime64, hs, t02, dp), trié ou
+        non en interne ; les dates déjà vues sont écartées.
+        """
+        if bloc.empty:
+            return
+        temps = bloc["time"].to_numpy(dtype="datetime64[ns]")
+        nouveau = ~pd.Series(temps).duplicated().to_numpy()
+        if self.dernier is not None:
+            anciens = temps < self.dernier - MARGE_DOUBLONS
+            if anciens.any():
+                raise ValueError(
+                    f"Rejeu non trié : {temps[anciens].min()} lu après {self.dernier} "
+                    f"(écart supérieur à MARGE_DOUBLONS = {MARGE_DOUBLONS})"
+                )
+            pos = np.minimum(np.searchsorted(self.recents, temps), len(self.recents) - 1)
+            nouveau &= self.recents[pos] != temps
+        if not nouveau.all():
+            self.nb_doublons += int((~nouveau).sum())
+            bloc, temps = bloc[nouveau], temps[nouveau]
+        if bloc.empty:
+            return
+        self.premier = temps.min() if self.premier is None else min(self.premier, temps.min())
+        self.dernier = temps.max() if self.dernier is None else max(self.dernier, temps.max())
+        recents = np.union1d(self.recents, temps)
+        self.recents = recents[recents >= self.dernier - MARGE_DOUBLONS]
+        t = pd.DatetimeIndex(temps)
+        hs = IndexCumule(pd.Series(bloc["hs"].to_numpy(), index=t))
+        t02 = IndexCumule(pd.Series(bloc["t02"].to_numpy(), index=t))
+        dp = IndexCumule(pd.Series(bloc["dp"].to_numpy(), index=t), directions=True)
+        d, f = self.debuts, self.fins
+
+        n, s, s2 = hs.moments(d, f)
+        n_t02, s_t02, _ = t02.moments(d, f)
+        sin, cos = dp.sommes_directions(d, f)
+        increments = {
+            "nb_points": hs.nb_points(d, f),
+            "n_hs": n, "s_hs": s, "s2_hs": s2,
+            "n_hs>3": hs.nb_sup(3, d, f),
+            "n_hs>4": hs.nb_sup(4, d, f),
+            "n_t02": n_t02, "s_t02": s_t02,
+            "n_ouest": dp.nb_entre(240, 300, d, f),
+            "n_dp": dp.nb(d, f), "sin_dp": sin, "cos_dp": cos,
+        }
+        for nom, x in increments.items():
+            self.sommes[nom] += x
+        self.maxima["hs"] = np.fmax(self.maxima["hs"], hs.maximum(d, f))
+        self.maxima["t02"] = np.fmax(self.maxima["t02"], t02.maximum(d, f))
+
+        # distribution de hs, seulement pour les périodes touchées par le bloc
+        i0, i1 = hs.bornes(d, f)
+        for k in np.flatnonzero(i1 > i0):
+            v = hs.valeurs[i0[k]:i1[k]]
+            v, c = np.unique(v[~np.isnan(v)], return_counts=True)
+            if len(v):
+                self._ajouter_distribution(k, v, c)
+
+    def fusionner(self, autre: "AccumulateurHoule") -> "AccumulateurHoule":
+        """Ajoute les agrégats d'un autre accumulateur construit sur les mêmes périodes."""
+        if autre.periodes != self.periodes:
+            raise ValueError("Accumulateurs construits sur des périodes différentes")
+        if autre.dernier is None:
+            return self
+        if self.dernier is not None and not (self.dernier < autre.premier or autre.dernier < self.premier):
+            # les agrégats ne se défont pas : une date comptée des deux côtés le resterait
+            raise ValueError(
+                f"Accumulateurs aux plages de dates qui se recouvrent : "
+                f"{self.premier} → {self.dernier} et {autre.premier} → {autre.dernier}"
+            )
+        self.premier = autre.premier if self.premier is None else min(self.premier, autre.premier)
+        self.dernier = autre.dernier if self.dernier is None else max(self.dernier, autre.dernier)
+        recents = np.union1d(self.recents, autre.recents)
+        self.recents = recents[recents >= self.dernier - MARGE_DOUBLONS]
+        self.nb_doublons += autre.nb_doublons
+        for nom in SOMMES:
+            self.sommes[nom] += autre.sommes[nom]
+        for nom in MAXIMA:
+            self.maxima[nom] = np.fmax(self.maxima[nom], autre.maxima[nom])
+        self.mediane_exacte &= autre.mediane_exacte
+        for k in range(len(self.periodes)):
+            self._ajouter_distribution(k, autre.hs_valeurs[k], autre.hs_comptes[k])
+        return self
+
+    def resultat(self) -> pd.DataFrame:
+        """Table de codeetatdemer.indicateurs_periodes (une ligne par période)."""
+        x = self.sommes
+        with np.errstate(invalid="ignore", divide="ignore"):
+            n = x["n_hs"]
+            hs_moy = np.where(n > 0, x["s_hs"] / n, np.nan)
+            hs_max = np.where(np.isinf(self.maxima["hs"]), np.nan, self.maxima["hs"])
+            energie = (1 / 8) * RHO * G * x["s2_hs"]
+            jours3 = x["n_hs>3"] / 24
+            direction = np.rad2deg(np.arctan2(x["sin_dp"], x["cos_dp"]))
+            colonnes = {
+                "nb_points": x["nb_points"].astype(np.int64),
+                "hs_moy": hs_moy,
+                "hs_max": hs_max,
+                "hs_mediane": np.array([_mediane_comptes(v, c) for v, c in zip(self.hs_valeurs, self.hs_comptes)]),
+                "t02_moy": np.where(x["n_t02"] > 0, x["s_t02"] / x["n_t02"], np.nan),
+                "t02_max": np.where(np.isinf(self.maxima["t02"]), np.nan, self.maxima["t02"]),
+                "energie_moy_Jm2": np.where(n > 0, energie / n, np.nan),
+                "energie_cumulee_Jm2": energie,
+                "jours_houle>3m": jours3,
+                "jours_houle>4m": x["n_hs>4"] / 24,
+                "%_houles_ouest": np.where(x["nb_points"] > 0, x["n_ouest"] / x["nb_points"], np.nan),
+                "dir_moy_deg": np.where(x["n_dp"] > 0, np.where(direction < 0, direction + 360, direction), np.nan),
+                "IFM": np.where(energie > 0, np.log(energie * (1 + jours3)), np.nan),
+                "indice_extreme": np.where(hs_moy > 0, hs_max / hs_moy, np.nan),
+            }
+
+        lignes = []
+        for k, (debut, fin) in enumerate(self.periodes):
+            if colonnes["nb_points"][k] == 0:
+                lignes.append({"période": f"{debut} → {fin}", "nb_points": 0})
+            else:
+                lignes.append({"période": f"{debut} → {fin}", **{nom: v[k] for nom, v in colonnes.items()}})
+        return pd.DataFrame(lignes)
+
+
+# -----------------------------
+# Indicateurs en flux
+# -----------------------------
+
+def indicateurs_periodes_flux(
+    chemin: Path,
+    periodes: List[Tuple[str, str]] = PERIODES,
+    taille_bloc: int = TAILLE_BLOC,
+) -> pd.DataFrame:
+    """
+    Même table que codeetatdemer.indicateurs_periodes(lire_houle(chemin), periodes),
+    sans charger le rejeu : mémoire bornée par taille_bloc et MARGE_DOUBLONS
+    quelle que soit la longueur du fichier (rejeu trié par date, cf.
+    AccumulateurHoule).
+    """
+    acc = AccumulateurHoule(periodes)
+    with etape("indicateurs_flux", source="houle", fichier=Path(chemin).name, periodes=len(periodes)) as e:
+        lignes = 0
+        for bloc in lire_houle_blocs(chemin, taille_bloc):
+            acc.ajouter(bloc)
+            lignes += len(bloc)
+        e.lignes = lignes
+    if acc.nb_doublons:
+        print(f"{acc.nb_doublons} lignes en double écartées")
+    if not acc.mediane_exacte.all():
+        print(f"hs_mediane arrondie à {RESOLUTION_MEDIANE_M} m pour {(~acc.mediane_exacte).sum()} période(s)")
+    return acc.resultat()
+
+
+def main():
+    print(f"Lecture en flux du fichier : {houle.CHEMIN_FICHIER}")
+    res = indicateurs_periodes_flux(houle.CHEMIN_FICHIER, PERIODES, TAILLE_BLOC)
+    houle.exporter(res, houle.SORTIE)
+    print(res)
+
+
+if __name__ == "__main__":
+    main()
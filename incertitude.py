@@ -0,0 +1,456 @@
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import pandas as pd
+import numpy as np
+import code_indicateurs_meteo as meteo
+from code_indicateurs_meteo import _somme_lignes, _rapport
+import codeetatdemer as houle
+import marnage
+import extremes_maree
+from balayage import _Contexte, RHO, G
+from flux_houle import RESOLUTION_MEDIANE_M
+from memoire import en_float64
+from periodes import PERIODES
+from sequences import Sequences
+from instrumentation import etape
+import sorties
+
+SORTIE = Path.home() / "Downloads" / "incertitude_indicateurs.xlsx"
+
+# Bootstrap par blocs mobiles : les jours de chaque période sont rééchantillonnés
+# par blocs de LONGUEUR_BLOC_J jours consécutifs (l'autocorrélation à l'intérieur
+# d'un bloc est conservée) ; intervalle de confiance par percentiles au NIVEAU donné.
+N_REPLIQUES = 1000
+LONGUEUR_BLOC_J = 10
+NIVEAU = 0.95
+GRAINE = 0
+
+# Répliques x jours traités ensemble (mémoire d'une matrice de tirage)
+MAX_VALEURS_LOT = 5_000_000
+# Météo : répliques mises bout à bout et indexées (une vingtaine de séries et
+# leurs tables d'extrêmes par jour tiré), d'où des lots plus petits
+MAX_JOURS_LOT_METEO = 200_000
+# Médiane de hs : au-delà de ce nombre de valeurs distinctes sur la période,
+# hs est arrondi à RESOLUTION_MEDIANE_M (cf. flux_houle)
+MAX_CLASSES_MEDIANE = 10_000
+
+
+# -----------------------------
+# Tirages par blocs mobiles
+# -----------------------------
+
+def indices_blocs(n_jours: int, n_repliques: int, longueur_bloc: int = LONGUEUR_BLOC_J, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Positions des jours tirés (matrice répliques x n_jours) : chaque ligne
+    enchaîne des blocs de longueur_bloc jours consécutifs, de début uniforme
+    dans [0, n_jours - longueur_bloc], tronquée à n_jours.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    l = max(1, min(longueur_bloc, n_jours))
+    nb_blocs = -(-n_jours // l)
+    debuts = rng.integers(0, n_jours - l + 1, size=(n_repliques, nb_blocs))
+    return (debuts[:, :, None] + np.arange(l)).reshape(n_repliques, nb_blocs * l)[:, :n_jours]
+
+
+class _Tirage:
+    """Colonnes d'une table journalière rassemblées selon une matrice de positions, à la demande."""
+
+    def __init__(self, table: pd.DataFrame, positions: np.ndarray, longueur_bloc: int, annexes: dict = None):
+        self.table = table
+        self.positions = positions
+        self.longueur_bloc = max(1, min(longueur_bloc, positions.shape[1]))
+        self.colonnes = set(table.columns)
+        self.annexes = annexes or {}
+        self._matrices: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        if col not in self._matrices:
+            self._matrices[col] = self.table[col].to_numpy(dtype=float)[self.positions]
+        return self._matrices[col]
+
+    def blocs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Premier jour (répliques x blocs) et longueur (par bloc, le dernier tronqué) des blocs tirés."""
+        n, l = self.positions.shape[1], self.longueur_bloc
+        return self.positions[:, ::l], np.minimum(l, n - np.arange(0, n, l))
+
+
+def _repliques(evaluer: Callable[[np.ndarray], Dict[str, np.ndarray]], n: int, noms: List[str],
+               n_repliques: int, longueur_bloc: int, rng: np.random.Generator,
+               max_valeurs: int = MAX_VALEURS_LOT) -> Dict[str, np.ndarray]:
+    """
+    Valeurs de chaque indicateur de `noms` sur n_repliques tirages de n jours,
+    par lots de max_valeurs jours : evaluer(positions) renvoie les valeurs de
+    chaque indicateur pour chaque ligne de la matrice de positions.
+    """
+    if n == 0:
+        return {nom: np.full(n_repliques, np.nan) for nom in noms}
+    lot = max(1, max_valeurs // n)
+    valeurs = {nom: [] for nom in noms}
+    for k in range(0, n_repliques, lot):
+        positions = indices_blocs(n, min(lot, n_repliques - k), longueur_bloc, rng)
+        for nom, v in evaluer(positions).items():
+            valeurs[nom].append(np.broadcast_to(np.asarray(v, dtype=float), (len(positions),)))
+    return {nom: np.concatenate(v) for nom, v in valeurs.items()}
+
+
+def _tirages(registre: Dict[str, Callable], table: pd.DataFrame, noms: List[str], longueur_bloc: int, annexes: dict = None):
+    """evaluer de _repliques pour un registre (cf. balayage._Contexte) sur les tirages des jours de `table`."""
+    def evaluer(positions: np.ndarray) -> Dict[str, np.ndarray]:
+        ctx = _Contexte(registre, _Tirage(table, positions, longueur_bloc, annexes), None, None)
+        return {nom: ctx[nom] for nom in noms}
+    return evaluer
+
+
+def _intervalles(debut: str, fin: str, ponctuel: dict, repliques: Dict[str, np.ndarray], niveau: float) -> pd.DataFrame:
+    """Table longue d'une période : indicateur, valeur (calcul exact), ic_bas, ic_haut, ecart_type (répliques)."""
+    alpha = (1 - niveau) / 2
+    lignes = []
+    for nom, r in repliques.items():
+        r = r[~np.isnan(r)]
+        lignes.append({
+            "periode_debut": debut,
+            "periode_fin": fin,
+            "indicateur": nom,
+            "valeur": ponctuel.get(nom, np.nan),
+            "ic_bas": float(np.quantile(r, alpha)) if len(r) else np.nan,
+            "ic_haut": float(np.quantile(r, 1 - alpha)) if len(r) else np.nan,
+            "ecart_type": float(np.std(r, ddof=1)) if len(r) > 1 else np.nan,
+        })
+    return pd.DataFrame(lignes)
+
+
+# -----------------------------
+# Statistiques par réplique (lignes d'une matrice répliques x jours)
+# -----------------------------
+
+def _nb_sequences(m: np.ndarray, longueur_min: int) -> np.ndarray:
+    """
+    Nombre de séquences d'au moins longueur_min valeurs vraies, par ligne : les
+    lignes sont mises bout à bout dans une Sequences, une fenêtre par ligne.
+    """
+    i0 = np.arange(len(m)) * m.shape[1]
+    return Sequences(pd.Series(m.ravel())).nb_sequences_pos(longueur_min, i0, i0 + m.shape[1])
+
+
+def _max_lignes(x: np.ndarray) -> np.ndarray:
+    """Maximum par ligne, NaN ignorés ; NaN si la ligne ne contient aucune valeur."""
+    if x.shape[1] == 0:
+        return np.full(len(x), np.nan)
+    return np.fmax.reduce(x, axis=1)
+
+
+def _min_lignes(x: np.ndarray) -> np.ndarray:
+    if x.shape[1] == 0:
+        return np.full(len(x), np.nan)
+    return np.fmin.reduce(x, axis=1)
+
+
+def _moyenne_lignes(x: np.ndarray) -> np.ndarray:
+    """Moyenne de chaque ligne, NaN ignorés ; NaN si ligne vide."""
+    n = (~np.isnan(x)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, _somme_lignes(x) / n, np.nan)
+
+
+def _ecart_type_lignes(x: np.ndarray) -> np.ndarray:
+    """Écart-type (ddof=1) de chaque ligne, NaN ignorés ; NaN s'il y a moins de deux valeurs."""
+    n = (~np.isnan(x)).sum(axis=1)
+    ecarts = x - _moyenne_lignes(x)[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 1, np.sqrt(_somme_lignes(ecarts * ecarts) / (n - 1)), np.nan)
+
+
+# -----------------------------
+# Météo (table journalière de resumer_journalier)
+# -----------------------------
+
+def bootstrap_meteo(
+    daily: pd.DataFrame,
+    periodes: List[Tuple[str, str]] = PERIODES,
+    n_repliques: int = N_REPLIQUES,
+    longueur_bloc: int = LONGUEUR_BLOC_J,
+    niveau: float = NIVEAU,
+    graine: int = GRAINE,
+    indicateurs: List[str] = None,
+) -> pd.DataFrame:
+    """
+    Intervalles de confiance des indicateurs de indicateurs_periode, par
+    bootstrap par blocs mobiles des jours de chaque période : les répliques
+    d'un lot sont mises bout à bout dans une table, chacune en est une fenêtre
+    (meteo.FenetresMeteo), évaluée avec INDICATEURS_PERIODE.
+    `valeur` est le calcul exact ; l'unité du vent reste celle des jours réels
+    de la période ; un indicateur dont une colonne manque reste NaN.
+    """
+    noms = meteo.noms_indicateurs(indicateurs)
+    donnees = meteo.DonneesMeteo(daily)
+    rng = np.random.default_rng(graine)
+    tables = []
+    with etape("bootstrap", source="meteo", periodes=len(periodes), repliques=n_repliques):
+        for a, b in periodes:
+            ponctuel = meteo.indicateurs_periode(daily, a, b, noms, donnees)
+            i0, i1, _ = daily.index.slice_indexer(a, b).indices(len(daily))
+            jours = daily.iloc[i0:max(i0, i1)]
+            reel = meteo.FenetresMeteo(meteo.DonneesMeteo(jours), [0], [len(jours)])
+            facteurs = {cle: reel["facteur_" + cle] for cle, col in (("ff", "FF"), ("fxi", "FXI")) if col in reel.colonnes}
+
+            def evaluer(positions: np.ndarray) -> Dict[str, np.ndarray]:
+                k, n = positions.shape
+                debuts = np.arange(k) * n
+                bout_a_bout = meteo.DonneesMeteo(jours.iloc[positions.ravel()])
+                f = {cle: np.repeat(v, k) for cle, v in facteurs.items()}
+                return meteo.evaluer_fenetres(meteo.FenetresMeteo(bout_a_bout, debuts, debuts + n, f), noms)
+
+            rep = _repliques(evaluer, len(jours), noms, n_repliques, longueur_bloc, rng, MAX_JOURS_LOT_METEO)
+            tables.append(_intervalles(a, b, ponctuel, rep, niveau))
+    return pd.concat(tables, ignore_index=True)
+
+
+# -----------------------------
+# Marée (hauteurs Date/Valeur)
+# -----------------------------
+
+def _jours_periode(a: str, b: str) -> pd.DatetimeIndex:
+    return pd.date_range(pd.Timestamp(a).normalize(), pd.Timestamp(b).normalize(), freq="D")
+
+
+def _bornes(a: str, b: str) -> slice:
+    """[a, b] en instants (fin à 00:00 comme dans PERIODES), pas en jours entiers comme .loc["a":"b"]."""
+    return slice(pd.Timestamp(a), pd.Timestamp(b))
+
+
+def table_journaliere_maree(hauteur: pd.Series, marees: pd.Series, jours_marees: pd.Series, a: str, b: str) -> pd.DataFrame:
+    """
+    Agrégats journaliers des indicateurs de marnage sur [a, b] (jours coupés
+    par une borne réduits à leurs points dans la période, comme balayer_maree) :
+    points, marnage du jour, marées détectées (nombre, somme, max, > seuil de
+    vive-eau) et marnage journalier des marées.
+    """
+    jours = _jours_periode(a, b)
+    h = hauteur.loc[_bornes(a, b)]
+    par_jour = h.groupby(h.index.floor("D"))
+    m = marees.loc[_bornes(a, b)]
+    m_jour = m.groupby(m.index.floor("D"))
+    t = pd.DataFrame({
+        "points": par_jour.size(),
+        "marnage": par_jour.max() - par_jour.min(),
+    }).reindex(jours)
+    t["points"] = t["points"].fillna(0)
+    t["nb_marees"] = m_jour.count().reindex(jours, fill_value=0)
+    t["somme_marees"] = m_jour.sum().reindex(jours, fill_value=0.0)
+    t["max_marees"] = m_jour.max().reindex(jours)
+    t["marees_vive_eau"] = (m > extremes_maree.SEUIL_VIVE_EAU_M).groupby(m.index.floor("D")).sum().reindex(jours, fill_value=0)
+    t["marnage_marees"] = jours_marees.loc[_bornes(a, b)].reindex(jours)
+    return t
+
+
+# Mêmes noms que balayage.INDICATEURS_MAREE, sur les tirages de table_journaliere_maree
+INDICATEURS_MAREE: Dict[str, Callable] = {
+    "_vive_eau": lambda c: c.donnees["marnage_marees"] > extremes_maree.SEUIL_VIVE_EAU_M,
+    "nb_points": lambda c: c.donnees["points"].sum(axis=1),
+    "jours_disponibles": lambda c: (~np.isnan(c.donnees["marnage"])).sum(axis=1),
+    "marnage_moy_m": lambda c: _moyenne_lignes(c.donnees["marnage"]),
+    "marnage_max_m": lambda c: _max_lignes(c.donnees["marnage"]),
+    "marnage_min_m": lambda c: _min_lignes(c.donnees["marnage"]),
+    "marnage_std_m": lambda c: _ecart_type_lignes(c.donnees["marnage"]),
+    "jours_marnage>8m": lambda c: (c.donnees["marnage"] > 8).sum(axis=1),
+    "jours_marnage>9m": lambda c: (c.donnees["marnage"] > 9).sum(axis=1),
+    "IAI": lambda c: c["marnage_moy_m"] * c["jours_marnage>8m"],
+    "nb_marees": lambda c: c.donnees["nb_marees"].sum(axis=1),
+    "marnage_maree_moy_m": lambda c: _rapport(c.donnees["somme_marees"].sum(axis=1), c["nb_marees"]),
+    "marnage_maree_max_m": lambda c: _max_lignes(c.donnees["max_marees"]),
+    "marees_marnage>8m": lambda c: c.donnees["marees_vive_eau"].sum(axis=1),
+    "jours_vive_eau": lambda c: c["_vive_eau"].sum(axis=1),
+    "episodes_vive_eau": lambda c: _nb_sequences(c["_vive_eau"], 1),
+    "IAI_marees": lambda c: c["marnage_maree_moy_m"] * c["marees_marnage>8m"],
+    "IAI_vive_eau": lambda c: _moyenne_lignes(c.donnees["marnage_marees"]) * c["jours_vive_eau"],
+}
+
+
+def bootstrap_maree(
+    df: pd.DataFrame,
+    periodes: List[Tuple[str, str]] = PERIODES,
+    n_repliques: int = N_REPLIQUES,
+    longueur_bloc: int = LONGUEUR_BLOC_J,
+    niveau: float = NIVEAU,
+    graine: int = GRAINE,
+) -> pd.DataFrame:
+    """
+    Intervalles de confiance des indicateurs de marnage.indicateurs : les jours
+    de chaque période (agrégats de table_journaliere_maree) sont rééchantillonnés
+    par blocs mobiles. Marées détectées une fois sur toute la série.
+    """
+    hauteur = en_float64(df.set_index("Date")["Valeur"]).sort_index()
+    tables_marees = extremes_maree.tables_marees(hauteur)
+    index = marnage.indexer_maree(df)
+    noms = [nom for nom in INDICATEURS_MAREE if not nom.startswith("_")]
+    rng = np.random.default_rng(graine)
+    tables = []
+    with etape("bootstrap", source="maree", periodes=len(periodes), repliques=n_repliques):
+        for a, b in periodes:
+            ponctuel = marnage.indicateurs(df, a, b, index)
+            jours = table_journaliere_maree(hauteur, tables_marees["marees"], tables_marees["jours"], a, b)
+            if ponctuel["nb_points"] == 0:
+                jours = jours.iloc[:0]
+            rep = _repliques(_tirages(INDICATEURS_MAREE, jours, noms, longueur_bloc), len(jours), noms, n_repliques, longueur_bloc, rng)
+            tables.append(_intervalles(a, b, ponctuel, rep, niveau))
+    return pd.concat(tables, ignore_index=True)
+
+
+# -----------------------------
+# Houle (données horaires time/hs/t02/dp)
+# -----------------------------
+
+def table_journaliere_houle(df: pd.DataFrame, a: str, b: str) -> Tuple[pd.DataFrame, dict]:
+    """
+    Agrégats journaliers additifs (et maxima) des indicateurs de houle sur
+    [a, b], et pour hs_mediane la grille des valeurs de hs avec le nombre de
+    valeurs <= chaque valeur de la grille, cumulé jour après jour.
+    """
+    jours = _jours_periode(a, b)
+    serie = df.set_index("time").loc[_bornes(a, b)]
+    code = ((serie.index.floor("D") - jours[0]) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64) if len(jours) else np.empty(0, dtype=np.int64)
+    hs = en_float64(serie["hs"]).to_numpy()
+    t02 = en_float64(serie["t02"]).to_numpy()
+    dp = en_float64(serie["dp"]).to_numpy()
+    n = len(jours)
+
+    def somme(x):
+        return np.bincount(code, weights=np.asarray(x, dtype=float), minlength=n)
+
+    def maximum(x):
+        out = np.full(n, -np.inf)
+        np.maximum.at(out, code, np.where(np.isnan(x), -np.inf, x))
+        return np.where(np.isinf(out), np.nan, out)
+
+    valide = ~np.isnan(hs)
+    r = np.deg2rad(dp)
+    with np.errstate(invalid="ignore"):
+        t = pd.DataFrame({
+            "nb_points": somme(np.ones(len(hs))),
+            "n_hs": somme(valide), "s_hs": somme(np.nan_to_num(hs)), "s2_hs": somme(np.nan_to_num(hs) ** 2),
+            "max_hs": maximum(hs),
+            "n_hs>3": somme(hs > 3), "n_hs>4": somme(hs > 4),
+            "n_t02": somme(~np.isnan(t02)), "s_t02": somme(np.nan_to_num(t02)), "max_t02": maximum(t02),
+            "n_dp": somme(~np.isnan(dp)), "sin_dp": somme(np.nan_to_num(np.sin(r))), "cos_dp": somme(np.nan_to_num(np.cos(r))),
+            "n_ouest": somme((dp >= 240) & (dp <= 300)),
+        }, index=jours)
+
+    v = hs[valide]
+    grille = np.unique(v)
+    if len(grille) > MAX_CLASSES_MEDIANE:
+        v = np.round(v / RESOLUTION_MEDIANE_M) * RESOLUTION_MEDIANE_M
+        grille = np.unique(v)
+    rang = np.searchsorted(grille, v)
+    comptes = np.bincount(code[valide] * len(grille) + rang, minlength=n * len(grille)).reshape(n, len(grille))
+    # cumuls[j, g] : nombre de valeurs <= grille[g] sur les jours [0, j[
+    cumuls = np.zeros((n + 1, len(grille)), dtype=np.int32 if len(v) < 2 ** 31 else np.int64)
+    np.cumsum(np.cumsum(comptes, axis=1), axis=0, out=cumuls[1:])
+    return t, {"grille": grille, "cumuls": cumuls}
+
+
+def _rang_k(cumuls: np.ndarray, debuts: np.ndarray, longueurs: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """
+    Pour chaque réplique, indice de grille de sa (k+1)-ième plus petite valeur :
+    recherche dichotomique simultanée sur toutes les répliques. Le nombre de
+    valeurs <= grille[g] d'un bloc de jours est une différence de cumuls ;
+    celui d'une réplique, la somme sur ses blocs.
+    """
+    fins = debuts + longueurs
+    bas = np.zeros(len(k), dtype=np.int64)
+    haut = np.full(len(k), cumuls.shape[1] - 1, dtype=np.int64)
+    while (bas < haut).any():
+        milieu = (bas + haut) // 2
+        g = milieu[:, None]
+        n = (cumuls[fins, g] - cumuls[debuts, g]).sum(axis=1, dtype=np.int64)
+        au_dela = n > k
+        haut = np.where(au_dela, milieu, haut)
+        bas = np.where(au_dela, bas, milieu + 1)
+    return bas
+
+
+def _hs_mediane(c: _Contexte) -> np.ndarray:
+    grille, cumuls = c.donnees.annexes["grille"], c.donnees.annexes["cumuls"]
+    n = c["_n_hs"].astype(np.int64)
+    if not len(grille):
+        return np.full(len(n), np.nan)
+    debuts, longueurs = c.donnees.blocs()
+    a = grille[_rang_k(cumuls, debuts, longueurs, np.maximum(n - 1, 0) // 2)]
+    b = grille[_rang_k(cumuls, debuts, longueurs, n // 2)]
+    return np.where(n > 0, 0.5 * (a + b), np.nan)
+
+
+def _ifm(c: _Contexte) -> np.ndarray:
+    e = c["energie_cumulee_Jm2"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(e > 0, np.log(e * (1 + c["jours_houle>3m"])), np.nan)
+
+
+def _direction(c: _Contexte) -> np.ndarray:
+    d = np.rad2deg(np.arctan2(c.donnees["sin_dp"].sum(axis=1), c.donnees["cos_dp"].sum(axis=1)))
+    return np.where(c.donnees["n_dp"].sum(axis=1) > 0, np.where(d < 0, d + 360, d), np.nan)
+
+
+# Mêmes noms que balayage.INDICATEURS_HOULE, sur les tirages de table_journaliere_houle
+INDICATEURS_HOULE: Dict[str, Callable] = {
+    "_n_hs": lambda c: c.donnees["n_hs"].sum(axis=1),
+    "nb_points": lambda c: c.donnees["nb_points"].sum(axis=1),
+    "hs_moy": lambda c: _rapport(c.donnees["s_hs"].sum(axis=1), c["_n_hs"]),
+    "hs_max": lambda c: _max_lignes(c.donnees["max_hs"]),
+    "hs_mediane": _hs_mediane,
+    "t02_moy": lambda c: _rapport(c.donnees["s_t02"].sum(axis=1), c.donnees["n_t02"].sum(axis=1)),
+    "t02_max": lambda c: _max_lignes(c.donnees["max_t02"]),
+    "energie_moy_Jm2": lambda c: _rapport(c["energie_cumulee_Jm2"], c["_n_hs"]),
+    "energie_cumulee_Jm2": lambda c: (1 / 8) * RHO * G * c.donnees["s2_hs"].sum(axis=1),
+    "jours_houle>3m": lambda c: c.donnees["n_hs>3"].sum(axis=1) / 24,
+    "jours_houle>4m": lambda c: c.donnees["n_hs>4"].sum(axis=1) / 24,
+    "%_houles_ouest": lambda c: _rapport(c.donnees["n_ouest"].sum(axis=1), c["nb_points"]),
+    "dir_moy_deg": _direction,
+    "IFM": _ifm,
+    "indice_extreme": lambda c: _rapport(c["hs_max"], c["hs_moy"]),
+}
+
+
+def bootstrap_houle(
+    df: pd.DataFrame,
+    periodes: List[Tuple[str, str]] = PERIODES,
+    n_repliques: int = N_REPLIQUES,
+    longueur_bloc: int = LONGUEUR_BLOC_J,
+    niveau: float = NIVEAU,
+    graine: int = GRAINE,
+) -> pd.DataFrame:
+    """
+    Intervalles de confiance des indicateurs de codeetatdemer.calcul_indicateurs :
+    les jours de chaque période (agrégats horaires de table_journaliere_houle)
+    sont rééchantillonnés par blocs mobiles.
+    """
+    index = houle.indexer_houle(df)
+    noms = [nom for nom in INDICATEURS_HOULE if not nom.startswith("_")]
+    rng = np.random.default_rng(graine)
+    tables = []
+    with etape("bootstrap", source="houle", periodes=len(periodes), repliques=n_repliques):
+        for a, b in periodes:
+            ponctuel = houle.calcul_indicateurs(df, a, b, index)
+            jours, annexes = table_journaliere_houle(df, a, b)
+            if ponctuel["nb_points"] == 0:
+                jours = jours.iloc[:0]
+            rep = _repliques(_tirages(INDICATEURS_HOULE, jours, noms, longueur_bloc, annexes), len(jours), noms, n_repliques, longueur_bloc, rng)
+            tables.append(_intervalles(a, b, ponctuel, rep, niveau))
+    return pd.concat(tables, ignore_index=True)
+
+
+def main():
+    daily = meteo.resumer_journalier(meteo.charger_dossier(meteo.CHEMIN_DOSSIER, meteo.N_PROCESSUS, meteo.CACHE, meteo.COMPACT), meteo.MASQUER_JOURS_SOUS_COUVERTS)
+    maree = marnage.charger_donnees(marnage.DOSSIER, marnage.N_PROCESSUS, marnage.CACHE)
+    houle_horaire = houle.CACHE.lire(houle.CHEMIN_FICHIER, houle.lire_houle) if houle.CACHE is not None else houle.lire_houle(houle.CHEMIN_FICHIER)
+
+    res = {
+        "meteo": bootstrap_meteo(daily, PERIODES, N_REPLIQUES, LONGUEUR_BLOC_J, NIVEAU, GRAINE),
+        "maree": bootstrap_maree(maree, PERIODES, N_REPLIQUES, LONGUEUR_BLOC_J, NIVEAU, GRAINE),
+        "houle": bootstrap_houle(houle_horaire, PERIODES, N_REPLIQUES, LONGUEUR_BLOC_J, NIVEAU, GRAINE),
+    }
+    fichiers = sorties.exporter(res, SORTIE)
+    print(f"{N_REPLIQUES} répliques, blocs de {LONGUEUR_BLOC_J} jours : {', '.join(str(f) for f in fichiers)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import code_indicateurs_meteo as meteo
+import marnage
+import codeetatdemer as houle
+import balayage
+import index_cumule
+import sequences
+from balayage import indexer_houle
+from ingestion import lire_fichiers, fusion_dedoublonnee
+
+# Dossier par défaut de l'état incrémental
+DOSSIER_ETAT_DEFAUT = Path.home() / ".cache" / "bdmoma" / "incremental"
+# Format des tables intermédiaires : un état d'une autre version est reconstruit
+VERSION_ETAT = 3
+SOURCES = ("meteo", "maree", "houle")
+
+Intervalles = List[Tuple[pd.Timestamp, pd.Timestamp]]
+
+
+def _empreinte(f: Path) -> str:
+    st = f.stat()
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def _seuils(module) -> Dict[str, object]:
+    """Constantes du module (noms en majuscules) numériques ou tables de nombres : seuils et réglages des calculs."""
+    seuils = {}
+    for nom, v in vars(module).items():
+        if not nom.isupper() or isinstance(v, str) or not isinstance(v, (int, float, list, tuple, dict)):
+            continue
+        try:
+            seuils[nom] = json.dumps(v, sort_keys=True)
+        except TypeError:
+            continue
+    return seuils
+
+
+def _signature(*objets) -> str:
+    """
+    Empreinte d'une définition de calcul : code source des modules et
+    fonctions donnés, valeurs courantes des seuils des modules (cf. _seuils,
+    un seuil modifié à l'exécution compte), valeurs des autres objets.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for o in objets:
+        if inspect.ismodule(o) or inspect.isfunction(o):
+            h.update(inspect.getsource(o).encode())
+        if inspect.ismodule(o):
+            h.update(json.dumps(_seuils(o), sort_keys=True).encode())
+        elif not inspect.isfunction(o):
+            h.update(json.dumps(o, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _dans(t, intervalles: Intervalles) -> np.ndarray:
+    """Instants de `t` compris dans l'un des intervalles (bornes incluses)."""
+    t = pd.DatetimeIndex(t)
+    m = np.zeros(len(t), dtype=bool)
+    for a, b in intervalles:
+        m |= (t >= a) & (t <= b)
+    return m
+
+
+def _jours_entiers(intervalles: Intervalles) -> Intervalles:
+    """Intervalles étendus aux jours entiers qu'ils touchent."""
+    return [(a.floor("D"), b.floor("D") + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")) for a, b in intervalles]
+
+
+# -----------------------------
+# Tables intermédiaires par fichier
+# -----------------------------
+
+def partiel_meteo(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Lignes horaires d'un fichier, réduites au poste et aux variables agrégées
+    par resumer_journalier : les heures communes à plusieurs fichiers sont
+    dédoublonnées à la fusion, avant l'agrégation journalière.
+    """
+    colonnes = [c for c in [meteo.COLONNE_POSTE, *meteo.AGREGATION_JOURNALIERE] if c in df.columns]
+    return df[colonnes]
+
+
+def fusionner_partiels_meteo(partiels: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Fusionne les lignes horaires de plusieurs fichiers (une ligne par poste et
+    par heure, comme charger_dossier) en la table de resumer_journalier,
+    plus `_heures` : nombre de lignes horaires de chaque jour.
+    """
+    df = fusion_dedoublonnee(partiels, station=meteo.COLONNE_POSTE)
+    daily = meteo.resumer_journalier(df)
+    daily["_heures"] = df.resample("D").size()
+    return daily
+
+
+def completer_journalier(daily: pd.DataFrame) -> pd.DataFrame:
+    """
+    Table journalière recomposée (jours gardés + jours réagrégés) remise dans
+    la forme de resample : du premier au dernier jour ayant au moins une heure
+    lue, jours sans mesure ajoutés (cumuls à 0, autres variables NaN).
+    """
+    daily = daily.sort_index()
+    lus = np.flatnonzero(daily["_heures"].to_numpy() > 0)
+    if not len(lus):
+        return daily.iloc[:0]
+    daily = daily.iloc[lus[0]:lus[-1] + 1]
+    daily = daily.reindex(pd.date_range(daily.index[0], daily.index[-1], freq="D", name=daily.index.name))
+    for col, op in meteo.AGREGATION_JOURNALIERE.items():
+        if op == "sum" and col in daily.columns:
+            daily[col] = daily[col].fillna(0)
+    daily["_heures"] = daily["_heures"].fillna(0).astype(np.int64)
+    return daily
+
+
+# -----------------------------
+# Tables fusionnées par source
+# -----------------------------
+
+class _Source:
+    """
+    Comment une source est fusionnée et mise à jour par intervalles :
+    - temps : instants des lignes (partiels et table fusionnée)
+    - fusionner : partiels -> table fusionnée
+    - completer : table recomposée -> table fusionnée (tri, jours manquants)
+    - jours : une date touchée rend tout son jour à réagréger (météo)
+    - table / indicateurs : empreintes (_signature) des définitions de la table
+      fusionnée et des indicateurs émis
+    """
+
+    def __init__(self, temps, fusionner, completer, jours: bool, table: Callable[[], str], indicateurs: Callable[[], str]):
+        self.temps = temps
+        self.fusionner = fusionner
+        self.completer = completer
+        self.jours = jours
+        self.table = table
+        self.indicateurs = indicateurs
+
+
+def _trier(colonne: str) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    return lambda df: df.sort_values(colonne, kind="stable").reset_index(drop=True)
+
+
+SOURCES_INCREMENTALES: Dict[str, _Source] = {
+    "meteo": _Source(
+        temps=lambda df: df.index,
+        fusionner=fusionner_partiels_meteo,
+        completer=completer_journalier,
+        jours=True,
+        table=lambda: _signature(meteo.resumer_journalier, meteo.AGREGATION_JOURNALIERE, partiel_meteo,
+                                fusionner_partiels_meteo, completer_journalier),
+        indicateurs=lambda: _signature(meteo, index_cumule, sequences),
+    ),
+    "maree": _Source(
+        temps=lambda df: df["Date"],
+        fusionner=lambda parts: fusion_dedoublonnee(parts, "Date", ("Source", marnage.PRIORITE_SOURCES)).reset_index(drop=True),
+        completer=_trier("Date"),
+        jours=False,
+        table=lambda: _signature(marnage.PRIORITE_SOURCES),
+        indicateurs=lambda: _signature(marnage, balayage, index_cumule, sequences),
+    ),
+    "houle": _Source(
+        temps=lambda df: df["time"],
+        fusionner=lambda parts: fusion_dedoublonnee(parts, "time").reset_index(drop=True),
+        completer=_trier("time"),
+        jours=False,
+        table=lambda: _signature(houle.COLONNES_HOULE),
+        indicateurs=lambda: _signature(houle, balayage, index_cumule),
+    ),
+}
+
+
+# -----------------------------
+# État persistant
+# -----------------------------
+
+class EtatIncremental:
+    """
+    État persistant des sources déjà intégrées, dans un dossier :
+    - etat.json : pour chaque source, fichiers intégrés (empreinte taille+mtime,
+      table intermédiaire, dates couvertes), intervalles de dates touchés pas
+      encore répercutés, empreinte de la table fusionnée
+    - une table Parquet intermédiaire par fichier : lignes horaires réduites
+      (météo), hauteurs horaires (marée), hs/t02/dp horaires (houle)
+    - la table fusionnée de chaque source (table_<source>.parquet) : agrégats
+      journaliers (météo), hauteurs ou états de mer sans doublons (marée,
+      houle), le premier fichier par ordre de chemin l'emportant
+    - la dernière table d'indicateurs émise par source, chaque ligne marquée
+      de l'empreinte des définitions qui l'ont produite
+    À chaque mise à jour, seuls les fichiers nouveaux ou modifiés sont lus ;
+    seuls les jours (météo) ou instants touchés sont refusionnés, à partir des
+    seuls fichiers qui les couvrent. Les périodes qui ne recoupent aucune date
+    touchée reprennent la ligne déjà émise si les indicateurs, leurs seuils et
+    leur code n'ont pas changé ; les autres sont recalculées.
+    """
+
+    def __init__(self, dossier: Path = DOSSIER_ETAT_DEFAUT):
+        self.dossier = Path(dossier)
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        self.chemin_etat = self.dossier / "etat.json"
+        self.etat = json.loads(self.chemin_etat.read_text(encoding="utf-8")) if self.chemin_etat.exists() else None
+        if self.etat is None or self.etat.get("version") != VERSION_ETAT:
+            if self.etat is not None:
+                print("État incrémental d'une autre version : reconstruit")
+                for source in SOURCES:
+                    for e in self.etat.get(source, {}).values():
+                        (self.dossier / e["partiel"]).unlink(missing_ok=True)
+                    (self.dossier / f"indicateurs_{source}.parquet").unlink(missing_ok=True)
+                    (self.dossier / f"table_{source}.parquet").unlink(missing_ok=True)
+            self.etat = {"version": VERSION_ETAT, **{s: {} for s in SOURCES},
+                         "touches": {s: [] for s in SOURCES}, "tables": {}}
+
+    def _sauver(self) -> None:
+        tmp = self.chemin_etat.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.etat, indent=1, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.chemin_etat)
+
+    def _touches(self, source: str) -> Intervalles:
+        return [(pd.Timestamp(a), pd.Timestamp(b)) for a, b in self.etat["touches"][source]]
+
+    def _integrer(
+        self,
+        source: str,
+        fichiers: List[Path],
+        lecteur: Callable[[Path], pd.DataFrame],
+        preparer: Callable[[pd.DataFrame], pd.DataFrame],
+        n_processus: int = 1,
+    ) -> Intervalles:
+        """
+        Intègre les fichiers nouveaux/modifiés et oublie les fichiers disparus.
+        Les dates couvertes par les fichiers touchés (ancienne et nouvelle
+        version) s'ajoutent aux intervalles en attente, renvoyés.
+        """
+        connus = self.etat[source]
+        temps = SOURCES_INCREMENTALES[source].temps
+        chemins = {str(Path(f).resolve()): Path(f) for f in fichiers}
+        a_lire = [f for c, f in chemins.items() if connus.get(c, {}).get("empreinte") != _empreinte(f)]
+        disparus = [c for c in connus if c not in chemins]
+
+        touches = self.etat["touches"][source]
+        for c in disparus + [str(f.resolve()) for f in a_lire]:
+            if c in connus and connus[c]["debut"] is not None:
+                touches.append([connus[c]["debut"], connus[c]["fin"]])
+        for c in disparus:
+            (self.dossier / connus.pop(c)["partiel"]).unlink(missing_ok=True)
+
+        for f, df in lire_fichiers(lecteur, a_lire, n_processus):
+            c = str(f.resolve())
+            partiel = preparer(df)
+            nom = f"{source}_{hashlib.blake2b(c.encode(), digest_size=8).hexdigest()}.parquet"
+            partiel.to_parquet(self.dossier / nom)
+            d = temps(partiel)
+            connus[c] = {
+                "empreinte": _empreinte(f),
+                "partiel": nom,
+                "debut": str(d.min()) if len(d) else None,
+                "fin": str(d.max()) if len(d) else None,
+            }
+            if len(d):
+                touches.append([connus[c]["debut"], connus[c]["fin"]])
+            print(f"{f.name} : intégré ({len(partiel)} lignes)")
+
+        self._sauver()
+        return self._touches(source)
+
+    def _partiels(self, source: str, intervalles: Intervalles = None) -> List[pd.DataFrame]:
+        """
+        Tables intermédiaires, dans l'ordre des chemins (à date égale, le
+        premier fichier l'emporte, cf. charger_dossier). Avec `intervalles` :
+        seuls les fichiers qui les recoupent sont lus, réduits à leurs lignes
+        dans ces intervalles.
+        """
+        if not self.etat[source]:
+            raise RuntimeError(f"Aucune donnée intégrée pour la source {source}.")
+        parts = []
+        for _, e in sorted(self.etat[source].items()):
+            if intervalles is not None and (e["debut"] is None or not any(
+                    a <= pd.Timestamp(e["fin"]) and pd.Timestamp(e["debut"]) <= b for a, b in intervalles)):
+                continue
+            df = pd.read_parquet(self.dossier / e["partiel"])
+            if intervalles is not None:
+                df = df[_dans(SOURCES_INCREMENTALES[source].temps(df), intervalles)]
+            parts.append(df)
+        return parts
+
+    def _actualiser_table(self, source: str, touches: Intervalles) -> None:
+        """
+        Répercute les intervalles touchés sur la table fusionnée : les lignes
+        de ces intervalles (jours entiers en météo) sont refusionnées depuis
+        les fichiers qui les couvrent, les autres sont gardées telles quelles.
+        Table reconstruite entièrement si absente ou si sa définition a changé.
+        """
+        s = SOURCES_INCREMENTALES[source]
+        chemin = self.dossier / f"table_{source}.parquet"
+        cle = s.table()
+        if not chemin.exists() or self.etat["tables"].get(source) != cle:
+            table = s.fusionner(self._partiels(source))
+        elif touches:
+            intervalles = _jours_entiers(touches) if s.jours else touches
+            table = pd.read_parquet(chemin)
+            parts = self._partiels(source, intervalles)
+            neuf = s.fusionner(parts) if parts else table.iloc[:0]
+            neuf = neuf[_dans(s.temps(neuf), intervalles)]
+            table = s.completer(pd.concat([table[~_dans(s.temps(table), intervalles)], neuf]))
+        else:
+            return
+        table.to_parquet(chemin)
+        self.etat["tables"][source] = cle
+        self._sauver()
+
+    def _table(self, source: str) -> pd.DataFrame:
+        self._actualiser_table(source, [])
+        return pd.read_parquet(self.dossier / f"table_{source}.parquet")
+
+    def _emettre(self, source: str, periodes: List[Tuple[str, str]], touches: Intervalles, calcul: Callable) -> pd.DataFrame:
+        """
+        Réutilise les lignes des périodes non touchées produites par les mêmes
+        définitions d'indicateurs, recalcule les autres. `calcul()` (table et
+        index) n'est préparé que si une période est à recalculer.
+        """
+        chemin = self.dossier / f"indicateurs_{source}.parquet"
+        precedent = pd.read_parquet(chemin) if chemin.exists() else None
+        cle = SOURCES_INCREMENTALES[source].indicateurs()
+        calculer = None
+        lignes = []
+        nb_recalculees = 0
+        for debut, fin in periodes:
+            recoupe = any(pd.Timestamp(debut) <= b and a < pd.Timestamp(fin) + pd.Timedelta(days=1) for a, b in touches)
+            m = None if precedent is None else (
+                (precedent["_debut"] == debut) & (precedent["_fin"] == fin) & (precedent["_signature"] == cle)
+            )
+            if m is not None and m.any() and not recoupe:
+                ligne = precedent[m].iloc[0].drop(["_debut", "_fin", "_signature"]).to_dict()
+            else:
+                if calculer is None:
+                    calculer = calcul()
+                ligne = calculer(debut, fin)
+                nb_recalculees += 1
+            lignes.append({**ligne, "_debut": debut, "_fin": fin, "_signature": cle})
+        print(f"{source} : {nb_recalculees}/{len(periodes)} périodes recalculées")
+        res = pd.DataFrame(lignes)
+        res.to_parquet(chemin)
+        # intervalles répercutés sur la table et les indicateurs
+        self.etat["touches"][source] = []
+        self._sauver()
+        return res.drop(columns=["_debut", "_fin", "_signature"])
+
+    def _mettre_a_jour(self, source: str, fichiers: List[Path], lecteur, preparer, periodes, calcul, n_processus: int) -> pd.DataFrame:
+        touches = self._integrer(source, fichiers, lecteur, preparer, n_processus)
+        self._actualiser_table(source, touches)
+        return self._emettre(source, periodes, touches, calcul)
+
+    # -----------------------------
+    # Sources
+    # -----------------------------
+
+    def journalier_meteo(self) -> pd.DataFrame:
+        """Table journalière (comme resumer_journalier) tenue à jour depuis les lignes horaires stockées."""
+        return self._table("meteo").drop(columns="_heures")
+
+    def hauteurs_maree(self) -> pd.DataFrame:
+        return self._table("maree")
+
+    def houle(self) -> pd.DataFrame:
+        return self._table("houle")
+
+    def mettre_a_jour_meteo(self, chemin_dossier: str, periodes: List[Tuple[str, str]], n_processus: int = 1) -> pd.DataFrame:
+        def calcul():
+            daily = self.journalier_meteo()
+            donnees = meteo.DonneesMeteo(daily)
+            return lambda a, b: meteo.indicateurs_periode(daily, a, b, None, donnees)
+
+        fichiers = sorted(Path(chemin_dossier).glob("*.csv"))
+        return self._mettre_a_jour("meteo", fichiers, meteo.lire_csv_meteo, partiel_meteo, periodes, calcul, n_processus)
+
+    def mettre_a_jour_maree(self, dossier: Path, periodes: List[Tuple[str, str]], n_processus: int = 1) -> pd.DataFrame:
+        def calcul():
+            df = self.hauteurs_maree()
+            index = marnage.indexer_maree(df)
+            return lambda a, b: marnage.indicateurs(df, a, b, index)
+
+        fichiers = [f for f in sorted(Path(dossier).rglob("*.txt")) if any(ch.isdigit() for ch in f.stem)]
+        return self._mettre_a_jour("maree", fichiers, marnage.lire_fichier, lambda df: df, periodes, calcul, n_processus)
+
+    def mettre_a_jour_houle(self, fichiers: List[Path], periodes: List[Tuple[str, str]], n_processus: int = 1) -> pd.DataFrame:
+        def calcul():
+            df = self.houle()
+            index = indexer_houle(df)
+            return lambda a, b: houle.calcul_indicateurs(df, a, b, index)
+
+        return self._mettre_a_jour("houle", [Path(f) for f in fichiers], houle.lire_houle, lambda df: df, periodes, calcul, n_processus)
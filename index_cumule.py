@@ -0,0 +1,255 @@
+from typing import Dict, Tuple
+import pandas as pd
+import numpy as np
+from memoire import en_float64
+
+
+def _cumul(x: np.ndarray) -> np.ndarray:
+    """Somme cumulée précédée d'un 0 : somme de x[i0:i1] = c[i1] - c[i0]."""
+    c = np.empty(len(x) + 1, dtype=float)
+    c[0] = 0.0
+    np.cumsum(x, out=c[1:])
+    return c
+
+
+def _temps(x) -> np.ndarray:
+    """
+    Bornes en datetime64[ns] ; les chaînes ne passent par to_datetime que si
+    nécessaire, chacune avec son propre format (dates seules et dates-heures
+    mêlées, comme pd.Timestamp sur chaque borne).
+    """
+    x = np.atleast_1d(x)
+    if x.dtype.kind == "M":
+        return x.astype("datetime64[ns]")
+    return pd.to_datetime(x, format="mixed").to_numpy(dtype="datetime64[ns]")
+
+
+def _sortie(x, scalaire: bool):
+    return x[0] if scalaire else x
+
+
+class IndexCumule:
+    """
+    Index de sommes cumulées sur une série temporelle triée.
+    Toute fenêtre [debut, fin] (bornes incluses, comme les filtres des scripts)
+    se résout par deux searchsorted, puis les agrégats par différence de cumuls :
+    nombre de valeurs, somme, moyenne, écart-type, dépassements de seuil,
+    direction moyenne vectorielle. max/min passent par une table creuse (O(1)).
+    debut/fin peuvent être des scalaires ou des tableaux (une valeur par fenêtre).
+    Les valeurs manquantes sont ignorées, comme en pandas.
+    """
+
+    def __init__(self, serie: pd.Series, directions: bool = False):
+        if not serie.index.is_monotonic_increasing:
+            serie = serie.sort_index()
+        self.temps = serie.index.to_numpy(dtype="datetime64[ns]")
+        self.valeurs = en_float64(serie).to_numpy()
+
+        valide = ~np.isnan(self.valeurs)
+        # centrage pour limiter les pertes de précision sur les sommes de carrés
+        self.decalage = float(self.valeurs[valide].mean()) if valide.any() else 0.0
+        xc = np.where(valide, self.valeurs - self.decalage, 0.0)
+        self._n = _cumul(valide)
+        self._s = _cumul(xc)
+        self._s2 = _cumul(xc * xc)
+        self._seuils: Dict[Tuple[str, float], np.ndarray] = {}
+        self._tables: Dict[str, list] = {}
+
+        if directions:
+            rad = np.deg2rad(np.where(valide, self.valeurs, 0.0))
+            self._sin = _cumul(np.where(valide, np.sin(rad), 0.0))
+            self._cos = _cumul(np.where(valide, np.cos(rad), 0.0))
+
+    # bornes
+
+    def bornes(self, debut, fin) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions [i0, i1[ des points de la fenêtre [debut, fin]."""
+        d, f = _temps(debut), _temps(fin)
+        i0 = np.searchsorted(self.temps, d, side="left")
+        i1 = np.searchsorted(self.temps, f, side="right")
+        return i0, np.maximum(i1, i0)
+
+    def _fenetre(self, c: np.ndarray, debut, fin):
+        i0, i1 = self.bornes(debut, fin)
+        return c[i1] - c[i0]
+
+    # agrégats sur les positions [i0, i1[ (fenêtres déjà résolues)
+
+    def nb_pos(self, i0: np.ndarray, i1: np.ndarray) -> np.ndarray:
+        """Nombre de valeurs non manquantes aux positions [i0, i1[."""
+        i0, i1 = np.atleast_1d(i0), np.atleast_1d(i1)
+        i1 = np.maximum(i1, i0)
+        return (self._n[i1] - self._n[i0]).astype(np.int64)
+
+    def somme_pos(self, i0: np.ndarray, i1: np.ndarray) -> np.ndarray:
+        """Somme des valeurs (manquantes ignorées) aux positions [i0, i1[."""
+        n, s, _ = self.moments_pos(i0, i1)
+        return s
+
+    def moments_pos(self, i0: np.ndarray, i1: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(nombre, somme, somme des carrés) non centrés aux positions [i0, i1[."""
+        i0, i1 = np.atleast_1d(i0), np.atleast_1d(i1)
+        i1 = np.maximum(i1, i0)
+        n = self._n[i1] - self._n[i0]
+        sc = self._s[i1] - self._s[i0]
+        s2c = self._s2[i1] - self._s2[i0]
+        a = self.decalage
+        return n, sc + n * a, s2c + 2 * a * sc + n * a * a
+
+    def moyenne_pos(self, i0: np.ndarray, i1: np.ndarray) -> np.ndarray:
+        i0, i1 = np.atleast_1d(i0), np.atleast_1d(i1)
+        i1 = np.maximum(i1, i0)
+        n = self._n[i1] - self._n[i0]
+        sc = self._s[i1] - self._s[i0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, sc / n + self.decalage, np.nan)
+
+    def variance_pos(self, i0: np.ndarray, i1: np.ndarray, ddof: int = 1) -> np.ndarray:
+        i0, i1 = np.atleast_1d(i0), np.atleast_1d(i1)
+        i1 = np.maximum(i1, i0)
+        n = self._n[i1] - self._n[i0]
+        sc = self._s[i1] - self._s[i0]
+        s2c = self._s2[i1] - self._s2[i0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            v = np.where(n > ddof, (s2c - sc * sc / n) / (n - ddof), np.nan)
+        return np.maximum(v, 0.0)
+
+    # agrégats
+
+    def nb_points(self, debut, fin):
+        """Nombre de lignes de la fenêtre, valeurs manquantes comprises."""
+        i0, i1 = self.bornes(debut, fin)
+        return _sortie(i1 - i0, np.ndim(debut) == 0)
+
+    def nb(self, debut, fin):
+        """Nombre de valeurs non manquantes."""
+        return _sortie(self._fenetre(self._n, debut, fin).astype(np.int64), np.ndim(debut) == 0)
+
+    def moments(self, debut, fin) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(nombre, somme, somme des carrés) non centrés, pour combiner des fenêtres."""
+        return self.moments_pos(*self.bornes(debut, fin))
+
+    def somme(self, debut, fin):
+        n, s, _ = self.moments(debut, fin)
+        return _sortie(s, np.ndim(debut) == 0)
+
+    def somme_carres(self, debut, fin):
+        _, _, s2 = self.moments(debut, fin)
+        return _sortie(s2, np.ndim(debut) == 0)
+
+    def moyenne(self, debut, fin):
+        return _sortie(self.moyenne_pos(*self.bornes(debut, fin)), np.ndim(debut) == 0)
+
+    def variance(self, debut, fin, ddof: int = 1):
+        return _sortie(self.variance_pos(*self.bornes(debut, fin), ddof), np.ndim(debut) == 0)
+
+    def ecart_type(self, debut, fin, ddof: int = 1):
+        return np.sqrt(self.variance(debut, fin, ddof))
+
+    # seuils
+
+    def _cumul_seuil(self, op: str, seuil: float) -> np.ndarray:
+        cle = (op, float(seuil))
+        if cle not in self._seuils:
+            with np.errstate(invalid="ignore"):
+                if op == ">":
+                    m = self.valeurs > seuil
+                elif op == ">=":
+                    m = self.valeurs >= seuil
+                elif op == "<":
+                    m = self.valeurs < seuil
+                elif op == "<=":
+                    m = self.valeurs <= seuil
+                else:
+                    raise ValueError(f"Opérateur inconnu : {op}")
+            self._seuils[cle] = _cumul(m)
+        return self._seuils[cle]
+
+    def nb_seuil(self, op: str, seuil: float, debut, fin):
+        """Nombre de valeurs vérifiant `valeur op seuil` (op parmi >, >=, <, <=)."""
+        c = self._cumul_seuil(op, seuil)
+        return _sortie(self._fenetre(c, debut, fin).astype(np.int64), np.ndim(debut) == 0)
+
+    def nb_sup(self, seuil: float, debut, fin):
+        return self.nb_seuil(">", seuil, debut, fin)
+
+    def nb_inf(self, seuil: float, debut, fin):
+        return self.nb_seuil("<", seuil, debut, fin)
+
+    def nb_entre(self, bas: float, haut: float, debut, fin):
+        """Nombre de valeurs dans [bas, haut]."""
+        c = self._cumul_seuil(">=", bas) - self._cumul_seuil(">", haut)
+        return _sortie(self._fenetre(c, debut, fin).astype(np.int64), np.ndim(debut) == 0)
+
+    # extrêmes
+
+    def _table(self, sens: str, niveau_max: int) -> list:
+        """
+        Table creuse : niveau k = extrêmes sur les blocs de 2**k points.
+        Les niveaux ne sont construits que jusqu'au plus haut demandé (fenêtres
+        courtes sur une longue série : mémoire en n log2(longueur des fenêtres)).
+        """
+        if sens not in self._tables:
+            remplissage = -np.inf if sens == "max" else np.inf
+            self._tables[sens] = [np.where(np.isnan(self.valeurs), remplissage, self.valeurs)]
+        niveaux = self._tables[sens]
+        f = np.maximum if sens == "max" else np.minimum
+        while len(niveaux) <= niveau_max:
+            k = len(niveaux)
+            prec = niveaux[-1]
+            niveaux.append(f(prec[:-2 ** (k - 1)], prec[2 ** (k - 1):]))
+        return niveaux
+
+    def _extreme(self, sens: str, debut, fin):
+        i0, i1 = self.bornes(debut, fin)
+        return _sortie(self.extreme_pos(sens, i0, i1), np.ndim(debut) == 0)
+
+    def extreme_pos(self, sens: str, i0: np.ndarray, i1: np.ndarray) -> np.ndarray:
+        """Max ("max") ou min ("min") des valeurs aux positions [i0, i1[ (NaN si vide)."""
+        i0, i1 = np.atleast_1d(i0), np.atleast_1d(i1)
+        longueur = i1 - i0
+        out = np.full(len(i0), np.nan)
+        ok = longueur > 0
+        if ok.any():
+            f = np.maximum if sens == "max" else np.minimum
+            k = np.floor(np.log2(longueur[ok])).astype(int)
+            niveaux = self._table(sens, int(k.max()))
+            a = np.empty(ok.sum())
+            b = np.empty(ok.sum())
+            for niveau in np.unique(k):
+                sel = k == niveau
+                t = niveaux[niveau]
+                a[sel] = t[i0[ok][sel]]
+                b[sel] = t[i1[ok][sel] - 2 ** niveau]
+            r = f(a, b)
+            out[ok] = np.where(np.isinf(r), np.nan, r)
+        return out
+
+    def maximum(self, debut, fin):
+        return self._extreme("max", debut, fin)
+
+    def minimum(self, debut, fin):
+        return self._extreme("min", debut, fin)
+
+    # directions
+
+    def sommes_directions(self, debut, fin) -> Tuple[np.ndarray, np.ndarray]:
+        """(somme des sinus, somme des cosinus) de la fenêtre, pour combiner des fenêtres ; nécessite directions=True."""
+        if not hasattr(self, "_sin"):
+            raise ValueError("Index construit sans directions=True")
+        return self._fenetre(self._sin, debut, fin), self._fenetre(self._cos, debut, fin)
+
+    def direction_moyenne(self, debut, fin):
+        """Direction moyenne vectorielle (degrés, 0–360) ; nécessite directions=True."""
+        s, c = self.sommes_directions(debut, fin)
+        n = self._fenetre(self._n, debut, fin)
+        d = np.rad2deg(np.arctan2(s, c))
+        d = np.where(d < 0, d + 360, d)
+        return _sortie(np.where(n > 0, d, np.nan), np.ndim(debut) == 0)
+
+    # valeurs brutes
+
+    def tranche(self, debut, fin) -> np.ndarray:
+        """Vue sur les valeurs de la fenêtre (pour médiane, quantiles...), sans copie."""
+        i0, i1 = self.bornes(debut, fin)
+        return self.valeurs[i0[0]:i1[0]]
@@ -0,0 +1,178 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+from pandas.api.types import union_categoricals
+from instrumentation import etape
+
+
+def lire_fichiers(
+    lecteur: Callable[[Path], pd.DataFrame],
+    fichiers: List[Path],
+    n_processus: Optional[int] = 1,
+) -> List[Tuple[Path, pd.DataFrame]]:
+    """
+    Applique `lecteur` à chaque fichier, indépendamment.
+    - n_processus = 1 : lecture séquentielle dans le processus courant
+    - n_processus = None : un processus par cœur disponible
+    Les fichiers en erreur sont signalés puis ignorés ; l'ordre des fichiers est conservé.
+    """
+    if n_processus is None:
+        n_processus = os.cpu_count() or 1
+    n_processus = max(1, min(n_processus, len(fichiers)))
+
+    resultats = []
+    if n_processus == 1:
+        for f in fichiers:
+            try:
+                resultats.append((f, lecteur(f)))
+            except Exception as e:
+                print(f"Fichier ignoré ({f.name}) : {e}")
+        return resultats
+
+    with ProcessPoolExecutor(max_workers=n_processus) as pool:
+        futurs = [(f, pool.submit(lecteur, f)) for f in fichiers]
+        for f, futur in futurs:
+            try:
+                resultats.append((f, futur.result()))
+            except Exception as e:
+                print(f"Fichier ignoré ({f.name}) : {e}")
+    return resultats
+
+
+def _cles(df: pd.DataFrame, colonne: Optional[str]) -> np.ndarray:
+    return (df.index if colonne is None else df[colonne]).to_numpy()
+
+
+def fusion_triee(frames: List[pd.DataFrame], colonne: Optional[str] = None) -> pd.DataFrame:
+    """
+    Fusionne des tables déjà triées par date (index si colonne=None) par une
+    fusion k-voies : les tables sont fusionnées deux à deux en arbre, chaque
+    fusion plaçant les lignes par searchsorted, sans retri complet.
+    Une table non triée est d'abord triée seule.
+    """
+    with etape("fusion", tables=len(frames)) as e:
+        df = _fusion_triee(frames, colonne)
+        e.lignes = len(df)
+    return df
+
+
+def fusion_dedoublonnee(
+    frames: List[pd.DataFrame],
+    colonne: Optional[str] = None,
+    priorite: Optional[Tuple[str, List]] = None,
+    station: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    fusion_triee puis une seule ligne par date, et par station si la colonne
+    `station` est présente (cf. dedoublonner) : les fichiers qui se recouvrent
+    (téléchargements répétés, extractions redondantes) ne comptent chaque
+    instant qu'une fois.
+    """
+    with etape("fusion", tables=len(frames)) as e:
+        df = _fusion_triee(frames, colonne)
+        e.lignes = len(df)
+        n = len(df)
+        df = dedoublonner(df, colonne, priorite, station)
+    if len(df) < n:
+        print(f"{n - len(df)} lignes en double écartées")
+    return df
+
+
+def dedoublonner(
+    df: pd.DataFrame,
+    colonne: Optional[str] = None,
+    priorite: Optional[Tuple[str, List]] = None,
+    station: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Une ligne par date dans une table triée par date (index si colonne=None).
+    Les lignes d'une même date sont contiguës : la plage est parcourue une fois
+    (reduceat), sans groupby ni retri. Est gardée la ligne dont la valeur de la
+    colonne priorite[0] vient le plus tôt dans la liste priorite[1] (valeurs
+    absentes de la liste en dernier) ; à égalité, la première (ordre des tables
+    fusionnées).
+    Si la colonne `station` est présente (NUM_POSTE d'un CSV multi-stations),
+    la clé est (station, date) : chaque station est dédoublonnée séparément,
+    ses lignes restant triées par date.
+    """
+    t = _cles(df, colonne)
+    if len(t) < 2:
+        return df
+    rang = None
+    if priorite is not None and priorite[0] in df.columns:
+        col, ordre = priorite
+        valeurs = df[col].to_numpy()
+        rang = np.full(len(df), len(ordre), dtype=np.int64)
+        for k, v in enumerate(ordre):
+            rang[valeurs == v] = k
+
+    if station is None or station not in df.columns:
+        garde = _premiers(t, rang)
+    else:
+        codes = pd.factorize(df[station], use_na_sentinel=False)[0]
+        if codes.max() == 0:
+            garde = _premiers(t, rang)
+        else:
+            garde = np.empty(len(df), dtype=bool)
+            for k in range(codes.max() + 1):
+                pos = np.flatnonzero(codes == k)
+                garde[pos] = _premiers(t[pos], None if rang is None else rang[pos])
+    return df if garde.all() else df[garde]
+
+
+def _premiers(t: np.ndarray, rang: Optional[np.ndarray]) -> np.ndarray:
+    """Masque de la ligne gardée pour chaque date de t (triées) : rang minimal, puis la première."""
+    nouveau = np.r_[True, t[1:] != t[:-1]]
+    if nouveau.all() or rang is None:
+        return nouveau
+    debuts = np.flatnonzero(nouveau)
+    plage = np.cumsum(nouveau) - 1
+    candidat = np.flatnonzero(rang == np.minimum.reduceat(rang, debuts)[plage])
+    garde = np.zeros(len(t), dtype=bool)
+    garde[candidat[np.r_[True, plage[candidat][1:] != plage[candidat][:-1]]]] = True
+    return garde
+
+
+def _fusion_triee(frames: List[pd.DataFrame], colonne: Optional[str]) -> pd.DataFrame:
+    frames = [df for df in frames if len(df)]
+    if not frames:
+        raise ValueError("Aucune table à fusionner.")
+    for i, df in enumerate(frames):
+        cle = df.index if colonne is None else df[colonne]
+        if not cle.is_monotonic_increasing:
+            frames[i] = df.sort_index(kind="stable") if colonne is None else df.sort_values(colonne, kind="stable")
+
+    # (clés triées, positions des lignes dans la concaténation)
+    morceaux = []
+    debut = 0
+    for df in frames:
+        morceaux.append((_cles(df, colonne), np.arange(debut, debut + len(df))))
+        debut += len(df)
+
+    while len(morceaux) > 1:
+        suivants = []
+        for i in range(0, len(morceaux) - 1, 2):
+            (ka, ia), (kb, ib) = morceaux[i], morceaux[i + 1]
+            # à égalité, les lignes de a passent avant celles de b
+            pos_a = np.arange(len(ka)) + np.searchsorted(kb, ka, side="left")
+            pos_b = np.arange(len(kb)) + np.searchsorted(ka, kb, side="right")
+            k = np.empty(len(ka) + len(kb), dtype=ka.dtype)
+            ordre = np.empty(len(ka) + len(kb), dtype=np.int64)
+            k[pos_a], k[pos_b] = ka, kb
+            ordre[pos_a], ordre[pos_b] = ia, ib
+            suivants.append((k, ordre))
+        if len(morceaux) % 2:
+            suivants.append(morceaux[-1])
+        morceaux = suivants
+
+    # catégories unifiées : sinon concat repasse en object les colonnes catégorielles
+    for c in frames[0].columns:
+        if all(isinstance(df[c].dtype, pd.CategoricalDtype) for df in frames if c in df.columns):
+            categories = union_categoricals([df[c] for df in frames if c in df.columns]).categories
+            frames = [df.assign(**{c: df[c].cat.set_categories(categories)}) if c in df.columns else df for df in frames]
+
+    df = pd.concat(frames, axis=0, ignore_index=colonne is not None)
+    return df.take(morceaux[0][1])
@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+import pandas as pd
+
+# Instrumentation des étapes, activée par la variable d'environnement
+# (héritée par les processus de lecture) :
+#   BDMOMA_INSTRUMENTATION=1          -> une ligne JSON par étape sur stderr
+#   BDMOMA_INSTRUMENTATION=mesures.jsonl -> lignes JSON ajoutées à ce fichier
+# ou par activer() depuis le code. Désactivée, une étape ne coûte qu'un test.
+VARIABLE_ENV = "BDMOMA_INSTRUMENTATION"
+
+_etat = {"actif": False, "destination": None}
+_mesures: List[dict] = []
+
+
+def activer(destination: Optional[str] = None) -> None:
+    """Active l'instrumentation ; destination : fichier JSON lines, None = stderr."""
+    _etat["actif"] = True
+    _etat["destination"] = destination
+
+
+def desactiver() -> None:
+    _etat["actif"] = False
+
+
+def est_actif() -> bool:
+    return _etat["actif"]
+
+
+def _depuis_environnement() -> None:
+    valeur = os.environ.get(VARIABLE_ENV, "").strip()
+    if valeur and valeur != "0":
+        activer(None if valeur in ("1", "stderr") else valeur)
+
+
+def _rss_pic_mo() -> Optional[float]:
+    """Pic de mémoire résidente du processus (Mo), None si indisponible."""
+    try:
+        import resource
+        pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pic / 2 ** 20 if sys.platform == "darwin" else pic / 2 ** 10  # octets sous macOS, Ko sous Linux
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 2 ** 20  # peak_wset : Windows
+    except ImportError:
+        return None
+
+
+def _emettre(mesure: dict) -> None:
+    _mesures.append(mesure)
+    ligne = json.dumps(mesure, ensure_ascii=False, default=str)
+    if _etat["destination"] is None:
+        print(ligne, file=sys.stderr)
+    else:
+        with open(_etat["destination"], "a", encoding="utf-8") as f:
+            f.write(ligne + "\n")
+
+
+class _Etape:
+    """Chronomètre une étape ; `lignes` peut être renseigné dans le bloc pour le débit."""
+
+    __slots__ = ("nom", "contexte", "lignes", "_t0")
+
+    def __init__(self, nom: str, contexte: dict):
+        self.nom = nom
+        self.contexte = contexte
+        self.lignes = None
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, type_exc, exc, tb):
+        secondes = time.perf_counter() - self._t0
+        mesure = {
+            "etape": self.nom,
+            **self.contexte,
+            "secondes": round(secondes, 6),
+            "lignes": self.lignes,
+            "lignes_par_s": round(self.lignes / secondes, 1) if self.lignes and secondes > 0 else None,
+            "rss_pic_mo": _rss_pic_mo(),
+            "pid": os.getpid(),
+            "horodatage": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        if type_exc is not None:
+            mesure["erreur"] = f"{type_exc.__name__}: {exc}"
+        _emettre(mesure)
+        return False
+
+
+class _EtapeInactive:
+    __slots__ = ("lignes",)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_exc, exc, tb):
+        return False
+
+
+def etape(nom: str, **contexte):
+    """
+    with etape("lecture", source="meteo", fichier=f.name) as e:
+        df = ...
+        e.lignes = len(df)
+    """
+    if not _etat["actif"]:
+        return _EtapeInactive()
+    return _Etape(nom, contexte)
+
+
+def mesures() -> pd.DataFrame:
+    """Mesures émises par ce processus depuis le démarrage."""
+    return pd.DataFrame(_mesures)
+
+
+_depuis_environnement()
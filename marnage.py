@@ -1,102 +1,176 @@
+import io
+from typing import List
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from io import StringIO
+from ingestion import lire_fichiers, fusion_dedoublonnee
+from cache_donnees import CacheColonnaire, lecteur_avec_cache
+from balayage import indexer_maree, balayer_maree
+from periodes import PERIODES
+from instrumentation import etape
+import sorties
 
 
 DOSSIER = Path.home() / "Downloads" / "dieppe"  # dossier où sont les fichiers .txt
-PERIODES = [
-    ("1995-01-01", "2000-12-31"),
-    ("2001-01-01", "2008-12-31"),
-    ("2009-01-01", "2012-12-31"),
-    ("2013-01-01", "2015-12-31"),
-    ("2016-01-01", "2019-12-31"),
-    ("2020-01-01", "2022-12-31"),
-]
 SORTIE = Path.home() / "Downloads" / "indicateurs_marnagebonnedate.xlsx"
+TAILLE_BLOC = 500_000  # nombre de lignes parsées par bloc lors de la lecture
+N_PROCESSUS = 1  # lecture parallèle des fichiers (None = tous les cœurs)
+CACHE = None  # CacheColonnaire() : fichiers déjà parsés, réutilisés d'une exécution à l'autre (None = désactivé)
+# Une heure présente dans plusieurs sources (ou plusieurs fichiers) : la
+# première source de la liste l'emporte (4 validée avant 5 brute)
+PRIORITE_SOURCES = [4, 5]
+# Constantes du parsing, dans la clé des entrées du cache (cf. cache_donnees._configuration)
+CONFIGURATION_LECTURE = ["PRIORITE_SOURCES"]
 
 # lecture fichier shom
 
-def lire_fichier(f: Path) -> pd.DataFrame:
+# Octets lus par bloc : environ TAILLE_BLOC lignes de mesure ("jj/mm/aaaa hh:mm:ss;v.vvv;s")
+OCTETS_PAR_LIGNE = 32
+BOM_UTF8 = b"\xef\xbb\xbf"
+
+
+def _lignes_donnees(brut: bytes) -> bytes:
     """
-    Lit un fichier SHOM (format RAM).
-    Garde uniquement les lignes non commentées et les sources 4 et 5.
+    Lignes de données d'un bloc de lignes entières (ni commentées, c.-à-d.
+    commençant par '#', ni sans ';'), filtrées sur les octets en une fois :
+    un masque par ligne, étendu à ses octets. Un '#' en cours de ligne ne
+    coupe pas la ligne.
     """
-    lignes = []
-    try:
-        with open(f, "r", encoding="utf-8-sig") as file:
-            for line in file:
-                if not line.startswith("#") and ";" in line:
-                    lignes.append(line.strip())
-    except UnicodeDecodeError:
-        with open(f, "r", encoding="latin-1") as file:
-            for line in file:
-                if not line.startswith("#") and ";" in line:
-                    lignes.append(line.strip())
-
-    if not lignes:
-        print(f"Fichier vide ou illisible : {f.name}")
-        return pd.DataFrame(columns=["Date", "Valeur"])
-
-    df = pd.read_csv(StringIO("\n".join(lignes)), sep=";", names=["Date", "Valeur", "Source"], header=None)
-    df["Date"] = pd.to_datetime(df["Date"], format="%d/%m/%Y %H:%M:%S", errors="coerce")
-    df["Valeur"] = pd.to_numeric(df["Valeur"], errors="coerce")
-    df["Source"] = pd.to_numeric(df["Source"], errors="coerce")
+    b = np.frombuffer(brut, dtype=np.uint8)
+    if not len(b):
+        return b""
+    fins = np.flatnonzero(b == ord("\n"))
+    if not len(fins) or fins[-1] != len(b) - 1:
+        fins = np.r_[fins, len(b) - 1]
+    debuts = np.r_[0, fins[:-1] + 1]
+    pv = np.flatnonzero(b == ord(";"))
+    avec_pv = np.searchsorted(pv, fins, side="right") > np.searchsorted(pv, debuts, side="left")
+    garde = (b[debuts] != ord("#")) & avec_pv
+    return b[np.repeat(garde, fins - debuts + 1)].tobytes()
+
+
+def _blocs_octets(file, taille_bloc: int):
+    """Fichier ouvert en binaire, par blocs de lignes entières d'environ taille_bloc lignes ; BOM UTF-8 retiré."""
+    reste = b""
+    debut = True
+    while True:
+        brut = file.read(taille_bloc * OCTETS_PAR_LIGNE)
+        if debut and brut.startswith(BOM_UTF8):
+            brut = brut[len(BOM_UTF8):]
+        debut = False
+        if not brut:
+            if reste:
+                yield reste
+            return
+        brut = reste + brut
+        coupe = brut.rfind(b"\n") + 1
+        reste = brut[coupe:]
+        if coupe:
+            yield brut[:coupe]
+
+
+def _lire_blocs(f: Path, taille_bloc: int) -> List[pd.DataFrame]:
+    blocs = []
+    with open(f, "rb") as file:
+        for brut in _blocs_octets(file, taille_bloc):
+            texte = _lignes_donnees(brut)
+            if not texte:
+                continue
+            # champs de mesure en ASCII : même lecture qu'en utf-8, sans échec de décodage
+            bloc = pd.read_csv(
+                io.BytesIO(texte), sep=";", names=["Date", "Valeur", "Source"], header=None,
+                usecols=[0, 1, 2], dtype=str, encoding="latin-1",
+            )
+            # garder seulement les sources 4 et 5 (horaires validées/brutes)
+            source = pd.to_numeric(bloc["Source"], errors="coerce")
+            garde = source.isin(PRIORITE_SOURCES).to_numpy()
+            bloc, source = bloc[garde], source[garde]
+            if bloc.empty:
+                continue
+            dates = pd.to_datetime(bloc["Date"], format="%d/%m/%Y %H:%M:%S", errors="coerce")
+            # ligne indentée : date relue sans les blancs de début de ligne
+            indentees = dates.isna() & bloc["Date"].str.match(r"\s").fillna(False)
+            if indentees.any():
+                dates[indentees] = pd.to_datetime(bloc["Date"][indentees].str.lstrip(), format="%d/%m/%Y %H:%M:%S", errors="coerce")
+            blocs.append(pd.DataFrame({
+                "Date": dates,
+                "Valeur": pd.to_numeric(bloc["Valeur"], errors="coerce").astype("float32"),
+                "Source": source.astype("int8"),
+            }))
+    return blocs
+
+
+def lire_fichier(f: Path, taille_bloc: int = TAILLE_BLOC) -> pd.DataFrame:
+    """
+    Lit un fichier SHOM (format RAM) en flux, bloc par bloc, en un seul passage.
+    Ignore les lignes commentées (#) et les lignes sans ';', et garde
+    uniquement les sources 4 et 5. Renvoie Date (datetime64), Valeur (float32)
+    et Source (int8).
+    Les lignes sont triées sur les octets ('#', ';' et fin de ligne sont les
+    mêmes octets en utf-8 et en latin-1) : l'encodage, utf-8 ou latin-1, ne
+    change que les commentaires et n'impose pas de relecture.
+    """
+    # lecture, dates et nettoyage se font bloc par bloc : mesurés ensemble
+    with etape("lecture", source="maree", fichier=f.name) as e:
+        blocs = _lire_blocs(f, taille_bloc)
+        e.lignes = sum(len(b) for b in blocs)
 
-    # garder seulement les sources 4 et 5 (horaires validées/brutes)
-    df = df[df["Source"].isin([4, 5])]
+    if not blocs:
+        print(f"Fichier vide ou illisible : {f.name}")
+        return pd.DataFrame(columns=["Date", "Valeur", "Source"])
 
+    df = pd.concat(blocs, ignore_index=True) if len(blocs) > 1 else blocs[0].reset_index(drop=True)
     df = df.dropna(subset=["Date", "Valeur"])
     print(f"{f.name} : {len(df)} mesures horaires")
-    return df[["Date", "Valeur"]]
+    return df
 
 
 # charge fichiers
 
-def charger_donnees(dossier: Path) -> pd.DataFrame:
+def charger_donnees(dossier: Path, n_processus: int = 1, cache: CacheColonnaire = None) -> pd.DataFrame:
+    """
+    Charge tous les fichiers .txt du dossier, chacun lu indépendamment
+    (en parallèle si n_processus > 1, depuis le cache s'il est fourni),
+    puis fusionne les séries triées par date, une mesure par heure (la source
+    la mieux placée dans PRIORITE_SOURCES, cf. ingestion.dedoublonner).
+    """
     fichiers = sorted(dossier.rglob("*.txt"))
     print(f"{len(fichiers)} fichiers trouvés sous {dossier}")
-    frames = [lire_fichier(f) for f in fichiers if any(ch.isdigit() for ch in f.stem)]
-    frames = [df for df in frames if not df.empty]
+    fichiers = [f for f in fichiers if any(ch.isdigit() for ch in f.stem)]
+    frames = [df for _, df in lire_fichiers(lecteur_avec_cache(lire_fichier, cache), fichiers, n_processus) if not df.empty]
     if not frames:
         raise RuntimeError("Aucune donnée valide n’a été trouvée.")
-    df = pd.concat(frames, ignore_index=True).sort_values("Date")
+    df = fusion_dedoublonnee(frames, "Date", ("Source", PRIORITE_SOURCES)).reset_index(drop=True)
     print(f"Données totales : {len(df)} points de marée ({df['Date'].min().date()} → {df['Date'].max().date()})")
     return df
 
 
 # calcul des indicateurs 
 
-def indicateurs(df: pd.DataFrame, start: str, end: str) -> dict:
-    subset = df[(df["Date"] >= start) & (df["Date"] <= end)]
-    if subset.empty:
+def indicateurs(df: pd.DataFrame, start: str, end: str, index: dict) -> dict:
+    """
+    Indicateurs de marnage sur [start, end], lus dans les index cumulés
+    `index` = balayage.indexer_maree(df), construit une fois par l'appelant
+    pour toutes ses périodes.
+    Les indicateurs *_marees / vive_eau reposent sur les pleines et basses
+    mers détectées (extremes_maree) et comptent les jours entiers de la période.
+    """
+    ligne = balayer_maree(df, [(start, end)], index=index).iloc[0]
+    if ligne["nb_points"] == 0:
         return {"période": f"{start} → {end}", "nb_points": 0}
-
-    daily = subset.set_index("Date").resample("D")["Valeur"].agg(["max", "min"])
-    daily["marnage"] = daily["max"] - daily["min"]
-    daily = daily.dropna()
-
-    return {
-        "période": f"{start} → {end}",
-        "nb_points": len(subset),
-        "jours_disponibles": len(daily),
-        "marnage_moy_m": daily["marnage"].mean(),
-        "marnage_max_m": daily["marnage"].max(),
-        "marnage_min_m": daily["marnage"].min(),
-        "marnage_std_m": daily["marnage"].std(),
-        "jours_marnage>8m": (daily["marnage"] > 8).sum(),
-        "jours_marnage>9m": (daily["marnage"] > 9).sum(),
-        "IAI": daily["marnage"].mean() * (daily["marnage"] > 8).sum(),
-    }
+    return {"période": f"{start} → {end}", **ligne.drop(["debut", "fin"]).to_dict()}
 
 # exécution
 
 if __name__ == "__main__":
-    df = charger_donnees(DOSSIER)
-    res = pd.DataFrame([indicateurs(df, a, b) for a, b in PERIODES])
+    df = charger_donnees(DOSSIER, N_PROCESSUS, CACHE)
+    with etape("indicateurs", source="maree", periodes=len(PERIODES)) as e:
+        index = indexer_maree(df)
+        res = pd.DataFrame([indicateurs(df, a, b, index) for a, b in PERIODES])
+        e.lignes = len(df)
 
     print("\n Résumé :")
     print(res)
 
-    res.to_excel(SORTIE, index=False, engine="openpyxl")
-    print(f"\n Exporté : {SORTIE}")
+    fichiers = sorties.exporter(res, SORTIE)
+    print(f"\n Exporté : {', '.join(f.name for f in fichiers)}")
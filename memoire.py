@@ -0,0 +1,131 @@
+import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+import pandas as pd
+import numpy as np
+
+# Au-delà de cette proportion de valeurs distinctes, une colonne texte reste en texte
+RATIO_CATEGORIE = 0.5
+
+# Chiffres significatifs qu'un float32 restitue toujours à l'identique (décimale -> float32 -> décimale)
+CHIFFRES_FLOAT32 = 6
+
+
+def octets_par_ligne(df: pd.DataFrame) -> float:
+    """Mémoire occupée par ligne (index et contenu des chaînes compris)."""
+    if len(df) == 0:
+        return 0.0
+    return float(df.memory_usage(index=True, deep=True).sum()) / len(df)
+
+
+def _est_date_python(s: pd.Series) -> bool:
+    valeurs = s.dropna()
+    return len(valeurs) > 0 and isinstance(valeurs.iloc[0], datetime.date)
+
+
+def compacter(df: pd.DataFrame, categories: List[str] = None) -> pd.DataFrame:
+    """
+    Représentation compacte d'une table horaire :
+    - flottants en float32 (précision des mesures : 0.1 mm, 0.1 °C, 0.1 hPa)
+    - colonnes `categories` (identifiants station/source) et colonnes texte
+      peu variées en catégoriel
+    - colonnes object de dates Python supprimées (redondantes avec le temps)
+    """
+    categories = [] if categories is None else categories
+    colonnes = {}
+    for c in df.columns:
+        s = df[c]
+        if c in categories:
+            colonnes[c] = s.astype("category")
+        elif s.dtype.kind == "f":
+            colonnes[c] = s.astype("float32")
+        elif s.dtype.kind in "iu":
+            colonnes[c] = pd.to_numeric(s, downcast="integer")
+        elif s.dtype.kind == "O" and _est_date_python(s):
+            continue
+        elif s.dtype.kind == "O" and s.nunique() <= RATIO_CATEGORIE * len(s):
+            colonnes[c] = s.astype("category")
+        else:
+            colonnes[c] = s
+    return pd.DataFrame(colonnes, index=df.index)
+
+
+def elargir_valeurs(x: np.ndarray) -> np.ndarray:
+    """
+    Valeurs float32 en float64, ramenées à la décimale lue (CHIFFRES_FLOAT32
+    chiffres significatifs) : 0.1 lu en float32 redevient le 0.1 de la lecture
+    en float64, et non 0.10000000149 (> 0.1), qui franchirait les seuils.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exposant = np.floor(np.log10(np.abs(x)))
+    decimales = np.where(np.isfinite(exposant), CHIFFRES_FLOAT32 - 1 - exposant, 0).astype(np.int64)
+    out = x.copy()
+    for d in np.unique(decimales):
+        k = decimales == d
+        out[k] = np.round(x[k], int(d))
+    return out
+
+
+def elargir(df: pd.DataFrame) -> pd.DataFrame:
+    """Colonnes float32 (cf. compacter) repassées en float64 par elargir_valeurs ; la table est rendue telle quelle sinon."""
+    colonnes = [c for c in df.columns if df[c].dtype == np.float32]
+    if not colonnes:
+        return df
+    df = df.copy()
+    for c in colonnes:
+        df[c] = elargir_valeurs(df[c].to_numpy())
+    return df
+
+
+def en_float64(s: pd.Series) -> pd.Series:
+    """
+    Série en float64 avant agrégation : une série float32 (Valeur de marée, hs
+    de houle...) passe par elargir_valeurs, les autres sont simplement converties.
+    """
+    if s.dtype == np.float32:
+        return pd.Series(elargir_valeurs(s.to_numpy()), index=s.index, name=s.name)
+    return s.astype(float)
+
+
+def rapport_memoire(tables: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]) -> pd.DataFrame:
+    """
+    Octets par ligne avant/après compactage, pour chaque source
+    {nom: (table complète, table compacte)}.
+    """
+    lignes = []
+    for nom, (avant, apres) in tables.items():
+        a, b = octets_par_ligne(avant), octets_par_ligne(apres)
+        lignes.append({
+            "source": nom,
+            "lignes": len(apres),
+            "colonnes_avant": avant.shape[1],
+            "colonnes_apres": apres.shape[1],
+            "octets_ligne_avant": round(a, 1),
+            "octets_ligne_apres": round(b, 1),
+            "gain": round(a / b, 1) if b else np.nan,
+        })
+    res = pd.DataFrame(lignes)
+    print(res.to_string(index=False))
+    return res
+
+
+def main():
+    # imports locaux : les lecteurs importent eux-mêmes ce module
+    import code_indicateurs_meteo as meteo
+    import codeetatdemer as houle
+
+    tables = {}
+    fichiers = sorted(Path(meteo.CHEMIN_DOSSIER).glob("*.csv"))
+    if fichiers:
+        complet = pd.concat([meteo.lire_csv_meteo(f) for f in fichiers])
+        compact = pd.concat([meteo.lire_csv_meteo_compact(f) for f in fichiers])
+        tables["meteo"] = (complet, compact)
+    if houle.CHEMIN_FICHIER.exists():
+        complet = pd.read_csv(houle.CHEMIN_FICHIER, sep=",", low_memory=False)
+        tables["houle"] = (complet, houle.lire_houle(houle.CHEMIN_FICHIER))
+    rapport_memoire(tables)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+from pathlib import Path
+from typing import List, Optional, Tuple
+import pandas as pd
+import numpy as np
+import codeetatdemer as houle
+from balayage import balayer_houle
+from cache_donnees import CacheColonnaire
+from ingestion import lire_fichiers
+from periodes import PERIODES
+from instrumentation import etape
+import sorties
+
+# Rejeux de houle, un CSV par nœud de grille (même format que codeetatdemer.CHEMIN_FICHIER,
+# colonnes longitude/latitude comprises) ; l'identifiant du nœud est le préfixe du nom
+# de fichier (167730_20000101_20221231_rc.csv -> 167730)
+DOSSIER_NOEUDS = Path.home() / "Downloads" / "rejeux_houle"
+# Cellules de falaise : colonnes cellule, longitude, latitude (degrés décimaux)
+FICHIER_CELLULES = Path.home() / "Downloads" / "cellules_falaise.csv"
+SORTIE = Path.home() / "Downloads" / "indicateurs_houle_cellules.xlsx"
+
+N_PROCESSUS = None  # un processus par cœur (1 = séquentiel)
+K_NOEUDS = 1  # nœuds retenus par cellule (> 1 : moyenne pondérée par l'inverse de la distance)
+COLONNES_POSITION = ["longitude", "latitude"]
+RAYON_TERRE_KM = 6371.0
+
+
+# -----------------------------
+# Nœuds et cellules
+# -----------------------------
+
+def identifiant_noeud(f: Path) -> str:
+    return Path(f).stem.split("_")[0]
+
+
+def positions_noeuds(fichiers: List[Path]) -> pd.DataFrame:
+    """Position de chaque nœud, lue sur la première ligne de son rejeu. Index : noeud."""
+    lignes = []
+    for f in fichiers:
+        premiere = pd.read_csv(f, sep=",", nrows=1)
+        for col in COLONNES_POSITION:
+            if col not in premiere.columns:
+                raise ValueError(f"Colonne manquante : {col} ({Path(f).name})")
+        lignes.append({"noeud": identifiant_noeud(f), "fichier": Path(f),
+                       **{col: float(premiere[col].iloc[0]) for col in COLONNES_POSITION}})
+    return pd.DataFrame(lignes).set_index("noeud")
+
+
+def lire_cellules(chemin: Path = FICHIER_CELLULES) -> pd.DataFrame:
+    cellules = pd.read_csv(chemin)
+    for col in ["cellule"] + COLONNES_POSITION:
+        if col not in cellules.columns:
+            raise ValueError(f"Colonne manquante : {col}")
+    return cellules
+
+
+def distances_km(lon1, lat1, lon2, lat2) -> np.ndarray:
+    """Distances orthodromiques (haversine) de chaque point 1 à chaque point 2 : matrice (n1, n2)."""
+    lon1, lat1 = np.deg2rad(np.asarray(lon1, float))[:, None], np.deg2rad(np.asarray(lat1, float))[:, None]
+    lon2, lat2 = np.deg2rad(np.asarray(lon2, float))[None, :], np.deg2rad(np.asarray(lat2, float))[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RAYON_TERRE_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def affecter_cellules(cellules: pd.DataFrame, noeuds: pd.DataFrame, k: int = K_NOEUDS) -> pd.DataFrame:
+    """
+    Les k nœuds les plus proches de chaque cellule, avec leur distance et leur
+    poids (inverse de la distance, normalisé par cellule ; 1 si k = 1).
+    Table longue : cellule, noeud, rang, distance_km, poids.
+    """
+    k = max(1, min(k, len(noeuds)))
+    d = distances_km(cellules["longitude"], cellules["latitude"], noeuds["longitude"], noeuds["latitude"])
+    proches = np.argsort(d, axis=1, kind="stable")[:, :k]
+    dist = np.take_along_axis(d, proches, axis=1)
+    w = 1 / np.maximum(dist, 1e-6)  # nœud sur la cellule : poids dominant
+    w = w / w.sum(axis=1, keepdims=True)
+    return pd.DataFrame({
+        "cellule": np.repeat(cellules["cellule"].to_numpy(), k),
+        "noeud": noeuds.index.to_numpy()[proches.ravel()],
+        "rang": np.tile(np.arange(1, k + 1), len(cellules)),
+        "distance_km": dist.ravel(),
+        "poids": w.ravel(),
+    })
+
+
+# -----------------------------
+# Indicateurs par nœud
+# -----------------------------
+
+class _IndicateursNoeud:
+    """Lecture (par le cache si fourni) puis toutes les périodes d'un nœud en un balayage ; picklable."""
+
+    def __init__(self, periodes: List[Tuple[str, str]], cache: Optional[CacheColonnaire]):
+        self.periodes = periodes
+        self.cache = cache
+
+    def __call__(self, f: Path) -> pd.DataFrame:
+        df = self.cache.lire(f, houle.lire_houle) if self.cache is not None else houle.lire_houle(f)
+        with etape("indicateurs", source="houle", fichier=Path(f).name, periodes=len(self.periodes)) as e:
+            res = balayer_houle(df, self.periodes)
+            e.lignes = len(df)
+        # fenêtre sans mesure : seul nb_points est renseigné, comme calcul_indicateurs
+        res.loc[res["nb_points"] == 0, res.columns.difference(["debut", "fin", "nb_points"])] = np.nan
+        return res
+
+
+def indicateurs_noeuds(
+    noeuds: pd.DataFrame,
+    periodes: List[Tuple[str, str]] = PERIODES,
+    n_processus: Optional[int] = N_PROCESSUS,
+    cache: CacheColonnaire = None,
+) -> pd.DataFrame:
+    """
+    Indicateurs de codeetatdemer.calcul_indicateurs pour chaque nœud x période,
+    un nœud par processus. Table : noeud, debut, fin, indicateurs.
+    """
+    fichiers = list(noeuds["fichier"])
+    noeud_de = dict(zip(fichiers, noeuds.index))
+    tables = []
+    for f, res in lire_fichiers(_IndicateursNoeud(periodes, cache), fichiers, n_processus):
+        res.insert(0, "noeud", noeud_de[f])
+        tables.append(res)
+    if not tables:
+        raise RuntimeError("Aucun rejeu de houle exploitable.")
+    return pd.concat(tables, ignore_index=True)
+
+
+def _moyennes_ponderees(t: pd.DataFrame, colonnes: List[str]) -> pd.DataFrame:
+    """
+    Moyenne des nœuds de chaque cellule x période pondérée par `poids`, en un
+    groupby (valeurs manquantes ignorées, direction en moyenne vectorielle).
+    """
+    cles = [t["cellule"], t["debut"], t["fin"]]
+    x = t[colonnes].astype(float)
+    if "dir_moy_deg" in colonnes:
+        r = np.deg2rad(x.pop("dir_moy_deg"))
+        x["_sin"], x["_cos"] = np.sin(r), np.cos(r)
+    w = x.notna().mul(t["poids"], axis=0)
+    num = x.fillna(0).mul(t["poids"], axis=0).groupby(cles, sort=False).sum()
+    den = w.groupby(cles, sort=False).sum()
+    out = num / den.where(den > 0)
+    if "dir_moy_deg" in colonnes:
+        d = np.rad2deg(np.arctan2(out.pop("_sin"), out.pop("_cos")))
+        out["dir_moy_deg"] = np.where(d < 0, d + 360, d)
+    return out[colonnes]
+
+
+def table_par_cellule(affectation: pd.DataFrame, par_noeud: pd.DataFrame) -> pd.DataFrame:
+    """
+    Indicateurs de houle par cellule x période (table par_cellule), à partir du
+    nœud le plus proche ; avec plusieurs nœuds par cellule, moyenne pondérée
+    par l'inverse de la distance (nb_points : celui du nœud le plus proche).
+    Un nœud absent de par_noeud (rejeu illisible) ne fait pas disparaître ses
+    cellules : noeuds_manquants compte les nœuds de la cellule sans résultat,
+    et les indicateurs ne portent que sur les autres (NaN s'il n'en reste
+    aucun ; nb_points NaN si c'est le plus proche qui manque).
+    """
+    indicateurs = [c for c in par_noeud.columns if c not in ("noeud", "debut", "fin")]
+    manquants = sorted(set(affectation["noeud"]) - set(par_noeud["noeud"]))
+    if manquants:
+        print(f"Nœuds sans indicateurs ({', '.join(map(str, manquants))}) : cellules concernées signalées par noeuds_manquants")
+    periodes = par_noeud[["debut", "fin"]].drop_duplicates()
+    t = affectation.merge(periodes, how="cross").merge(par_noeud, on=["noeud", "debut", "fin"], how="left")
+    t["noeuds_manquants"] = t["cellule"].map(affectation["noeud"].isin(manquants).groupby(affectation["cellule"]).sum()).astype(np.int64)
+    proche = t[t["rang"] == 1].set_index(["cellule", "debut", "fin"])
+
+    if affectation["rang"].max() == 1:
+        valeurs = proche[indicateurs]
+    else:
+        moyennes = [c for c in indicateurs if c != "nb_points"]
+        valeurs = _moyennes_ponderees(t, moyennes)
+        valeurs.insert(0, "nb_points", proche["nb_points"])
+
+    out = pd.concat([proche[["noeud", "distance_km", "noeuds_manquants"]], valeurs], axis=1).reset_index()
+    out = out.rename(columns={"debut": "periode_debut", "fin": "periode_fin"})
+    return out.sort_values("cellule", kind="stable").reset_index(drop=True)
+
+
+def calculer_par_cellule(
+    dossier: Path,
+    cellules: pd.DataFrame,
+    periodes: List[Tuple[str, str]] = PERIODES,
+    k: int = K_NOEUDS,
+    n_processus: Optional[int] = N_PROCESSUS,
+    cache: CacheColonnaire = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (par_cellule, par_noeud) : seuls les nœuds retenus par au moins une cellule
+    sont lus et calculés.
+    """
+    fichiers = sorted(Path(dossier).glob("*.csv"))
+    if not fichiers:
+        raise FileNotFoundError(f"Aucun rejeu trouvé dans {dossier}")
+    noeuds = positions_noeuds(fichiers)
+    affectation = affecter_cellules(cellules, noeuds, k)
+    utiles = noeuds.loc[affectation["noeud"].unique()]
+    print(f"{len(cellules)} cellules affectées à {len(utiles)} nœuds sur {len(noeuds)}")
+    par_noeud = indicateurs_noeuds(utiles, periodes, n_processus, cache)
+    return table_par_cellule(affectation, par_noeud), par_noeud
+
+
+def main():
+    cellules = lire_cellules(FICHIER_CELLULES)
+    par_cellule, par_noeud = calculer_par_cellule(DOSSIER_NOEUDS, cellules, PERIODES, K_NOEUDS, N_PROCESSUS, houle.CACHE)
+    fichiers = sorties.exporter({"par_cellule": par_cellule, "par_noeud": par_noeud}, SORTIE)
+    print(f"Fichiers exportés : {', '.join(str(f) for f in fichiers)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from typing import List, Tuple
+import pandas as pd
+import numpy as np
+
+# périodes IGN (entre campagnes)
+PERIODES: List[Tuple[str, str]] = [
+    ("1995-01-01", "2000-12-31"),
+    ("2001-01-01", "2008-12-31"),
+    ("2009-01-01", "2012-12-31"),
+    ("2013-01-01", "2015-12-31"),
+    ("2016-01-01", "2019-12-31"),
+    ("2020-01-01", "2022-12-31"),
+]
+
+
+def _table(debuts, fins) -> pd.DataFrame:
+    # format propre à chaque borne : "2015-03-01" et "2015-03-01 05:00" peuvent se côtoyer
+    return pd.DataFrame({"debut": pd.to_datetime(debuts, format="mixed"), "fin": pd.to_datetime(fins, format="mixed")})
+
+
+def fenetres_periodes(periodes: List[Tuple[str, str]] = PERIODES) -> pd.DataFrame:
+    """Table debut/fin à partir d'une liste de tuples (ex. PERIODES)."""
+    debuts, fins = zip(*periodes) if periodes else ([], [])
+    return _table(list(debuts), list(fins))
+
+
+def fenetres_mois(debut: str, fin: str, duree_min_mois: int = 1, duree_max_mois: int = None) -> pd.DataFrame:
+    """
+    Toutes les fenêtres [1er jour du mois a, dernier jour du mois b] avec a <= b,
+    pour a et b entre debut et fin. La fin est le dernier jour à 00:00,
+    comme dans PERIODES.
+    """
+    mois = pd.period_range(debut, fin, freq="M")
+    ia, ib = np.triu_indices(len(mois))
+    duree = ib - ia + 1
+    garde = duree >= duree_min_mois
+    if duree_max_mois is not None:
+        garde &= duree <= duree_max_mois
+    ia, ib = ia[garde], ib[garde]
+    return _table(mois[ia].start_time, mois[ib].end_time.normalize())
+
+
+def fenetres_glissantes(debut: str, fin: str, annees: int, pas_mois: int = 1) -> pd.DataFrame:
+    """
+    Fenêtres de `annees` ans commençant tous les `pas_mois` mois, entièrement
+    comprises entre debut et fin.
+    """
+    debuts = pd.date_range(debut, fin, freq=pd.DateOffset(months=pas_mois))
+    fins = debuts + pd.DateOffset(years=annees) - pd.Timedelta(days=1)
+    garde = fins <= pd.Timestamp(fin)
+    return _table(debuts[garde], fins[garde])
+
+
+def fenetres_table(table) -> pd.DataFrame:
+    """
+    Normalise une table de fenêtres fournie par l'utilisateur : DataFrame avec
+    colonnes debut/fin (ou les deux premières colonnes), ou liste de tuples.
+    """
+    if isinstance(table, pd.DataFrame):
+        if {"debut", "fin"} <= set(table.columns):
+            return _table(table["debut"], table["fin"])
+        return _table(table.iloc[:, 0], table.iloc[:, 1])
+    return fenetres_periodes(list(table))
@@ -0,0 +1,175 @@
+from pathlib import Path
+from typing import Dict, Tuple
+import pandas as pd
+import numpy as np
+import code_indicateurs_meteo as meteo
+import codeetatdemer as houle
+import marnage
+from periodes import PERIODES, fenetres_table
+from sequences import Sequences
+from memoire import en_float64
+import sorties
+
+SORTIE = Path.home() / "Downloads" / "sensibilite_seuils.xlsx"
+
+# Séquences comptées : au moins LONGUEUR_MIN_J jours consécutifs au-delà du seuil
+LONGUEUR_MIN_J = 3
+
+# Grilles de seuils par variable : (source, colonne, sens, seuils, points par jour)
+GRILLES: Dict[str, Tuple[str, str, str, np.ndarray, int]] = {
+    "pluie_mm": ("meteo", "RR1", ">", np.arange(0.0, 30.01, 0.5), 1),
+    "rafale_kmh": ("meteo", "FXI_kmh", ">", np.arange(40.0, 120.01, 2.0), 1),
+    "pmer_hpa": ("meteo", "PMER", "<", np.arange(970.0, 1015.01, 1.0), 1),
+    "tx_c": ("meteo", "TX", ">", np.arange(15.0, 35.01, 1.0), 1),
+    "hs_m": ("houle", "hs", ">", np.arange(1.0, 6.01, 0.25), 24),
+    "marnage_m": ("maree", "marnage_m", ">", np.arange(5.0, 10.01, 0.25), 1),
+}
+
+# Seuils des scripts, ajoutés aux grilles et repérés dans la sortie (seuil_actuel)
+SEUILS_ACTUELS = {
+    "pluie_mm": [meteo.PLUIE_JOUR_MM, meteo.FORTE_PLUIE_JOUR_MM],
+    "rafale_kmh": [meteo.VENT_FORT_KMH, meteo.TEMPETE_KMH],
+    "pmer_hpa": [meteo.BASSE_PRESSION_HPA, meteo.TRES_BASSE_PRESSION_HPA],
+    "tx_c": [meteo.SEUIL_JOUR_TRES_CHAUD],
+    "hs_m": [3.0, 4.0],
+    "marnage_m": [8.0, 9.0],
+}
+
+OPERATEURS = {
+    ">": np.greater, ">=": np.greater_equal,
+    "<": np.less, "<=": np.less_equal,
+}
+
+
+# -----------------------------
+# Balayage d'une série
+# -----------------------------
+
+def _nb_depassements(tri: np.ndarray, seuils: np.ndarray, sens: str) -> np.ndarray:
+    """Nombre de valeurs triées (sans NaN) vérifiant `valeur sens seuil`, pour tous les seuils par recherche binaire."""
+    if sens == ">":
+        return len(tri) - np.searchsorted(tri, seuils, side="right")
+    if sens == ">=":
+        return len(tri) - np.searchsorted(tri, seuils, side="left")
+    if sens == "<":
+        return np.searchsorted(tri, seuils, side="left")
+    if sens == "<=":
+        return np.searchsorted(tri, seuils, side="right")
+    raise ValueError(f"Opérateur inconnu : {sens}")
+
+
+def balayer_seuils(
+    serie: pd.Series,
+    seuils,
+    fenetres=PERIODES,
+    sens: str = ">",
+    points_par_jour: int = 1,
+    sequences: bool = True,
+) -> pd.DataFrame:
+    """
+    Dépassements d'une série temporelle pour chaque seuil x fenêtre.
+    Les valeurs de chaque fenêtre sont triées une fois ; tous les seuils
+    se résolvent ensuite par recherche binaire. Avec sequences=True, le
+    nombre de séquences d'au moins LONGUEUR_MIN_J jours et la plus longue
+    séquence (jours) sont ajoutés : un masque par seuil, toutes les fenêtres
+    en un appel (cf. Sequences).
+    Table longue : debut, fin, seuil, nb_valeurs, nb_depassements, jours_depassement
+    [, nb_sequences_<LONGUEUR_MIN_J>j, plus_longue_sequence_j].
+    """
+    if not serie.index.is_monotonic_increasing:
+        serie = serie.sort_index()
+    seuils = np.asarray(seuils, dtype=float)
+    fen = fenetres_table(fenetres)
+    d = fen["debut"].to_numpy(dtype="datetime64[ns]")
+    f = fen["fin"].to_numpy(dtype="datetime64[ns]")
+    temps = serie.index.to_numpy(dtype="datetime64[ns]")
+    valeurs = en_float64(serie).to_numpy()
+    i0 = np.searchsorted(temps, d, side="left")
+    i1 = np.maximum(np.searchsorted(temps, f, side="right"), i0)
+
+    nb_valeurs = np.empty(len(fen), dtype=np.int64)
+    comptes = np.empty((len(fen), len(seuils)), dtype=np.int64)
+    for k, (a, b) in enumerate(zip(i0, i1)):
+        v = valeurs[a:b]
+        tri = np.sort(v[~np.isnan(v)])
+        nb_valeurs[k] = len(tri)
+        comptes[k] = _nb_depassements(tri, seuils, sens)
+
+    out = pd.DataFrame({
+        "debut": np.repeat(fen["debut"].to_numpy(), len(seuils)),
+        "fin": np.repeat(fen["fin"].to_numpy(), len(seuils)),
+        "seuil": np.tile(seuils, len(fen)),
+        "nb_valeurs": np.repeat(nb_valeurs, len(seuils)),
+        "nb_depassements": comptes.ravel(),
+    })
+    out["jours_depassement"] = out["nb_depassements"] / points_par_jour
+
+    if sequences:
+        op = OPERATEURS[sens]
+        nb_seq = np.empty((len(fen), len(seuils)), dtype=np.int64)
+        plus_longue = np.empty((len(fen), len(seuils)))
+        with np.errstate(invalid="ignore"):
+            for j, s in enumerate(seuils):
+                seq = Sequences(pd.Series(op(valeurs, s), index=serie.index))
+                nb_seq[:, j] = seq.nb_sequences(LONGUEUR_MIN_J * points_par_jour, d, f)
+                plus_longue[:, j] = seq.plus_longue(d, f)
+        out[f"nb_sequences_{LONGUEUR_MIN_J}j"] = nb_seq.ravel()
+        out["plus_longue_sequence_j"] = plus_longue.ravel() / points_par_jour
+    return out
+
+
+# -----------------------------
+# Variables BDMOMA
+# -----------------------------
+
+def series_sources(daily_meteo: pd.DataFrame = None, maree: pd.DataFrame = None, houle_horaire: pd.DataFrame = None) -> Dict[str, pd.DataFrame]:
+    """Tables lues par GRILLES : journalier météo (+ FXI_kmh), marnage journalier, houle horaire."""
+    sources = {}
+    if daily_meteo is not None:
+        sources["meteo"] = daily_meteo.assign(FXI_kmh=meteo.vent_kmh(daily_meteo["FXI"])) if "FXI" in daily_meteo.columns else daily_meteo
+    if maree is not None:
+        jour = en_float64(maree.set_index("Date")["Valeur"]).resample("D").agg(["max", "min"])
+        sources["maree"] = pd.DataFrame({"marnage_m": jour["max"] - jour["min"]})
+    if houle_horaire is not None:
+        sources["houle"] = houle_horaire.set_index("time")
+    return sources
+
+
+def balayer_grilles(
+    sources: Dict[str, pd.DataFrame],
+    grilles: Dict[str, Tuple[str, str, str, np.ndarray, int]] = GRILLES,
+    fenetres=PERIODES,
+    sequences: bool = True,
+) -> pd.DataFrame:
+    """
+    balayer_seuils pour chaque variable des grilles dont la source est fournie
+    (cf. series_sources), seuils actuels des scripts compris.
+    Table longue : variable, sens, debut, fin, seuil, seuil_actuel, statistiques.
+    """
+    tables = []
+    for variable, (source, colonne, sens, seuils, points_par_jour) in grilles.items():
+        if source not in sources or colonne not in sources[source].columns:
+            print(f"Variable ignorée ({variable}) : {source}.{colonne} absente")
+            continue
+        actuels = np.asarray(SEUILS_ACTUELS.get(variable, []), dtype=float)
+        seuils = np.union1d(np.round(np.asarray(seuils, dtype=float), 10), actuels)
+        res = balayer_seuils(sources[source][colonne], seuils, fenetres, sens, points_par_jour, sequences)
+        res.insert(0, "variable", variable)
+        res.insert(1, "sens", sens)
+        res.insert(5, "seuil_actuel", np.isin(res["seuil"], actuels))
+        tables.append(res)
+    return pd.concat(tables, ignore_index=True)
+
+
+def main():
+    daily = meteo.resumer_journalier(meteo.charger_dossier(meteo.CHEMIN_DOSSIER, meteo.N_PROCESSUS, meteo.CACHE, meteo.COMPACT), meteo.MASQUER_JOURS_SOUS_COUVERTS)
+    maree = marnage.charger_donnees(marnage.DOSSIER, marnage.N_PROCESSUS, marnage.CACHE)
+    houle_horaire = houle.CACHE.lire(houle.CHEMIN_FICHIER, houle.lire_houle) if houle.CACHE is not None else houle.lire_houle(houle.CHEMIN_FICHIER)
+
+    res = balayer_grilles(series_sources(daily, maree, houle_horaire), GRILLES, PERIODES)
+    fichiers = sorties.exporter(res, SORTIE)
+    print(f"{res['variable'].nunique()} variables, {len(res)} couples seuil x période : {', '.join(str(f) for f in fichiers)}")
+
+
+if __name__ == "__main__":
+    main()
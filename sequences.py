@@ -0,0 +1,110 @@
+from typing import Dict
+import pandas as pd
+import numpy as np
+from index_cumule import IndexCumule, _temps
+
+
+def _sortie(x, scalaire: bool):
+    return x[0] if scalaire else x
+
+
+class Sequences:
+    """
+    Séquences (plages consécutives) de valeurs vraies d'une série booléenne triée.
+    Les bornes de toutes les séquences sont calculées une fois ; une fenêtre
+    [debut, fin] se résout ensuite par searchsorted. Une séquence qui déborde
+    de la fenêtre n'est comptée que pour sa partie dans la fenêtre, comme si
+    la série avait d'abord été découpée à la période.
+    debut/fin peuvent être des scalaires ou des tableaux (une valeur par fenêtre) ;
+    les méthodes *_pos prennent directement les positions [i0, i1[ des fenêtres.
+    """
+
+    def __init__(self, masque: pd.Series):
+        if not masque.index.is_monotonic_increasing:
+            masque = masque.sort_index()
+        self.temps = masque.index.to_numpy(dtype="datetime64[ns]")
+        m = masque.fillna(False).to_numpy(dtype=bool)
+        bords = np.diff(np.r_[0, m.astype(np.int8), 0])
+        self.debuts = np.flatnonzero(bords == 1)   # première position de chaque séquence
+        self.fins = np.flatnonzero(bords == -1)    # position qui suit la dernière
+        self.longueurs = self.fins - self.debuts
+        self._comptes: Dict[int, np.ndarray] = {}
+        self._max = None
+
+    def _positions(self, debut, fin):
+        d, f = _temps(debut), _temps(fin)
+        i0 = np.searchsorted(self.temps, d, side="left")
+        i1 = np.maximum(np.searchsorted(self.temps, f, side="right"), i0)
+        return i0, i1
+
+    def _chevauchement(self, i0: np.ndarray, i1: np.ndarray):
+        """Séquences [r0, r1[ qui recoupent [i0, i1[ et longueurs découpées de la première et de la dernière."""
+        r0 = np.searchsorted(self.fins, i0, side="right")
+        r1 = np.maximum(np.searchsorted(self.debuts, i1, side="left"), r0)
+        n = r1 - r0
+        premiere = np.minimum(r0, max(len(self.debuts) - 1, 0))
+        derniere = np.maximum(r1 - 1, 0)
+        if len(self.debuts):
+            l_prem = np.minimum(self.fins[premiere], i1) - np.maximum(self.debuts[premiere], i0)
+            l_der = np.minimum(self.fins[derniere], i1) - np.maximum(self.debuts[derniere], i0)
+        else:
+            l_prem = l_der = np.zeros(len(i0), dtype=np.int64)
+        l_prem = np.where(n > 0, l_prem, 0)
+        l_der = np.where(n > 1, l_der, 0)
+        return r0, r1, n, l_prem, l_der
+
+    def nb_points(self, debut, fin):
+        i0, i1 = self._positions(debut, fin)
+        return _sortie(i1 - i0, np.ndim(debut) == 0)
+
+    def nb_sequences(self, longueur_min: int, debut, fin):
+        """Nombre de séquences d'au moins longueur_min points dans la fenêtre."""
+        i0, i1 = self._positions(debut, fin)
+        return _sortie(self.nb_sequences_pos(longueur_min, i0, i1), np.ndim(debut) == 0)
+
+    def nb_sequences_pos(self, longueur_min: int, i0: np.ndarray, i1: np.ndarray) -> np.ndarray:
+        """nb_sequences sur les positions [i0, i1[ de la série."""
+        i0, i1 = np.atleast_1d(i0), np.atleast_1d(i1)
+        i1 = np.maximum(i1, i0)
+        r0, r1, n, l_prem, l_der = self._chevauchement(i0, i1)
+        if longueur_min not in self._comptes:
+            self._comptes[longueur_min] = np.r_[0, np.cumsum(self.longueurs >= longueur_min)]
+        c = self._comptes[longueur_min]
+        # séquences intérieures [r0 + 1, r1 - 1[ : entières
+        a, b = np.minimum(r0 + 1, r1), np.maximum(r1 - 1, np.minimum(r0 + 1, r1))
+        interieur = c[b] - c[a]
+        total = interieur + (l_prem >= longueur_min) * (n > 0) + (l_der >= longueur_min) * (n > 1)
+        return total.astype(np.int64)
+
+    def plus_longue(self, debut, fin):
+        """Longueur de la plus longue séquence de la fenêtre (0 si aucune)."""
+        i0, i1 = self._positions(debut, fin)
+        return _sortie(self.plus_longue_pos(i0, i1), np.ndim(debut) == 0)
+
+    def plus_longue_pos(self, i0: np.ndarray, i1: np.ndarray) -> np.ndarray:
+        """plus_longue sur les positions [i0, i1[ de la série."""
+        i0, i1 = np.atleast_1d(i0), np.atleast_1d(i1)
+        i1 = np.maximum(i1, i0)
+        r0, r1, n, l_prem, l_der = self._chevauchement(i0, i1)
+        out = np.maximum(l_prem, l_der).astype(float)
+        if len(self.longueurs):
+            if self._max is None:
+                self._max = IndexCumule(pd.Series(self.longueurs.astype(float), index=self.temps[self.debuts]))
+            interieur = self._max.extreme_pos("max", np.minimum(r0 + 1, r1), np.maximum(r1 - 1, r0))
+            out = np.fmax(out, interieur)
+        return out.astype(np.int64)
+
+    def sequences(self, debut, fin, longueur_min: int = 1) -> pd.DataFrame:
+        """Séquences d'une fenêtre, découpées à ses bornes : dates de début/fin et longueur."""
+        i0, i1 = self._positions(debut, fin)
+        i0, i1 = i0[0], i1[0]
+        r0, r1, _, _, _ = self._chevauchement(np.array([i0]), np.array([i1]))
+        d = np.maximum(self.debuts[r0[0]:r1[0]], i0)
+        f = np.minimum(self.fins[r0[0]:r1[0]], i1)
+        garde = (f - d) >= longueur_min
+        d, f = d[garde], f[garde]
+        return pd.DataFrame({
+            "debut": self.temps[d],
+            "fin": self.temps[f - 1],
+            "longueur": f - d,
+        })
@@ -0,0 +1,97 @@
+import importlib.util
+from pathlib import Path
+from typing import Dict, List, Union
+import pandas as pd
+from instrumentation import etape
+
+# Formats écrits par défaut à côté de chaque table (parquet et feather se lisent
+# dans R via arrow::read_parquet / read_feather, csv via read.csv)
+FORMATS = ["parquet", "csv"]
+
+# Classeur Excel écrit en dernière étape (False = pas d'Excel)
+EXCEL = True
+
+
+def moteur_excel() -> str:
+    """xlsxwriter s'il est installé, sinon openpyxl en écriture seule."""
+    return "xlsxwriter" if importlib.util.find_spec("xlsxwriter") is not None else "openpyxl"
+
+
+def _ecrire_format(df: pd.DataFrame, chemin: Path, fmt: str) -> None:
+    if fmt == "csv":
+        # séparateur ',' et point décimal : lu tel quel par read.csv
+        df.to_csv(chemin, index=False, encoding="utf-8")
+    elif fmt == "parquet":
+        df.to_parquet(chemin, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(chemin)
+    else:
+        raise ValueError(f"Format inconnu : {fmt}")
+
+
+def _classeur_openpyxl(feuilles: Dict[str, pd.DataFrame], chemin: Path) -> None:
+    """Classeur en mode écriture seule d'openpyxl (lignes ajoutées en flux, sans cellules adressables)."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for nom, df in feuilles.items():
+        ws = wb.create_sheet(nom[:31])
+        ws.append([str(c) for c in df.columns])
+        valeurs = df.astype(object).where(df.notna(), None)
+        for ligne in valeurs.itertuples(index=False, name=None):
+            ws.append(ligne)
+    wb.save(chemin)
+
+
+def ecrire_classeur(feuilles: Dict[str, pd.DataFrame], chemin: Path) -> None:
+    """Toutes les feuilles dans un seul classeur, en une passe."""
+    if moteur_excel() == "xlsxwriter":
+        with pd.ExcelWriter(chemin, engine="xlsxwriter") as writer:
+            for nom, df in feuilles.items():
+                df.to_excel(writer, sheet_name=nom[:31], index=False)
+    else:
+        _classeur_openpyxl(feuilles, chemin)
+
+
+def exporter(
+    tables: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+    chemin: Path,
+    formats: List[str] = None,
+    excel: bool = None,
+) -> List[Path]:
+    """
+    Exporte une table, ou plusieurs feuilles {nom: table}, à partir du chemin
+    du classeur Excel (p. ex. indicateurs_pour_R.xlsx) :
+    - une table : <chemin>.parquet, <chemin>.csv... puis <chemin>.xlsx
+    - des feuilles : "<nom du classeur> - <feuille>.csv" (les noms lus par les
+      scripts R), idem en parquet/feather, puis un classeur avec toutes les feuilles
+    Renvoie les fichiers écrits.
+    """
+    chemin = Path(chemin)
+    formats = FORMATS if formats is None else formats
+    excel = EXCEL if excel is None else excel
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+
+    ecrits = []
+    if isinstance(tables, pd.DataFrame):
+        for fmt in formats:
+            ecrits.append(chemin.with_suffix(f".{fmt}"))
+            with etape("export", format=fmt, fichier=ecrits[-1].name) as e:
+                _ecrire_format(tables, ecrits[-1], fmt)
+                e.lignes = len(tables)
+        feuilles = {"Sheet1": tables}
+    else:
+        for nom, df in tables.items():
+            for fmt in formats:
+                ecrits.append(chemin.with_name(f"{chemin.name} - {nom}.{fmt}"))
+                with etape("export", format=fmt, fichier=ecrits[-1].name) as e:
+                    _ecrire_format(df, ecrits[-1], fmt)
+                    e.lignes = len(df)
+        feuilles = tables
+
+    if excel:
+        with etape("export", format="xlsx", fichier=chemin.with_suffix(".xlsx").name) as e:
+            ecrire_classeur(feuilles, chemin.with_suffix(".xlsx"))
+            e.lignes = sum(len(df) for df in feuilles.values())
+        ecrits.append(chemin.with_suffix(".xlsx"))
+    return ecrits
@@ -0,0 +1,173 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import code_indicateurs_meteo as meteo
+from balayage import balayer_meteo
+from cache_donnees import CacheColonnaire, lecteur_avec_cache
+from ingestion import lire_fichiers, fusion_dedoublonnee
+from periodes import PERIODES
+from instrumentation import etape
+from memoire import elargir
+import sorties
+
+# Dossiers Météo-France ; une station par NUM_POSTE (par dossier pour les CSV sans NUM_POSTE)
+DOSSIERS_STATIONS = [meteo.CHEMIN_DOSSIER]
+SORTIE = Path.home() / "Downloads" / "indicateurs_meteo_stations.xlsx"
+COLONNE_STATION = "station"
+
+
+# -----------------------------
+# Chargement
+# -----------------------------
+
+def _identifiants(df: pd.DataFrame, dossier: str) -> pd.Series:
+    """Station de chaque ligne : son NUM_POSTE (en texte), le nom du dossier si la colonne manque ou est vide."""
+    if meteo.COLONNE_POSTE not in df.columns:
+        return pd.Series(dossier, index=df.index, dtype=object)
+    poste = df[meteo.COLONNE_POSTE]
+    return poste.astype(str).astype(object).where(poste.notna().to_numpy(), dossier)
+
+
+def charger_stations(
+    dossiers: List[str],
+    n_processus: Optional[int] = 1,
+    cache: CacheColonnaire = None,
+    compact: bool = False,
+) -> pd.DataFrame:
+    """
+    Charge les CSV de plusieurs dossiers en un seul lot de lecture (tous les
+    fichiers se partagent les processus), puis fusionne avec une ligne par
+    station et par heure (cf. charger_dossier).
+    Ajoute la colonne `station` : NUM_POSTE de chaque ligne, de sorte qu'un
+    CSV multi-stations donne une station par poste et qu'un même poste
+    réparti sur plusieurs dossiers reste une seule station ; à défaut de
+    NUM_POSTE, le nom du dossier.
+    """
+    dossier_de: Dict[Path, str] = {}
+    for d in dossiers:
+        fichiers = sorted(Path(d).glob("*.csv"))
+        if not fichiers:
+            print(f"Aucun CSV trouvé dans {d}")
+        for f in fichiers:
+            dossier_de[f] = Path(d).name
+    if not dossier_de:
+        raise FileNotFoundError("Aucun CSV trouvé dans les dossiers des stations")
+
+    lecteur = meteo.lire_csv_meteo_compact if compact else meteo.lire_csv_meteo
+    frames = []
+    for f, df in lire_fichiers(lecteur_avec_cache(lecteur, cache), list(dossier_de), n_processus):
+        frames.append(df.assign(**{COLONNE_STATION: _identifiants(df, dossier_de[f])}))
+
+    df = fusion_dedoublonnee(frames, station=COLONNE_STATION)
+    df[COLONNE_STATION] = df[COLONNE_STATION].astype("category")
+    return df
+
+
+# -----------------------------
+# Agrégation journalière groupée
+# -----------------------------
+
+def resumer_journalier_stations(df: pd.DataFrame, colonne: str = COLONNE_STATION) -> pd.DataFrame:
+    """
+    resumer_journalier pour toutes les stations en un seul resample groupé.
+    `colonne` : identifiant de station (colonne station de charger_stations,
+    ou NUM_POSTE d'un CSV multi-stations). Index (station, datetime).
+    Table compacte repassée en float64 comme dans resumer_journalier.
+    """
+    df = elargir(df)
+    colonnes = list(meteo.AGREGATION_JOURNALIERE)
+    jour = df.index.floor("D").rename("datetime")
+    daily = df.groupby([df[colonne], jour], observed=True, sort=True)[colonnes].agg(meteo.AGREGATION_JOURNALIERE)
+
+    # jours sans mesure : comme resample, toute la plage de chaque station est couverte
+    plages = daily.index.to_frame(index=False).groupby(colonne, observed=True, sort=False)["datetime"].agg(["min", "max"])
+    complet = pd.MultiIndex.from_tuples(
+        [(s, j) for s, (a, b) in plages.iterrows() for j in pd.date_range(a, b, freq="D")],
+        names=[colonne, "datetime"],
+    )
+    daily = daily.reindex(complet)
+    for col, op in meteo.AGREGATION_JOURNALIERE.items():
+        if op == "sum":
+            daily[col] = daily[col].fillna(0)
+    daily["AMPLI"] = daily["TX"] - daily["TN"]
+    return daily
+
+
+# -----------------------------
+# Indicateurs par station
+# -----------------------------
+
+def _indicateurs_station(daily: pd.DataFrame, periodes: List[Tuple[str, str]]) -> pd.DataFrame:
+    """
+    Toutes les périodes d'une station en un balayage : balayer_meteo évalue
+    INDICATEURS_PERIODE, d'où les valeurs de indicateurs_periode sur la table
+    journalière de la station (sommes au dernier bit près).
+    """
+    res = balayer_meteo(daily, periodes)
+    res["periode_debut"] = [a for a, _ in periodes]
+    res["periode_fin"] = [b for _, b in periodes]
+    return res.drop(columns=["debut", "fin"])
+
+
+def indicateurs_stations(
+    daily: pd.DataFrame,
+    periodes: List[Tuple[str, str]] = PERIODES,
+    n_processus: Optional[int] = 1,
+) -> pd.DataFrame:
+    """
+    Indicateurs de toutes les périodes pour chaque station de `daily`
+    (cf. resumer_journalier_stations), une station par processus si n_processus > 1.
+    Table longue : station, periode_debut, periode_fin, indicateur, valeur.
+    """
+    stations = list(daily.index.get_level_values(0).unique())
+    tables = [daily.xs(s, level=0) for s in stations]
+
+    if n_processus is None:
+        n_processus = os.cpu_count() or 1
+    n_processus = max(1, min(n_processus, len(stations)))
+    if n_processus == 1:
+        resultats = [_indicateurs_station(t, periodes) for t in tables]
+    else:
+        with ProcessPoolExecutor(max_workers=n_processus) as pool:
+            futurs = [pool.submit(_indicateurs_station, t, periodes) for t in tables]
+            resultats = [futur.result() for futur in futurs]
+
+    longs = []
+    for s, res in zip(stations, resultats):
+        res.insert(0, COLONNE_STATION, s)
+        longs.append(res.melt(
+            id_vars=[COLONNE_STATION, "periode_debut", "periode_fin"],
+            var_name="indicateur", value_name="valeur",
+        ))
+    out = pd.concat(longs, ignore_index=True)
+    out["valeur"] = out["valeur"].astype(float)
+    return out
+
+
+def calculer_indicateurs_stations(
+    dossiers: List[str],
+    periodes: List[Tuple[str, str]] = PERIODES,
+    n_processus: Optional[int] = 1,
+    cache: CacheColonnaire = None,
+    compact: bool = False,
+) -> pd.DataFrame:
+    df = charger_stations(dossiers, n_processus, cache, compact)
+    with etape("resume_journalier", source="meteo_stations") as e:
+        daily = resumer_journalier_stations(df)
+        e.lignes = len(df)
+    with etape("indicateurs", source="meteo_stations", periodes=len(periodes)) as e:
+        res = indicateurs_stations(daily, periodes, n_processus)
+        e.lignes = len(daily)
+    return res
+
+
+def main():
+    res = calculer_indicateurs_stations(DOSSIERS_STATIONS, PERIODES, meteo.N_PROCESSUS, meteo.CACHE, meteo.COMPACT)
+    fichiers = sorties.exporter(res, SORTIE)
+    print(f"Fichiers exportés : {', '.join(str(f) for f in fichiers)} ({res[COLONNE_STATION].nunique()} stations)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+import code_indicateurs_meteo as meteo
+import codeetatdemer as houle
+import marnage
+import extremes_maree
+from balayage import balayer_houle
+from index_cumule import IndexCumule
+from memoire import en_float64
+from periodes import PERIODES, fenetres_table
+
+# Table journalière commune (Arrow IPC / Feather non compressé : lisible par
+# projection en mémoire, et directement par arrow::read_feather côté R)
+FICHIER_TABLE = Path.home() / "Downloads" / "variables_journalieres.feather"
+
+UN_JOUR = pd.Timedelta(days=1)
+UN_NS = pd.Timedelta(1, "ns")
+
+# Statistiques journalières de houle, mêmes définitions que les indicateurs par période
+INDICATEURS_HOULE_JOUR = ["hs_moy", "hs_max", "t02_moy", "t02_max", "energie_cumulee_Jm2", "%_houles_ouest", "dir_moy_deg"]
+
+# Opérateurs des conditions de compter_jours
+OPERATEURS = {
+    ">": np.greater, ">=": np.greater_equal,
+    "<": np.less, "<=": np.less_equal,
+}
+
+
+# -----------------------------
+# Variables journalières par source
+# -----------------------------
+
+def journalier_maree(df: pd.DataFrame) -> pd.DataFrame:
+    """Marnage journalier (max - min), hauteur max et marnage des marées détectées."""
+    hauteur = en_float64(df.set_index("Date")["Valeur"])
+    jour = hauteur.resample("D").agg(["max", "min"])
+    out = pd.DataFrame({
+        "marnage_m": jour["max"] - jour["min"],
+        "hauteur_max_m": jour["max"],
+    })
+    out["marnage_marees_m"] = extremes_maree.tables_marees(hauteur)["jours"].reindex(out.index)
+    return out.add_prefix("maree_")
+
+
+def journalier_houle(df: pd.DataFrame) -> pd.DataFrame:
+    """Statistiques de houle de chaque jour (balayage de fenêtres d'un jour)."""
+    t = df["time"]
+    jours = pd.date_range(t.min().floor("D"), t.max().floor("D"), freq="D")
+    fen = pd.DataFrame({"debut": jours, "fin": jours + UN_JOUR - UN_NS})
+    res = balayer_houle(df, fen, INDICATEURS_HOULE_JOUR)
+    out = res.drop(columns=["debut", "fin"]).set_index(jours)
+    return out.add_prefix("houle_")
+
+
+def journalier_meteo(daily: pd.DataFrame) -> pd.DataFrame:
+    """Table de resumer_journalier et rafale en km/h (vent_kmh), colonnes préfixées."""
+    out = daily.copy()
+    if "FXI" in out.columns:
+        out["FXI_kmh"] = meteo.vent_kmh(out["FXI"])
+    return out.add_prefix("meteo_")
+
+
+# -----------------------------
+# Construction / écriture / lecture
+# -----------------------------
+
+def construire_table(
+    maree: pd.DataFrame = None,
+    houle_horaire: pd.DataFrame = None,
+    daily_meteo: pd.DataFrame = None,
+    cellule: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Aligne sur un même index journalier (union des jours) les variables
+    journalières disponibles : hauteurs de marée (Date/Valeur), houle horaire
+    (time/hs/t02/dp) et table de resumer_journalier. Une colonne `cellule`
+    est ajoutée si fournie, pour empiler plusieurs cellules dans une table.
+    """
+    parties = []
+    if maree is not None:
+        parties.append(journalier_maree(maree))
+    if houle_horaire is not None:
+        parties.append(journalier_houle(houle_horaire))
+    if daily_meteo is not None:
+        parties.append(journalier_meteo(daily_meteo))
+    if not parties:
+        raise ValueError("Aucune source fournie.")
+
+    table = pd.concat(parties, axis=1, join="outer").sort_index()
+    table.index.name = "jour"
+    if cellule is not None:
+        table.insert(0, "cellule", cellule)
+    return table
+
+
+def ecrire_table(table: pd.DataFrame, chemin: Path = FICHIER_TABLE) -> None:
+    """Écrit la table au format Feather non compressé (projection mémoire possible)."""
+    df = table.reset_index()
+    if "cellule" in df.columns:
+        df["cellule"] = df["cellule"].astype("category")
+    df.to_feather(chemin, compression="uncompressed")
+    print(f"Table journalière écrite : {chemin} ({len(df)} jours x {df.shape[1] - 1} variables)")
+
+
+def lire_table(
+    chemin: Path = FICHIER_TABLE,
+    colonnes: List[str] = None,
+    debut: str = None,
+    fin: str = None,
+    cellule: str = None,
+) -> pd.DataFrame:
+    """
+    Lit la table en projection mémoire, seulement les colonnes demandées,
+    puis restreint à [debut, fin] (jours inclus) et à une cellule.
+    """
+    import pyarrow.feather as feather
+
+    if colonnes is not None:
+        cles = ["jour"] + (["cellule"] if cellule is not None else [])
+        colonnes = cles + [c for c in colonnes if c not in cles]
+    table = feather.read_table(chemin, columns=colonnes, memory_map=True)
+    df = table.to_pandas()
+    if cellule is not None:
+        df = df[df["cellule"] == cellule]
+    df = df.set_index("jour")
+    if debut is not None or fin is not None:
+        df = df.sort_index().loc[debut:fin]
+    return df
+
+
+# -----------------------------
+# Requêtes croisées
+# -----------------------------
+
+def masque_conditions(table: pd.DataFrame, conditions: Dict[str, Tuple[str, float]]) -> pd.Series:
+    """
+    Jours où toutes les conditions {colonne: (opérateur, seuil)} sont vraies,
+    p. ex. {"meteo_FXI_kmh": (">", 80), "maree_marnage_m": (">", 8), "houle_hs_max": (">", 3)}.
+    Un jour sans valeur pour une des colonnes ne remplit pas la condition.
+    """
+    masque = np.ones(len(table), dtype=bool)
+    for col, (op, seuil) in conditions.items():
+        if op not in OPERATEURS:
+            raise ValueError(f"Opérateur inconnu : {op}")
+        masque &= OPERATEURS[op](table[col].to_numpy(dtype=float), seuil)
+    return pd.Series(masque, index=table.index)
+
+
+def compter_jours(
+    table: pd.DataFrame,
+    conditions: Dict[str, Tuple[str, float]],
+    periodes: List[Tuple[str, str]] = PERIODES,
+) -> pd.DataFrame:
+    """
+    Nombre de jours de chaque période remplissant toutes les conditions
+    (sommes cumulées), par cellule si la table en empile plusieurs.
+    """
+    if "cellule" in table.columns:
+        return pd.concat([
+            compter_jours(t.drop(columns="cellule"), conditions, periodes).assign(cellule=c)
+            for c, t in table.groupby("cellule", observed=True)
+        ], ignore_index=True)
+    masque = masque_conditions(table, conditions)
+    fen = fenetres_table(periodes)
+    index = IndexCumule(masque.astype(float))
+    fen["nb_jours"] = index.somme(fen["debut"].to_numpy(), fen["fin"].to_numpy()).astype(np.int64)
+    return fen
+
+
+# -----------------------------
+# Exécution
+# -----------------------------
+
+def main():
+    df_maree = marnage.charger_donnees(marnage.DOSSIER, marnage.N_PROCESSUS, marnage.CACHE)
+    df_houle = houle.CACHE.lire(houle.CHEMIN_FICHIER, houle.lire_houle) if houle.CACHE is not None else houle.lire_houle(houle.CHEMIN_FICHIER)
+    daily = meteo.resumer_journalier(meteo.charger_dossier(meteo.CHEMIN_DOSSIER, meteo.N_PROCESSUS, meteo.CACHE, meteo.COMPACT), meteo.MASQUER_JOURS_SOUS_COUVERTS)
+
+    table = construire_table(df_maree, df_houle, daily)
+    ecrire_table(table, FICHIER_TABLE)
+
+    # exemple de requête croisée : tempête, fort marnage et forte houle le même jour
+    print(compter_jours(table, {
+        "meteo_FXI_kmh": (">", meteo.TEMPETE_KMH),
+        "maree_marnage_m": (">", 8),
+        "houle_hs_max": (">", 3),
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+from pathlib import Path
+from typing import Dict, Tuple
+import pandas as pd
+import numpy as np
+import code_indicateurs_meteo as meteo
+import codeetatdemer as houle
+import marnage
+from balayage import RHO, G
+from index_cumule import IndexCumule, _temps
+from memoire import en_float64
+from periodes import PERIODES, fenetres_table
+from sensibilite_seuils import series_sources
+import sorties
+
+SORTIE = Path.home() / "Downloads" / "catalogue_tempetes.xlsx"
+
+# Détection par dépassement de seuil, puis regroupement (declustering) : deux
+# dépassements séparés d'au plus `separation` appartiennent au même événement.
+# variable : (source de series_sources, colonne, seuil, separation, pas de la série)
+DETECTION: Dict[str, Tuple[str, str, float, pd.Timedelta, pd.Timedelta]] = {
+    "rafale": ("meteo", "FXI_kmh", meteo.TEMPETE_KMH, pd.Timedelta(days=2), pd.Timedelta(days=1)),
+    "houle": ("houle", "hs", 4.0, pd.Timedelta(hours=24), pd.Timedelta(hours=1)),
+    "marnage": ("maree", "marnage_m", 8.0, pd.Timedelta(days=2), pd.Timedelta(days=1)),
+}
+
+UNE_HEURE = pd.Timedelta(hours=1)
+
+
+# -----------------------------
+# Détection
+# -----------------------------
+
+def detecter(serie: pd.Series, seuil: float, separation: pd.Timedelta, pas: pd.Timedelta) -> pd.DataFrame:
+    """
+    Événements d'une série : dépassements (> seuil) regroupés tant que l'écart
+    entre deux dépassements consécutifs est inférieur ou égal à `separation`.
+    Une passe sur la série, agrégats par reduceat.
+    Colonnes : debut, fin (premier et dernier dépassement), temps_pic, pic,
+    duree_h, nb_depassements, excedent_cumule (somme de (valeur - seuil) x pas en heures).
+    """
+    serie = serie.dropna()
+    if not serie.index.is_monotonic_increasing:
+        serie = serie.sort_index()
+    t = serie.index.to_numpy(dtype="datetime64[ns]")
+    v = en_float64(serie).to_numpy()
+    dep = v > seuil
+    t, v = t[dep], v[dep]
+    if not len(t):
+        return pd.DataFrame(columns=["debut", "fin", "temps_pic", "pic", "duree_h", "nb_depassements", "excedent_cumule"])
+
+    nouveau = np.r_[True, np.diff(t) > separation.to_timedelta64()]
+    starts = np.flatnonzero(nouveau)
+    ids = np.cumsum(nouveau) - 1
+    pic = np.maximum.reduceat(v, starts)
+    # premier point de chaque événement où le pic est atteint
+    au_pic = np.flatnonzero(v == pic[ids])
+    premier_pic = au_pic[np.r_[True, np.diff(ids[au_pic]) > 0]]
+    fins = np.r_[starts[1:], len(t)] - 1
+    return pd.DataFrame({
+        "debut": t[starts],
+        "fin": t[fins],
+        "temps_pic": t[premier_pic],
+        "pic": pic,
+        "duree_h": (t[fins] - t[starts] + pas.to_timedelta64()) / UNE_HEURE.to_timedelta64(),
+        "nb_depassements": np.diff(np.r_[starts, len(t)]),
+        "excedent_cumule": np.add.reduceat(v - seuil, starts) * (pas / UNE_HEURE),
+    })
+
+
+def catalogue(sources: Dict[str, pd.DataFrame], detection: Dict[str, Tuple] = DETECTION) -> pd.DataFrame:
+    """
+    Catalogue de tous les événements des variables de `detection` dont la source
+    est fournie (cf. sensibilite_seuils.series_sources), détectés une fois sur
+    toute la série. Pour la houle, energie_Jm2 : énergie cumulée (1/8 ρ g Hs²)
+    sur les heures de dépassement.
+    """
+    tables = []
+    for variable, (source, colonne, seuil, separation, pas) in detection.items():
+        if source not in sources or colonne not in sources[source].columns:
+            print(f"Variable ignorée ({variable}) : {source}.{colonne} absente")
+            continue
+        serie = en_float64(sources[source][colonne])
+        ev = detecter(serie, seuil, separation, pas)
+        if variable == "houle" and len(ev):
+            # somme de Hs² sur les dépassements de chaque événement, par cumuls
+            s = serie.dropna().sort_index()
+            ix = IndexCumule((s ** 2).where(s > seuil, 0.0))
+            ev["energie_Jm2"] = (1 / 8) * RHO * G * ix.somme(ev["debut"].to_numpy(), ev["fin"].to_numpy())
+        ev.insert(0, "variable", variable)
+        ev.insert(1, "seuil", seuil)
+        tables.append(ev)
+    out = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+    print(f"{len(out)} événements détectés")
+    return out
+
+
+# -----------------------------
+# Index d'intervalles
+# -----------------------------
+
+class IndexEvenements:
+    """
+    Index des événements d'une variable (intervalles disjoints triés, issus de
+    detecter) : les événements qui recoupent une fenêtre [debut, fin] forment
+    une plage contiguë, trouvée par deux searchsorted ; les agrégats de la
+    plage se lisent dans des cumuls (max par table creuse). Un événement à
+    cheval sur une borne compte en entier.
+    """
+
+    def __init__(self, evenements: pd.DataFrame):
+        self.evenements = evenements.sort_values("debut", kind="stable").reset_index(drop=True)
+        self.debuts = self.evenements["debut"].to_numpy(dtype="datetime64[ns]")
+        self.fins = self.evenements["fin"].to_numpy(dtype="datetime64[ns]")
+        self._index = {
+            col: IndexCumule(pd.Series(self.evenements[col].to_numpy(dtype=float), index=self.debuts))
+            for col in ["pic", "duree_h", "excedent_cumule", "energie_Jm2"] if col in self.evenements.columns
+        }
+
+    def plage(self, debut, fin) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions [i0, i1[ des événements qui recoupent chaque fenêtre."""
+        i0 = np.searchsorted(self.fins, _temps(debut), side="left")
+        i1 = np.maximum(np.searchsorted(self.debuts, _temps(fin), side="right"), i0)
+        return i0, i1
+
+    def recoupant(self, debut, fin) -> pd.DataFrame:
+        """Événements qui recoupent la fenêtre [debut, fin]."""
+        i0, i1 = self.plage(debut, fin)
+        return self.evenements.iloc[i0[0]:i1[0]]
+
+    def agregats(self, fenetres) -> pd.DataFrame:
+        """Par fenêtre : nombre d'événements, durée totale, pic max, excédent (et énergie) cumulés."""
+        fen = fenetres_table(fenetres)
+        i0, i1 = self.plage(fen["debut"], fen["fin"])
+        n = i1 - i0
+        out = fen.copy()
+        out["nb_evenements"] = n
+        if len(self.evenements):
+            out["pic_max"] = self._index["pic"].extreme_pos("max", i0, i1)
+            out["duree_totale_h"] = self._index["duree_h"].somme_pos(i0, i1)
+            out["excedent_cumule"] = self._index["excedent_cumule"].somme_pos(i0, i1)
+            if "energie_Jm2" in self._index:
+                out["energie_Jm2"] = self._index["energie_Jm2"].somme_pos(i0, i1)
+        else:
+            out["pic_max"] = np.nan
+            out["duree_totale_h"] = out["excedent_cumule"] = 0.0
+        return out
+
+
+def agreger_catalogue(cat: pd.DataFrame, fenetres=PERIODES) -> pd.DataFrame:
+    """agregats de IndexEvenements pour chaque variable du catalogue : table longue variable x fenêtre."""
+    tables = []
+    for variable, ev in cat.groupby("variable", sort=False):
+        res = IndexEvenements(ev.dropna(axis=1, how="all")).agregats(fenetres)
+        res.insert(0, "variable", variable)
+        tables.append(res)
+    return pd.concat(tables, ignore_index=True)
+
+
+def main():
+    daily = meteo.resumer_journalier(meteo.charger_dossier(meteo.CHEMIN_DOSSIER, meteo.N_PROCESSUS, meteo.CACHE, meteo.COMPACT), meteo.MASQUER_JOURS_SOUS_COUVERTS)
+    maree = marnage.charger_donnees(marnage.DOSSIER, marnage.N_PROCESSUS, marnage.CACHE)
+    houle_horaire = houle.CACHE.lire(houle.CHEMIN_FICHIER, houle.lire_houle) if houle.CACHE is not None else houle.lire_houle(houle.CHEMIN_FICHIER)
+
+    cat = catalogue(series_sources(daily, maree, houle_horaire), DETECTION)
+    fichiers = sorties.exporter({"evenements": cat, "par_periode": agreger_catalogue(cat, PERIODES)}, SORTIE)
+    print(f"Fichiers exportés : {', '.join(str(f) for f in fichiers)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+import pytest
+
+# modules du dépôt à plat, à la racine
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import donnees_synthetiques  # noqa: E402
+
+# Années générées pour les tests : assez pour plusieurs périodes, lecture rapide
+ANNEES = 3
+
+
+@pytest.fixture(scope="session")
+def donnees(tmp_path_factory) -> dict:
+    """Sources synthétiques (maree, meteo, houle) de donnees_synthetiques, générées une fois."""
+    return donnees_synthetiques.generer_tout(tmp_path_factory.mktemp("synthetiques"), ANNEES)
+
+
+@pytest.fixture(scope="session")
+def periodes() -> list:
+    """Fenêtres de test : année, saison, mois, bornes hors des données, période vide."""
+    a = donnees_synthetiques.ANNEE_FIN
+    return [
+        (f"{a - 2}-01-01", f"{a}-12-31"),
+        (f"{a - 1}-01-01", f"{a - 1}-12-31"),
+        (f"{a - 1}-10-01", f"{a}-03-31"),
+        (f"{a}-02-01", f"{a}-02-28"),
+        (f"{a}-06-15", f"{a}-06-17"),
+        (f"{a - 5}-01-01", f"{a - 2}-01-10"),
+        (f"{a + 1}-01-01", f"{a + 1}-12-31"),
+    ]
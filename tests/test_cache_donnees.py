@@ -0,0 +1,56 @@
+import os
+import pandas as pd
+import pytest
+import marnage
+from cache_donnees import CacheColonnaire
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def lectures(monkeypatch) -> list:
+    """Fichiers réellement parsés par marnage.lire_fichier (lecture hors cache)."""
+    lus = []
+    lire_blocs = marnage._lire_blocs
+    monkeypatch.setattr(marnage, "_lire_blocs", lambda f, taille_bloc: lus.append(f.name) or lire_blocs(f, taille_bloc))
+    return lus
+
+
+@pytest.mark.parametrize("empreinte", ["mtime", "contenu"])
+def test_entree_relue_puis_invalidee(donnees, tmp_path, lectures, empreinte):
+    f = tmp_path / donnees["maree"][0].name
+    f.write_bytes(donnees["maree"][0].read_bytes())
+    cache = CacheColonnaire(tmp_path / "cache", empreinte=empreinte)
+
+    ref = cache.lire(f, marnage.lire_fichier)
+    pd.testing.assert_frame_equal(cache.lire(f, marnage.lire_fichier), ref)
+    assert lectures == [f.name]
+
+    # fichier modifié (contenu et date) : l'entrée périmée est remplacée
+    with open(f, "ab") as file:
+        file.write(b"#commentaire ajout\xe9\n")
+    st = f.stat()
+    os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    pd.testing.assert_frame_equal(cache.lire(f, marnage.lire_fichier), ref)
+    assert lectures == [f.name] * 2
+    assert len(list((tmp_path / "cache").glob("*.parquet"))) == 1
+
+
+def test_configuration_du_lecteur_dans_la_cle(donnees, tmp_path, lectures, monkeypatch):
+    f = donnees["maree"][0]
+    cache = CacheColonnaire(tmp_path / "cache")
+    cache.lire(f, marnage.lire_fichier)
+
+    monkeypatch.setattr(marnage, "PRIORITE_SOURCES", [4])
+    lu = cache.lire(f, marnage.lire_fichier)
+    assert len(lectures) == 2
+    pd.testing.assert_frame_equal(lu, marnage.lire_fichier(f))
+    assert set(lu["Source"]) == {4}
+
+
+def test_lecture_identique_sans_cache(donnees, tmp_path):
+    dossier = donnees["maree"][0].parent
+    cache = CacheColonnaire(tmp_path / "cache")
+    ref = marnage.charger_donnees(dossier)
+    for _ in range(2):
+        pd.testing.assert_frame_equal(marnage.charger_donnees(dossier, cache=cache), ref)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+import code_indicateurs_meteo as meteo
+import codeetatdemer as houle
+import marnage
+from conditions_anterieures import conditions_anterieures, indexer_sources
+
+FENETRES = [1, 3, 30, 400]
+
+
+@pytest.fixture(scope="module")
+def sources(donnees) -> dict:
+    return {
+        "daily_meteo": meteo.resumer_journalier(meteo.charger_dossier(donnees["meteo"][0].parent, 1, None)),
+        "maree": marnage.charger_donnees(donnees["maree"][0].parent),
+        "houle_horaire": houle.lire_houle(donnees["houle"]),
+    }
+
+
+def _evenements() -> list:
+    # désordre, doublon, heure dans la journée, avant et après les données
+    return ["2022-03-14 17:40", "2020-01-02", "2021-07-01", "2021-07-01 06:00", "2019-06-01", "2020-02-29", "2023-01-20", "2022-12-31"]
+
+
+def _brut(sources: dict, jour: pd.Timestamp, n: int) -> dict:
+    """Agrégats de la fenêtre [jour - n, jour[ par découpage de chaque table."""
+    debut, fin = jour - pd.Timedelta(days=n), jour - pd.Timedelta(1, "ns")
+    d = sources["daily_meteo"].loc[debut:fin]
+    rafale = meteo.vent_kmh(sources["daily_meteo"]["FXI"]).loc[debut:fin]
+    gel = d[["TN", "TX"]].dropna()
+    # hauteurs lues au mm (float32 en mémoire)
+    h = sources["houle_horaire"].set_index("time")["hs"].astype(float).round(3).loc[debut:fin]
+    m = sources["maree"].set_index("Date")["Valeur"].astype(float).round(3)
+    m = m.resample("D").agg(["max", "min"]).loc[debut:fin]
+    return {
+        f"pluie_cumul_mm_{n}j": d["RR1"].sum() if d["RR1"].notna().any() else np.nan,
+        f"jours_gel_degel_{n}j": float(((gel["TN"] < 0) & (gel["TX"] > 1)).sum()) if len(gel) else np.nan,
+        f"rafale_max_kmh_{n}j": rafale.max(),
+        f"hs_max_m_{n}j": h.max(),
+        f"marnage_max_m_{n}j": (m["max"] - m["min"]).max(),
+    }
+
+
+def test_conditions_comme_decoupage(sources):
+    res = conditions_anterieures(_evenements(), FENETRES, **sources)
+    assert len(res) == len(_evenements())
+    for i, evenement in enumerate(_evenements()):
+        jour = pd.Timestamp(evenement).normalize()
+        assert res.loc[i, "date_evenement"] == jour
+        for n in FENETRES:
+            for col, attendu in _brut(sources, jour, n).items():
+                assert np.isclose(res.loc[i, col], attendu, rtol=1e-9, equal_nan=True), (evenement, col)
+
+
+def test_index_fournis_ou_sources_partielles(sources):
+    index = indexer_sources(**sources)
+    pd.testing.assert_frame_equal(
+        conditions_anterieures(_evenements(), FENETRES, index=index),
+        conditions_anterieures(_evenements(), FENETRES, **sources),
+    )
+    seule = conditions_anterieures(_evenements(), FENETRES, houle_horaire=sources["houle_horaire"])
+    assert list(seule.columns) == ["date_evenement"] + [f"hs_max_m_{n}j" for n in FENETRES]
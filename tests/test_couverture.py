@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import code_indicateurs_meteo as meteo
+from couverture import IndexCouverture, MIN_HEURES_JOUR
+
+
+def _serie_trouee(graine: int = 0) -> pd.Series:
+    """Série horaire de 90 jours avec lacunes de longueurs variées, NaN isolés et heures répétées."""
+    rng = np.random.default_rng(graine)
+    t = pd.date_range("2021-01-01", "2021-03-31 23:00", freq="h")
+    garde = np.ones(len(t), dtype=bool)
+    for debut in rng.integers(0, len(t), 40):
+        garde[debut:debut + rng.integers(1, 30)] = False
+    v = rng.normal(10, 3, len(t))
+    v[rng.random(len(t)) < 0.05] = np.nan
+    s = pd.Series(v[garde], index=t[garde])
+    return pd.concat([s, s.iloc[::50]]).sort_index(kind="stable")
+
+
+def _fenetres() -> list:
+    return [
+        ("2021-01-01", "2021-03-31 23:00"),
+        ("2021-01-10 05:00", "2021-01-12 17:00"),
+        ("2021-02-01", "2021-02-28 23:00"),
+        ("2020-12-20", "2021-01-03 12:00"),
+        ("2021-03-30", "2021-04-10"),
+        ("2021-06-01", "2021-06-30"),
+        ("2021-02-14 03:00", "2021-02-14 03:00"),
+    ]
+
+
+def _brut(serie: pd.Series, debut: str, fin: str) -> tuple:
+    """Complétude, nombre de lacunes et plus longue lacune, heure par heure."""
+    presentes = set(serie.dropna().index)
+    grille = pd.date_range(debut, fin, freq="h")
+    present = np.array([h in presentes for h in grille])
+    nb, courant, plus_longue = 0, 0, 0
+    for p in present:
+        if p:
+            courant = 0
+        else:
+            nb += courant == 0
+            courant += 1
+            plus_longue = max(plus_longue, courant)
+    return present.mean(), nb, plus_longue
+
+
+def test_completude_et_lacunes_comme_decompte():
+    serie = _serie_trouee()
+    cv = IndexCouverture(serie)
+    fen = _fenetres()
+    d = [a for a, _ in fen]
+    f = [b for _, b in fen]
+    completude = cv.completude(d, f)
+    nb, plus_longue = cv.lacunes_fenetre(d, f)
+    for i, (a, b) in enumerate(fen):
+        c, n, p = _brut(serie, a, b)
+        assert np.isclose(completude[i], c)
+        assert nb[i] == n and plus_longue[i] == p
+
+
+def test_jours_sous_couverts_comme_decompte():
+    serie = _serie_trouee(1)
+    cv = IndexCouverture(serie)
+    heures = serie.dropna().index.unique().floor("D").value_counts()
+    for a, b in _fenetres():
+        jours = pd.date_range(pd.Timestamp(a).floor("D"), pd.Timestamp(b).floor("D"), freq="D")
+        attendu = sum(heures.get(j, 0) < MIN_HEURES_JOUR for j in jours)
+        assert cv.jours_sous_couverts(a, b) == attendu
+
+
+def test_resume_journalier_masque(donnees):
+    df = meteo.charger_dossier(donnees["meteo"][0].parent)
+    # journées tronquées : quelques heures seulement de pluie et de vent
+    tronque = df.index.normalize().isin(pd.to_datetime(["2021-03-05", "2021-07-14"])) & (df.index.hour >= 6)
+    df.loc[tronque, ["RR1", "FXI"]] = np.nan
+
+    brut = meteo.resumer_journalier(df)
+    masque = meteo.resumer_journalier(df, masquer=True)
+    for c in meteo.AGREGATION_JOURNALIERE:
+        if c not in df.columns:
+            continue
+        heures = df[c].dropna().groupby(level=0).size().groupby(lambda t: t.normalize()).size()
+        couvert = heures.reindex(brut.index, fill_value=0) >= MIN_HEURES_JOUR
+        pd.testing.assert_series_equal(masque[c], brut[c].where(couvert))
+    assert pd.isna(masque.loc["2021-03-05", "RR1"]) and pd.isna(masque.loc["2021-07-14", "FXI"])
+    assert masque.loc["2021-07-14", "AMPLI"] == brut.loc["2021-07-14", "AMPLI"]
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import extremes_maree as em
+
+PERIODE_H = 12.42  # marée semi-diurne M2
+
+
+def _maree(jours: int = 40, graine: int = 0) -> pd.Series:
+    """Hauteurs horaires au mm : M2 modulée (vives/mortes-eaux), bruit, une lacune de 30 h et une de 4 h."""
+    rng = np.random.default_rng(graine)
+    t = pd.date_range("2021-03-01", periods=jours * 24, freq="h")
+    x = np.arange(len(t), dtype=float)
+    h = 5 + (3 + np.cos(2 * np.pi * x / (14.77 * 24))) * np.cos(2 * np.pi * x / PERIODE_H) + rng.normal(0, 0.02, len(t))
+    garde = np.ones(len(t), dtype=bool)
+    garde[300:330] = False
+    garde[600:604] = False
+    return pd.Series(np.round(h, 3), index=t).iloc[np.flatnonzero(garde)]
+
+
+def _positions_reference(h: pd.Series):
+    """Détection pas à pas : extremum sur ± DEMI_FENETRE, voisins à moins de ECART_VOISIN, puis alternance."""
+    t, v = h.index, h.to_numpy()
+    candidats = []
+    for i in range(len(v)):
+        w = v[(t >= t[i] - em.DEMI_FENETRE) & (t <= t[i] + em.DEMI_FENETRE)]
+        pm, bm = v[i] == w.max(), v[i] == w.min()
+        if pm == bm or i == 0 or i == len(v) - 1:
+            continue
+        if t[i] - t[i - 1] > em.ECART_VOISIN or t[i + 1] - t[i] > em.ECART_VOISIN:
+            continue
+        candidats.append((i, 1 if pm else -1))
+    gardes = []
+    for k, (i, typ) in enumerate(candidats):
+        j, typ_prec = candidats[k - 1] if k else (None, None)
+        if k and typ == typ_prec and t[i] - t[j] <= em.ECART_MAX:
+            if v[i] * typ > v[gardes[-1][0]] * typ:
+                gardes[-1] = (i, typ)
+        else:
+            gardes.append((i, typ))
+    return gardes
+
+
+def test_extremes_comme_detection_pas_a_pas():
+    h = _maree()
+    ext = em.extremes(h)
+    ref = _positions_reference(h)
+    temps = h.index.to_numpy(dtype="datetime64[ns]")
+    t, v = em._affiner(temps, h.to_numpy(float), np.array([i for i, _ in ref]))
+    assert ext["type"].tolist() == [typ for _, typ in ref]
+    np.testing.assert_array_equal(ext["temps"].to_numpy(), t)
+    np.testing.assert_allclose(ext["hauteur"].to_numpy(), v)
+    # alternance PM/BM hors lacunes
+    assert (np.diff(ext["type"].to_numpy())[np.diff(ext["temps"].to_numpy()) <= em.ECART_MAX.to_timedelta64()] != 0).all()
+
+
+def test_extremes_proches_de_la_maree_continue():
+    """Sans bruit, les extrêmes affinés tombent près de ceux de la courbe continue."""
+    t = pd.date_range("2021-03-01", periods=20 * 24, freq="h")
+    x = np.arange(len(t), dtype=float)
+    ext = em.extremes(pd.Series(5 + 3 * np.cos(2 * np.pi * x / PERIODE_H), index=t))
+    heures = (ext["temps"] - t[0]) / pd.Timedelta(hours=1)
+    phase = heures / PERIODE_H * 2
+    assert np.abs(phase - np.round(phase)).max() * PERIODE_H / 2 < 1 / 6  # à 10 min près
+    np.testing.assert_allclose(ext["hauteur"], np.where(ext["type"] == 1, 8.0, 2.0), atol=0.02)
+
+
+def test_marnages_comme_boucle():
+    ext = em.extremes(_maree(graine=1))
+    attendu = {}
+    for k in range(len(ext) - 1):
+        a, b = ext.iloc[k], ext.iloc[k + 1]
+        if a["type"] == 1 and b["type"] == -1 and b["temps"] - a["temps"] <= em.ECART_MAX:
+            attendu[a["temps"]] = a["hauteur"] - b["hauteur"]
+    marees = em.marnages_marees(ext)
+    assert marees.to_dict() == attendu
+
+    jours = {}
+    for t, m in attendu.items():
+        jours[t.floor("D")] = max(jours.get(t.floor("D"), -np.inf), m)
+    assert em.marnage_journalier_marees(marees).to_dict() == jours
+    tables = em.tables_marees(_maree(graine=1))
+    pd.testing.assert_series_equal(tables["marees"], marees)
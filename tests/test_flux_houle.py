@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+import codeetatdemer as houle
+from flux_houle import AccumulateurHoule, indicateurs_periodes_flux
+
+
+@pytest.fixture(scope="module")
+def rejeu_repete(donnees, tmp_path_factory):
+    """
+    Rejeu synthétique fait d'extractions successives qui se recouvrent : les
+    dernières heures de chaque extraction reviennent, avec d'autres valeurs,
+    au début de la suivante.
+    """
+    df = pd.read_csv(donnees["houle"])
+    morceaux = []
+    for debut in range(0, len(df), 5_000):
+        recouvrement = df.iloc[max(debut - 48, 0):debut].assign(hs=lambda d: d["hs"] + 5.0)
+        morceaux += [recouvrement, df.iloc[debut:debut + 5_000]]
+    chemin = tmp_path_factory.mktemp("houle") / "rejeu_repete.csv"
+    pd.concat(morceaux).to_csv(chemin, index=False)
+    return chemin
+
+
+def test_flux_identique_en_memoire(rejeu_repete, periodes):
+    memoire = houle.indicateurs_periodes(houle.lire_houle(rejeu_repete), periodes)
+    flux = indicateurs_periodes_flux(rejeu_repete, periodes, taille_bloc=7_000)
+    pd.testing.assert_frame_equal(flux, memoire, check_dtype=False, rtol=1e-9)
+
+
+def test_fusion_accumulateurs_disjoints(donnees, periodes):
+    df = houle.lire_houle(donnees["houle"])
+    a, b = AccumulateurHoule(periodes), AccumulateurHoule(periodes)
+    a.ajouter(df.iloc[:len(df) // 2])
+    b.ajouter(df.iloc[len(df) // 2:])
+    seul = AccumulateurHoule(periodes)
+    seul.ajouter(df)
+    pd.testing.assert_frame_equal(a.fusionner(b).resultat(), seul.resultat(), check_dtype=False, rtol=1e-9)
+
+    c = AccumulateurHoule(periodes)
+    c.ajouter(df.iloc[:10])
+    with pytest.raises(ValueError):
+        seul.fusionner(c)
+
+
+def test_date_ancienne_hors_marge(donnees, periodes, tmp_path):
+    """Une heure qui revient au-delà de MARGE_DOUBLONS ne peut être vérifiée sans garder toutes les dates : erreur."""
+    df = pd.read_csv(donnees["houle"])
+    chemin = tmp_path / "rejeu_non_trie.csv"
+    pd.concat([df, df.head(100)]).to_csv(chemin, index=False)
+    with pytest.raises(ValueError, match="non trié"):
+        indicateurs_periodes_flux(chemin, periodes, taille_bloc=7_000)
+
+
+def test_float32_comme_float64(donnees, periodes):
+    """hs, t02, dp stockés en float32 : mêmes indicateurs qu'une lecture en float64 (hs_max = valeur lue, sans bruit)."""
+    df = houle.lire_houle(donnees["houle"])
+    assert df["hs"].dtype == np.float32
+    df64 = df.assign(**{c: pd.to_numeric(df[c].astype(str)) for c in ["hs", "t02", "dp"]})
+    pd.testing.assert_frame_equal(houle.indicateurs_periodes(df, periodes), houle.indicateurs_periodes(df64, periodes))
+    flux = indicateurs_periodes_flux(donnees["houle"], periodes, taille_bloc=7_000)
+    assert flux["hs_max"].dropna().tolist() == houle.indicateurs_periodes(df64, periodes)["hs_max"].dropna().tolist()
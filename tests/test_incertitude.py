@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+import code_indicateurs_meteo as meteo
+import incertitude
+
+
+@pytest.fixture(scope="module")
+def daily(donnees):
+    return meteo.resumer_journalier(meteo.charger_dossier(donnees["meteo"][0].parent, 1, None))
+
+
+def test_unite_du_vent_fixee_sur_la_periode(daily):
+    """Station en km/h dont un seul jour dépasse 70 : aucune réplique ne doit repasser en m/s."""
+    a, b = "2021-01-01", "2021-12-31"
+    d = daily.copy()
+    jours = d.index[(d.index >= a) & (d.index <= b)]
+    rng = np.random.default_rng(1)
+    d.loc[jours, "FXI"] = rng.uniform(20, 65, len(jours))
+    d.loc[jours[100], "FXI"] = 75.0
+    d.loc[jours, "RR1"] = 6.0
+    res = incertitude.bootstrap_meteo(d, [(a, b)], n_repliques=200, graine=0).set_index("indicateur")
+    for nom in ["jours_tempete_80", "tempete_apres_pluie", "nb_tempetes_consecutives"]:
+        assert res.loc[nom, "valeur"] == 0
+        assert res.loc[nom, "ic_haut"] == 0
+    assert res.loc["rafale_max_kmh", "ic_haut"] <= res.loc["rafale_max_kmh", "valeur"]
+    assert res.loc["energie_vent_cumulee", "ic_haut"] < 2 * res.loc["energie_vent_cumulee", "valeur"]
+
+
+def test_bootstrap_identite_maree_houle(donnees, periodes):
+    """Blocs de la longueur de la période : les agrégats journaliers tirés redonnent marnage.indicateurs / calcul_indicateurs."""
+    import codeetatdemer as houle
+    import marnage
+    res = pd.concat([
+        incertitude.bootstrap_maree(marnage.charger_donnees(donnees["maree"][0].parent, 1, None), periodes, 3, 100_000),
+        incertitude.bootstrap_houle(houle.lire_houle(donnees["houle"]), periodes, 3, 100_000),
+    ])
+    # période sans mesure : aucune réplique, intervalles NaN
+    vides = res.loc[(res["indicateur"] == "nb_points") & (res["valeur"] == 0), "periode_debut"]
+    res = res[~res["periode_debut"].isin(vides)]
+    valeur = res["valeur"].to_numpy(dtype=float)
+    for c in ["ic_bas", "ic_haut"]:
+        assert np.allclose(res[c].to_numpy(dtype=float), valeur, rtol=1e-9, equal_nan=True), c
@@ -0,0 +1,83 @@
+from pathlib import Path
+import pandas as pd
+import code_indicateurs_meteo as meteo
+import codeetatdemer as houle
+import marnage
+from incremental import EtatIncremental
+
+
+def _indicateurs_complets(dossier, periodes):
+    daily = meteo.resumer_journalier(meteo.charger_dossier(dossier, 1, None))
+    return pd.DataFrame([meteo.indicateurs_periode(daily, a, b) for a, b in periodes])
+
+
+def test_meteo_extractions_qui_se_recouvrent(donnees, periodes, tmp_path):
+    dossier = tmp_path / "meteo"
+    dossier.mkdir()
+    complet = pd.read_csv(donnees["meteo"][0], sep=";", dtype=str)
+    # deux extractions qui se recouvrent sur plusieurs mois, puis une troisième
+    complet.iloc[:20_000].to_csv(dossier / "H_76_a.csv", sep=";", index=False)
+    complet.iloc[12_000:].to_csv(dossier / "H_76_b.csv", sep=";", index=False)
+
+    etat = EtatIncremental(tmp_path / "etat")
+    res = etat.mettre_a_jour_meteo(dossier, periodes)
+    pd.testing.assert_frame_equal(res, _indicateurs_complets(dossier, periodes), check_dtype=False)
+
+    complet.iloc[5_000:15_000].to_csv(dossier / "H_76_c.csv", sep=";", index=False)
+    res = EtatIncremental(tmp_path / "etat").mettre_a_jour_meteo(dossier, periodes)
+    pd.testing.assert_frame_equal(res, _indicateurs_complets(dossier, periodes), check_dtype=False)
+
+
+def test_maree_et_houle_comme_calcul_complet(donnees, periodes, tmp_path):
+    etat = EtatIncremental(tmp_path / "etat")
+    dossier_maree = donnees["maree"][0].parent
+    res = etat.mettre_a_jour_maree(dossier_maree, periodes)
+    df = marnage.charger_donnees(dossier_maree, 1, None)
+    index = marnage.indexer_maree(df)
+    ref = pd.DataFrame([marnage.indicateurs(df, a, b, index) for a, b in periodes])
+    pd.testing.assert_frame_equal(res, ref, check_dtype=False)
+
+    res = etat.mettre_a_jour_houle([donnees["houle"]], periodes)
+    ref = houle.indicateurs_periodes(houle.lire_houle(donnees["houle"]), periodes)
+    pd.testing.assert_frame_equal(res, ref, check_dtype=False)
+
+
+def test_meteo_seuls_jours_touches_refusionnes(donnees, periodes, tmp_path, monkeypatch):
+    dossier = tmp_path / "meteo"
+    dossier.mkdir()
+    complet = pd.read_csv(donnees["meteo"][0], sep=";", dtype=str)
+    complet.iloc[:10_000].to_csv(dossier / "H_76_a.csv", sep=";", index=False)
+    complet.iloc[10_000:].to_csv(dossier / "H_76_b.csv", sep=";", index=False)
+    etat = EtatIncremental(tmp_path / "etat")
+    etat.mettre_a_jour_meteo(dossier, periodes)
+
+    lus = []
+    read_parquet = pd.read_parquet
+    monkeypatch.setattr(pd, "read_parquet", lambda f, *a, **k: lus.append(Path(f).name) or read_parquet(f, *a, **k))
+    # extraction qui recoupe b seul, puis a raccourci (fin de a et début de b à réagréger)
+    complet.iloc[15_000:16_000].to_csv(dossier / "H_76_c.csv", sep=";", index=False)
+    etat.mettre_a_jour_meteo(dossier, periodes)
+    partiels = {Path(c).name: e["partiel"] for c, e in etat.etat["meteo"].items()}
+    assert partiels["H_76_a.csv"] not in lus and partiels["H_76_b.csv"] in lus
+
+    complet.iloc[:9_000].to_csv(dossier / "H_76_a.csv", sep=";", index=False)
+    (dossier / "H_76_c.csv").unlink()
+    res = EtatIncremental(tmp_path / "etat").mettre_a_jour_meteo(dossier, periodes)
+    monkeypatch.undo()
+    daily = meteo.resumer_journalier(meteo.charger_dossier(dossier, 1, None))
+    pd.testing.assert_frame_equal(etat.journalier_meteo(), daily, check_freq=False)
+    pd.testing.assert_frame_equal(res, _indicateurs_complets(dossier, periodes), check_dtype=False)
+
+
+def test_lignes_emises_liees_aux_seuils(donnees, periodes, tmp_path, monkeypatch, capsys):
+    dossier = donnees["meteo"][0].parent
+    etat = EtatIncremental(tmp_path / "etat")
+    etat.mettre_a_jour_meteo(dossier, periodes)
+    etat.mettre_a_jour_meteo(dossier, periodes)
+    assert f"meteo : 0/{len(periodes)} périodes recalculées" in capsys.readouterr().out
+
+    # seuil modifié sans qu'aucun fichier ne change : aucune ligne reprise
+    monkeypatch.setattr(meteo, "PLUIE_JOUR_MM", 5.0)
+    res = EtatIncremental(tmp_path / "etat").mettre_a_jour_meteo(dossier, periodes)
+    assert f"meteo : {len(periodes)}/{len(periodes)} périodes recalculées" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(res, _indicateurs_complets(dossier, periodes), check_dtype=False)
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+import code_indicateurs_meteo as meteo
+import balayage
+import incertitude
+
+
+@pytest.fixture(scope="module")
+def daily(donnees):
+    return meteo.resumer_journalier(meteo.charger_dossier(donnees["meteo"][0].parent, 1, None))
+
+
+def _variantes(daily: pd.DataFrame) -> dict:
+    rng = np.random.default_rng(4)
+    r = rng.random(len(daily))
+    return {
+        "synthetique": daily,
+        # cumuls de pluie sur 3 jours égaux à 10 mm au dernier bit près, rafales > 80 km/h
+        "egalites": daily.assign(RR1=rng.choice([2.1, 4.2, 3.7, 0.0], len(daily)), FXI=np.where(r < 0.6, 25.0, 2.0)),
+        "manquants": daily.drop(columns=["TN"]).assign(PMER=daily["PMER"].where(r > 0.3), U=daily["U"].where(r < 0.7)),
+    }
+
+
+def _fenetres(periodes: list) -> list:
+    rng = np.random.default_rng(0)
+    jours = pd.date_range("2019-12-01", "2023-01-31", freq="D")
+    fen = list(periodes)
+    for _ in range(60):
+        a = int(rng.integers(0, len(jours)))
+        b = min(a + int(rng.integers(0, 120)), len(jours) - 1)
+        fen.append((str(jours[a].date()), str(jours[b].date())))
+    return fen
+
+
+def _egaux(x, y) -> bool:
+    """Comptes au nombre près ; sommes, moyennes et écarts-types (cumuls préfixes d'origines différentes) au dernier bit près."""
+    if isinstance(x, (int, np.integer)):
+        return x == y
+    return bool(np.isclose(x, y, rtol=1e-9, atol=1e-9, equal_nan=True))
+
+
+def test_balayage_egal_indicateurs_periode(daily, periodes):
+    """balayer_meteo (fenêtres groupées) et indicateurs_periode (une période) : mêmes valeurs."""
+    fen = _fenetres(periodes)
+    for nom, d in _variantes(daily).items():
+        res = balayage.balayer_meteo(d, fen)
+        for (a, b), (_, ligne) in zip(fen, res.iterrows()):
+            attendu = meteo.indicateurs_periode(d, a, b)
+            for k in meteo.INDICATEURS_PERIODE:
+                assert _egaux(attendu[k], ligne[k]), (nom, a, b, k, attendu[k], ligne[k])
+
+
+def test_bootstrap_identite_egal_valeur(daily, periodes):
+    """Blocs de la longueur de la période : chaque réplique est la période elle-même, ic = valeur."""
+    for nom, d in _variantes(daily).items():
+        res = incertitude.bootstrap_meteo(d, periodes, n_repliques=3, longueur_bloc=100_000)
+        # période sans jour : aucune réplique, intervalles NaN
+        vides = res.loc[(res["indicateur"] == "nb_jours") & (res["valeur"] == 0), "periode_debut"]
+        for _, ligne in res[~res["periode_debut"].isin(vides)].iterrows():
+            for c in ["ic_bas", "ic_haut"]:
+                assert _egaux(float(ligne["valeur"]), ligne[c]), (nom, ligne["periode_debut"], ligne["indicateur"], c)
+
+
+def test_compact_egal_complet(donnees, periodes):
+    """Lecture compacte (float32) et complète : même table journalière, mêmes indicateurs (seuils à 0.1 mm près compris)."""
+    dossier = donnees["meteo"][0].parent
+    complet = meteo.resumer_journalier(meteo.charger_dossier(dossier, 1, None))
+    compact = meteo.resumer_journalier(meteo.charger_dossier(dossier, 1, None, compact=True))
+    pd.testing.assert_frame_equal(compact, complet[compact.columns])
+    pd.testing.assert_frame_equal(
+        meteo.calculer_indicateurs(dossier, periodes, 1, None, compact=True),
+        meteo.calculer_indicateurs(dossier, periodes, 1, None, compact=False),
+    )
+
+
+def _to_float_series_reference(s: pd.Series) -> pd.Series:
+    """Conversion d'origine : expressions régulières appliquées à toutes les valeurs."""
+    s = s.astype(str).str.replace(",", ".", regex=False)
+    s = s.str.replace(r"(?<=\d)\s+(?=\d)", ".", regex=True)
+    s = s.str.replace(r"(?<=-)\s+(?=\d)", "", regex=True)
+    return pd.to_numeric(s.str.strip(), errors="coerce").astype(float)
+
+
+def test_conversion_rapide_comme_reference():
+    rng = np.random.default_rng(5)
+    saisies = ["5 5", "- 1", "-0 7", "1029 1", " 12,5 ", "3,0", "-2", "1e3", "", "nan", "mq", "- ", "1 000", "0,1", "10\t2", "7.", ".5"]
+    valeurs = [f"{v:.1f}".replace(".", ",") for v in rng.normal(5, 10, 2000)]
+    s = pd.Series(rng.permutation(np.array(valeurs + saisies * 20, dtype=object)))
+    pd.testing.assert_series_equal(meteo._to_float_series(s), _to_float_series_reference(s))
+
+    df = pd.DataFrame({"RR1": s, "T": s[::-1].to_numpy(), "FF": rng.normal(3, 1, len(s)), "NOM": "X"})
+    attendu = df.assign(RR1=_to_float_series_reference(df["RR1"]), T=_to_float_series_reference(df["T"]))
+    meteo._to_float_frame(df, ["RR1", "T", "FF", "absente"])
+    pd.testing.assert_frame_equal(df, attendu)
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import code_indicateurs_meteo as meteo
+import marnage
+import stations
+import donnees_synthetiques
+from ingestion import dedoublonner, fusion_dedoublonnee, lire_fichiers
+
+
+def _meteo_deux_postes(chemin, debut, fin, decalage=0.0):
+    t = pd.date_range(debut, fin, freq="h")
+    lignes = []
+    for poste, base in (("76217002", 0.0), ("76116001", 100.0)):
+        lignes.append(pd.DataFrame({
+            "NUM_POSTE": poste,
+            "NOM_USUEL": "P" + poste,
+            "DATE": t.strftime("%Y%m%d%H"),
+            "RR1": "0,5",
+            "T": [f"{base + decalage + k % 24:.1f}".replace(".", ",") for k in range(len(t))],
+            **{col: "1,0" for col in meteo.AGREGATION_JOURNALIERE if col not in ("RR1", "T")},
+        }))
+    # fichier départemental : postes mêlés, triés par date
+    df = pd.concat(lignes).sort_values("DATE", kind="stable")
+    df.to_csv(chemin, sep=";", index=False)
+    return len(df)
+
+
+def test_dedoublonner_priorite_et_premiere_ligne():
+    t = pd.to_datetime(["2020-01-01 00:00", "2020-01-01 00:00", "2020-01-01 01:00", "2020-01-01 01:00", "2020-01-01 02:00"])
+    df = pd.DataFrame({"Date": t, "Valeur": [1.0, 2.0, 3.0, 4.0, 5.0], "Source": [5, 4, 4, 5, 5]})
+    assert dedoublonner(df, "Date", ("Source", [4, 5]))["Valeur"].tolist() == [2.0, 3.0, 5.0]
+    assert dedoublonner(df, "Date")["Valeur"].tolist() == [1.0, 3.0, 5.0]
+
+
+def test_deux_postes_dans_un_fichier(tmp_path):
+    dossier = tmp_path / "departement"
+    dossier.mkdir()
+    n = _meteo_deux_postes(dossier / "H_76_a.csv", "2020-01-01", "2020-01-10 23:00")
+    # extraction qui recouvre la fin de la première
+    _meteo_deux_postes(dossier / "H_76_b.csv", "2020-01-08", "2020-01-15 23:00", decalage=1000.0)
+
+    df = meteo.charger_dossier(dossier, 1, None)
+    assert df.groupby(["NUM_POSTE", df.index]).size().max() == 1
+    assert len(df) == n + 2 * 5 * 24
+    assert df.index.is_monotonic_increasing
+    # chaque poste garde ses propres valeurs, le premier fichier l'emporte
+    for poste, base in ((76217002, 0.0), (76116001, 100.0)):
+        t = df.loc[df["NUM_POSTE"] == poste, "T"]
+        avant = t[t.index <= "2020-01-10 23:00"]
+        assert ((avant >= base) & (avant < base + 24)).all()
+        assert (t[t.index > "2020-01-10 23:00"] >= base + 1000).all()
+
+    par_station = stations.charger_stations([dossier], 1, None)
+    assert len(par_station) == len(df)
+    daily = stations.resumer_journalier_stations(par_station, "NUM_POSTE")
+    assert daily.index.get_level_values(0).nunique() == 2
+
+
+def test_fichiers_meteo_repetes(donnees, tmp_path):
+    dossier = tmp_path / "meteo"
+    dossier.mkdir()
+    f = donnees["meteo"][0]
+    for nom in ("a.csv", "b.csv"):
+        (dossier / nom).write_bytes(f.read_bytes())
+    double = meteo.charger_dossier(dossier, 1, None)
+    seul = meteo.lire_csv_meteo(f)
+    pd.testing.assert_frame_equal(double, seul)
+
+
+def test_maree_source_4_prioritaire(donnees, tmp_path):
+    f = donnees["maree"][0]
+    ref = marnage.lire_fichier(f)
+    brut = ref.head(200).copy()
+    brut["Valeur"] = brut["Valeur"] + 100
+    brut["Source"] = np.int8(5)
+    df = fusion_dedoublonnee([brut, ref], "Date", ("Source", marnage.PRIORITE_SOURCES))
+    assert df["Date"].is_unique
+    fusion = df.set_index("Date")
+    ref_4 = ref[ref["Source"] == 4].set_index("Date")
+    pd.testing.assert_series_equal(fusion.loc[ref_4.index, "Valeur"], ref_4["Valeur"])
+
+
+def test_lecture_parallele_comme_sequentielle(tmp_path, capsys):
+    dossier = tmp_path / "meteo"
+    fichiers = donnees_synthetiques.generer_meteo(dossier, 3, graine=3, annees_par_fichier=1)
+    # fichier sans colonne DATE : signalé et ignoré, dans les deux modes
+    (dossier / "H_76_0000.csv").write_text("NUM_POSTE;RR1\n76217002;1,0\n")
+    tous = sorted(dossier.glob("*.csv"))
+
+    sequentiel = lire_fichiers(meteo.lire_csv_meteo, tous, 1)
+    parallele = lire_fichiers(meteo.lire_csv_meteo, tous, 2)
+    assert [f for f, _ in sequentiel] == [f for f, _ in parallele] == sorted(fichiers)
+    for (f, a), (_, b) in zip(sequentiel, parallele):
+        pd.testing.assert_frame_equal(a, b)
+        pd.testing.assert_frame_equal(a, meteo.lire_csv_meteo(f))
+    assert capsys.readouterr().out.count("Fichier ignoré (H_76_0000.csv)") == 2
+
+    pd.testing.assert_frame_equal(meteo.charger_dossier(dossier, None), meteo.charger_dossier(dossier, 1))
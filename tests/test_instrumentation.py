@@ -0,0 +1,54 @@
+import json
+import pytest
+import instrumentation
+import marnage
+from instrumentation import etape
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    """Instrumentation active vers un fichier JSON lines (processus de lecture compris), désactivée ensuite."""
+    f = tmp_path / "mesures.jsonl"
+    monkeypatch.setenv(instrumentation.VARIABLE_ENV, str(f))
+    instrumentation.activer(str(f))
+    yield f
+    instrumentation.desactiver()
+
+
+def _lire(f) -> list:
+    return [json.loads(ligne) for ligne in f.read_text(encoding="utf-8").splitlines()]
+
+
+def test_inactive_sans_mesure():
+    instrumentation.desactiver()
+    n = len(instrumentation.mesures())
+    with etape("lecture", source="test") as e:
+        e.lignes = 10
+    assert len(instrumentation.mesures()) == n
+
+
+def test_mesures_des_etapes(journal):
+    with etape("calcul", source="test", periodes=3) as e:
+        e.lignes = 1000
+    with pytest.raises(ValueError):
+        with etape("calcul", source="test"):
+            raise ValueError("donnée invalide")
+
+    ok, erreur = _lire(journal)
+    assert ok["etape"] == "calcul" and ok["source"] == "test" and ok["periodes"] == 3
+    assert ok["lignes"] == 1000 and ok["secondes"] >= 0 and "erreur" not in ok
+    assert ok["lignes_par_s"] is None or ok["lignes_par_s"] > 0
+    assert erreur["erreur"] == "ValueError: donnée invalide" and erreur["lignes"] is None
+    assert instrumentation.mesures().tail(2)["etape"].tolist() == ["calcul", "calcul"]
+
+
+def test_lectures_paralleles_journalisees(donnees, journal):
+    dossier = donnees["maree"][0].parent
+    df = marnage.charger_donnees(dossier, 2)
+    mesures = _lire(journal)
+    lectures = [m for m in mesures if m["etape"] == "lecture"]
+    # une mesure par fichier, émise par le processus de lecture qui l'a lu
+    assert {m["fichier"]: m["lignes"] for m in lectures} == {f.name: len(marnage.lire_fichier(f)) for f in donnees["maree"]}
+    fusion = [m for m in mesures if m["etape"] == "fusion"]
+    assert len(fusion) == 1 and fusion[0]["lignes"] == len(df) and fusion[0]["tables"] == len(donnees["maree"])
+    assert fusion[0]["pid"] not in {m["pid"] for m in lectures}
@@ -0,0 +1,75 @@
+import builtins
+from io import StringIO
+import numpy as np
+import pandas as pd
+import marnage
+
+
+def _lire_reference(f) -> pd.DataFrame:
+    """Lecture d'origine (fichier entier) : lignes ne commençant pas par '#' et contenant ';', sources 4 et 5."""
+    try:
+        with open(f, "r", encoding="utf-8-sig") as file:
+            lignes = [l.strip() for l in file if not l.startswith("#") and ";" in l]
+    except UnicodeDecodeError:
+        with open(f, "r", encoding="latin-1") as file:
+            lignes = [l.strip() for l in file if not l.startswith("#") and ";" in l]
+    df = pd.read_csv(StringIO("\n".join(lignes)), sep=";", names=["Date", "Valeur", "Source"], header=None, usecols=[0, 1, 2], dtype=str)
+    df = pd.DataFrame({
+        "Date": pd.to_datetime(df["Date"], format="%d/%m/%Y %H:%M:%S", errors="coerce"),
+        "Valeur": pd.to_numeric(df["Valeur"], errors="coerce"),
+        "Source": pd.to_numeric(df["Source"], errors="coerce"),
+    })
+    return df[df["Source"].isin([4, 5])].dropna(subset=["Date", "Valeur"]).reset_index(drop=True)
+
+
+def _comparer(f, taille_bloc):
+    lu = marnage.lire_fichier(f, taille_bloc).reset_index(drop=True)
+    ref = _lire_reference(f)
+    assert len(lu) == len(ref)
+    assert (lu["Date"].to_numpy() == ref["Date"].to_numpy()).all()
+    assert np.array_equal(lu["Valeur"].to_numpy(), ref["Valeur"].to_numpy(dtype="float32"))
+    assert (lu["Source"].to_numpy() == ref["Source"].to_numpy()).all()
+
+
+def test_fichiers_synthetiques(donnees):
+    for f in donnees["maree"]:
+        _comparer(f, 5_000)
+
+
+def test_diese_en_cours_de_ligne_et_latin1_tardif(tmp_path, monkeypatch):
+    t = pd.date_range("2020-01-01", periods=20_000, freq="h")
+    corps = [f"{d:%d/%m/%Y %H:%M:%S};{k % 700 / 100:.2f};4" for k, d in enumerate(t)]
+    corps[10] += " # contrôlé"          # '#' en cours de ligne : Source illisible, ligne écartée
+    corps[20] = corps[20].replace(";4", ";5;#note")
+    corps.insert(30, "  # commentaire indenté ; non écarté par '#'")
+    utf8 = tmp_path / "dieppe_2020.txt"
+    utf8.write_text("# entête\n" + "\n".join(corps) + "\n", encoding="utf-8")
+    # un seul octet non UTF-8, loin du début
+    latin1 = tmp_path / "dieppe_2021.txt"
+    latin1.write_text("# entête\n" + "\n".join(corps) + "\n# fin de série validée\n", encoding="latin-1")
+
+    ouvertures = []
+
+    def compter(f, *args, **kwargs):
+        ouvertures.append(f)
+        return builtins.open(f, *args, **kwargs)
+
+    monkeypatch.setattr(marnage, "open", compter, raising=False)
+    for f in (utf8, latin1):
+        _comparer(f, 1_000)
+    monkeypatch.undo()
+    # chaque fichier lu une seule fois, UTF-8 comme latin-1
+    assert ouvertures.count(utf8) == 1
+    assert ouvertures.count(latin1) == 1
+    assert len(marnage.lire_fichier(utf8)) == len(t) - 1
+
+
+def test_float32_comme_float64(donnees, periodes):
+    """Valeur stockée en float32 : mêmes indicateurs que les hauteurs lues en float64."""
+    f = donnees["maree"][0]
+    df = marnage.lire_fichier(f).reset_index(drop=True)
+    ref = _lire_reference(f)
+    df64 = df.assign(Valeur=ref["Valeur"].to_numpy())
+    index, index64 = marnage.indexer_maree(df), marnage.indexer_maree(df64)
+    for a, b in periodes:
+        assert marnage.indicateurs(df, a, b, index) == marnage.indicateurs(df64, a, b, index64)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+import codeetatdemer as houle
+import donnees_synthetiques
+import noeuds_houle
+
+LONGITUDES = {"101": 1.0, "102": 1.2, "103": 1.4}
+
+
+@pytest.fixture(scope="module")
+def rejeux(tmp_path_factory) -> dict:
+    """Trois rejeux de nœuds (longitudes LONGITUDES, latitude 50) ; celui du nœud 103 est illisible (sans hs)."""
+    dossier = tmp_path_factory.mktemp("noeuds")
+    fichiers = {}
+    for i, (noeud, lon) in enumerate(LONGITUDES.items()):
+        f = donnees_synthetiques.generer_houle(dossier / f"{noeud}_rc.csv", 2, graine=i)
+        df = pd.read_csv(f).assign(longitude=lon, latitude=50.0)
+        if noeud == "103":
+            df = df.drop(columns="hs")
+        df.to_csv(f, index=False)
+        fichiers[noeud] = f
+    return fichiers
+
+
+def _cellules(*positions) -> pd.DataFrame:
+    return pd.DataFrame([{"cellule": f"c{i}", "longitude": lon, "latitude": 50.0} for i, lon in enumerate(positions)])
+
+
+def _reference(f, periodes) -> pd.DataFrame:
+    return houle.indicateurs_periodes(houle.lire_houle(f), periodes).drop(columns="période")
+
+
+def test_cellule_du_noeud_le_plus_proche(rejeux, periodes):
+    par_cellule, _ = noeuds_houle.calculer_par_cellule(rejeux["101"].parent, _cellules(0.98, 1.19), periodes, k=1, n_processus=1)
+    for cellule, noeud in [("c0", "101"), ("c1", "102")]:
+        res = par_cellule[par_cellule["cellule"] == cellule].reset_index(drop=True)
+        assert (res["noeud"] == noeud).all() and (res["noeuds_manquants"] == 0).all()
+        ref = _reference(rejeux[noeud], periodes)
+        pd.testing.assert_frame_equal(res[ref.columns], ref, check_dtype=False)
+
+
+def test_moyenne_ponderee_par_distance(rejeux, periodes):
+    par_cellule, par_noeud = noeuds_houle.calculer_par_cellule(rejeux["101"].parent, _cellules(1.05), periodes, k=2, n_processus=1)
+    d = noeuds_houle.distances_km([1.05], [50.0], [1.0, 1.2], [50.0, 50.0])[0]
+    w = (1 / d) / (1 / d).sum()
+    a = _reference(rejeux["101"], periodes)["hs_moy"].to_numpy()
+    b = _reference(rejeux["102"], periodes)["hs_moy"].to_numpy()
+    attendu = np.where(np.isnan(a), b, np.where(np.isnan(b), a, w[0] * a + w[1] * b))
+    np.testing.assert_allclose(par_cellule["hs_moy"].to_numpy(float), attendu, rtol=1e-12)
+    assert (par_cellule["noeud"] == "101").all()
+
+
+def test_noeud_illisible_signale(rejeux, periodes):
+    cellules = _cellules(1.0, 1.41, 1.35)
+    par_cellule, par_noeud = noeuds_houle.calculer_par_cellule(rejeux["101"].parent, cellules, periodes, k=1, n_processus=1)
+    assert set(par_noeud["noeud"]) == {"101"}
+    # aucune cellule perdue : celles du nœud illisible sont gardées, signalées et vides
+    assert len(par_cellule) == len(cellules) * len(periodes)
+    illisible = par_cellule[par_cellule["noeud"] == "103"]
+    assert set(illisible["cellule"]) == {"c1", "c2"}
+    assert (illisible["noeuds_manquants"] == 1).all()
+    assert illisible[["nb_points", "hs_moy", "hs_max"]].isna().all().all()
+
+    # avec deux nœuds par cellule, le voisin lisible est seul retenu
+    par_cellule, _ = noeuds_houle.calculer_par_cellule(rejeux["101"].parent, cellules, periodes, k=2, n_processus=1)
+    c1 = par_cellule[par_cellule["cellule"] == "c1"].reset_index(drop=True)
+    assert (c1["noeuds_manquants"] == 1).all()
+    ref = _reference(rejeux["102"], periodes)
+    np.testing.assert_allclose(c1["hs_moy"].to_numpy(float), ref["hs_moy"].to_numpy(float), rtol=1e-12)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import codeetatdemer as houle
+from balayage import balayer_houle, indexer_houle
+from couverture import IndexCouverture
+from index_cumule import IndexCumule
+from periodes import fenetres_table
+
+# dates seules et dates-heures mêlées dans une même table de fenêtres
+FENETRES = [
+    ("2021-01-01", "2021-01-31"),
+    ("2021-03-01 05:00", "2021-03-02"),
+    ("2021-06-01", "2021-06-01 18:00"),
+    (pd.Timestamp("2021-09-01 12:00"), "2021-12-31"),
+]
+
+
+def test_fenetres_formats_mixtes():
+    fen = fenetres_table(FENETRES)
+    assert fen["debut"].tolist() == [pd.Timestamp(a) for a, _ in FENETRES]
+    assert fen["fin"].tolist() == [pd.Timestamp(b) for _, b in FENETRES]
+    par_colonnes = fenetres_table(pd.DataFrame(FENETRES, columns=["debut", "fin"]).astype(str))
+    assert par_colonnes["debut"].tolist() == fen["debut"].tolist()
+
+
+def test_bornes_formats_mixtes():
+    t = pd.date_range("2021-01-01", "2021-12-31 23:00", freq="h")
+    ix = IndexCumule(pd.Series(np.arange(len(t), dtype=float), index=t))
+    debuts = np.array([str(a) for a, _ in FENETRES], dtype=object)
+    fins = np.array([str(b) for _, b in FENETRES], dtype=object)
+    attendu = [ix.somme(pd.Timestamp(a), pd.Timestamp(b)) for a, b in FENETRES]
+    assert ix.somme(debuts, fins).tolist() == attendu
+    cv = IndexCouverture(pd.Series(1.0, index=t))
+    assert cv.heures_valides(debuts, fins).tolist() == [cv.heures_valides(pd.Timestamp(a), pd.Timestamp(b))[0] for a, b in FENETRES]
+
+
+def test_balayage_houle_formats_mixtes(donnees):
+    df = houle.lire_houle(donnees["houle"])
+    index = indexer_houle(df)
+    res = balayer_houle(df, FENETRES)
+    for (a, b), (_, ligne) in zip(FENETRES, res.iterrows()):
+        attendu = houle.calcul_indicateurs(df, str(a), str(b), index)
+        assert ligne["nb_points"] == attendu["nb_points"]
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+import code_indicateurs_meteo as meteo
+import codeetatdemer as houle
+from sensibilite_seuils import LONGUEUR_MIN_J, OPERATEURS, balayer_grilles, balayer_seuils, series_sources
+
+
+@pytest.fixture(scope="module")
+def daily(donnees):
+    return meteo.resumer_journalier(meteo.charger_dossier(donnees["meteo"][0].parent, 1, None))
+
+
+def _fenetres(periodes: list) -> list:
+    rng = np.random.default_rng(2)
+    jours = pd.date_range("2019-12-20", "2023-01-10", freq="D")
+    fen = list(periodes)
+    for _ in range(15):
+        a = int(rng.integers(0, len(jours)))
+        fen.append((str(jours[a].date()), str(jours[min(a + int(rng.integers(0, 90)), len(jours) - 1)].date())))
+    return fen
+
+
+def _brut(serie: pd.Series, debut: str, fin: str, seuil: float, sens: str, points_par_jour: int) -> dict:
+    """Dépassements et séquences d'une fenêtre, valeur par valeur."""
+    v = serie.sort_index().loc[pd.Timestamp(debut):pd.Timestamp(fin)].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        m = OPERATEURS[sens](v, seuil)
+    longueurs, courant = [], 0
+    for x in m:
+        if x:
+            courant += 1
+        elif courant:
+            longueurs.append(courant)
+            courant = 0
+    if courant:
+        longueurs.append(courant)
+    return {
+        "nb_valeurs": int((~np.isnan(v)).sum()),
+        "nb_depassements": int(m.sum()),
+        f"nb_sequences_{LONGUEUR_MIN_J}j": sum(l >= LONGUEUR_MIN_J * points_par_jour for l in longueurs),
+        "plus_longue_sequence_j": max(longueurs, default=0) / points_par_jour,
+    }
+
+
+@pytest.mark.parametrize("colonne, sens, seuils, points_par_jour", [
+    ("RR1", ">", np.arange(0.0, 6.01, 0.5), 1),
+    ("RR1", ">=", [0.1, 1.0, 2.5], 1),
+    ("PMER", "<", [995.0, 1005.0, 1015.0], 1),
+    ("TN", "<=", [-2.0, 0.0, 5.0], 1),
+    ("hs", ">", [1.0, 1.5, 2.5], 24),
+])
+def test_seuils_comme_decompte(daily, donnees, periodes, colonne, sens, seuils, points_par_jour):
+    serie = houle.lire_houle(donnees["houle"]).set_index("time")["hs"] if colonne == "hs" else daily[colonne]
+    fen = _fenetres(periodes)
+    res = balayer_seuils(serie, seuils, fen, sens, points_par_jour)
+    if colonne == "hs":
+        serie = serie.astype(float).round(3)  # hauteurs lues au mm (float32 en mémoire)
+    assert len(res) == len(fen) * len(seuils)
+    lignes = iter(res.to_dict("records"))
+    for a, b in fen:
+        for s in seuils:
+            ligne = next(lignes)
+            assert ligne["seuil"] == s
+            attendu = _brut(serie, a, b, s, sens, points_par_jour)
+            assert {k: ligne[k] for k in attendu} == attendu, (a, b, s)
+            assert ligne["jours_depassement"] == attendu["nb_depassements"] / points_par_jour
+
+
+def test_grilles_avec_seuils_actuels(daily, periodes):
+    res = balayer_grilles(series_sources(daily_meteo=daily), fenetres=periodes, sequences=False)
+    assert set(res["variable"]) == {"pluie_mm", "rafale_kmh", "pmer_hpa", "tx_c"}
+    pluie = res[res["variable"] == "pluie_mm"]
+    assert set(pluie.loc[pluie["seuil_actuel"], "seuil"]) == {meteo.PLUIE_JOUR_MM, meteo.FORTE_PLUIE_JOUR_MM}
+    # seuil actuel : même compte que l'indicateur de la période
+    for a, b in periodes:
+        ligne = pluie[(pluie["debut"] == pd.Timestamp(a)) & (pluie["seuil"] == meteo.FORTE_PLUIE_JOUR_MM)].iloc[0]
+        ind = meteo.indicateurs_periode(daily, a, b)
+        if ind["nb_jours"]:
+            assert ligne["nb_depassements"] == ind["jours_forte_pluie"]
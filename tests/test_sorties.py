@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+import code_indicateurs_meteo as meteo
+import sorties
+
+pytest.importorskip("openpyxl")
+
+
+def _table(n: int = 50, graine: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(graine)
+    return pd.DataFrame({
+        "periode": [f"p{i}" for i in range(n)],
+        "valeur": np.where(rng.random(n) < 0.2, np.nan, rng.normal(0, 1, n)),
+        "compte": rng.integers(0, 100, n),
+    })
+
+
+def test_table_seule(tmp_path):
+    df = _table()
+    ecrits = sorties.exporter(df, tmp_path / "sortie" / "indicateurs.xlsx", formats=["parquet", "csv"])
+    assert [f.name for f in ecrits] == ["indicateurs.parquet", "indicateurs.csv", "indicateurs.xlsx"]
+    pd.testing.assert_frame_equal(pd.read_parquet(ecrits[0]), df)
+    pd.testing.assert_frame_equal(pd.read_csv(ecrits[1]), df, check_dtype=False)
+    pd.testing.assert_frame_equal(pd.read_excel(ecrits[2], sheet_name="Sheet1"), df, check_dtype=False)
+
+
+def test_feuilles(tmp_path, monkeypatch):
+    feuilles = {"par_periode": _table(30, 1), "un nom de feuille trop long pour Excel": _table(5, 2)}
+    monkeypatch.setattr(sorties, "FORMATS", ["csv"])
+    ecrits = sorties.exporter(feuilles, tmp_path / "classeur.xlsx")
+    assert [f.name for f in ecrits] == [
+        "classeur.xlsx - par_periode.csv",
+        "classeur.xlsx - un nom de feuille trop long pour Excel.csv",
+        "classeur.xlsx",
+    ]
+    for (nom, df), f in zip(feuilles.items(), ecrits):
+        pd.testing.assert_frame_equal(pd.read_csv(f), df, check_dtype=False)
+    lu = pd.read_excel(ecrits[-1], sheet_name=None)
+    assert list(lu) == [nom[:31] for nom in feuilles]
+    for nom, df in feuilles.items():
+        pd.testing.assert_frame_equal(lu[nom[:31]], df, check_dtype=False)
+
+    assert sorties.exporter(feuilles, tmp_path / "sans_excel.xlsx", excel=False)[-1].suffix == ".csv"
+    assert not (tmp_path / "sans_excel.xlsx").exists()
+
+
+def test_meteo_ecrit_hors_du_dossier_des_csv(donnees, periodes, tmp_path, monkeypatch):
+    dossier = tmp_path / "meteo"
+    dossier.mkdir()
+    for f in donnees["meteo"]:
+        (dossier / f.name).write_bytes(f.read_bytes())
+    avant = sorted(p.name for p in dossier.iterdir())
+    monkeypatch.setattr(meteo, "CHEMIN_DOSSIER", str(dossier))
+    monkeypatch.setattr(meteo, "SORTIE", tmp_path / "sorties" / "indicateurs_meteo.xlsx")
+    monkeypatch.setattr(meteo, "PERIODES", periodes)
+
+    meteo.main()
+    premier = pd.read_csv(tmp_path / "sorties" / "indicateurs_meteo.csv")
+    # une seconde exécution ne relit pas la sortie comme une station
+    meteo.main()
+    assert sorted(p.name for p in dossier.iterdir()) == avant
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "sorties" / "indicateurs_meteo.csv"), premier)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import code_indicateurs_meteo as meteo
+import donnees_synthetiques
+import stations
+
+
+def _station_egalites(source, dossier, poste):
+    """
+    Copie d'une station (sous le NUM_POSTE `poste`) où les cumuls de pluie sur 3 jours tombent sur 10 mm
+    (pluie du jour 2,1 / 4,2 / 3,7 mm, à 0 h) et les rafales dépassent 80 km/h.
+    """
+    dossier.mkdir()
+    for f in source:
+        df = pd.read_csv(f, sep=";", dtype=str).assign(NUM_POSTE=poste)
+        jours, uniques = pd.factorize(df["DATE"].str.slice(0, 8))
+        rng = np.random.default_rng(7)
+        pluie = rng.choice(["2,1", "4,2", "3,7", "0"], len(uniques))[jours]
+        df["RR1"] = np.where(df["DATE"].str.slice(8, 10) == "00", pluie, "0")
+        df["FXI"] = np.where(rng.random(len(df)) < 0.6, "25,0", "2,0")
+        df.to_csv(dossier / f.name, sep=";", index=False)
+
+
+def test_stations_egal_indicateurs_periode(donnees, periodes, tmp_path):
+    """Indicateurs par station (balayage groupé) = indicateurs_periode sur la table journalière de chaque station."""
+    dossiers = [donnees["meteo"][0].parent, tmp_path / "autre", tmp_path / "egalites"]
+    postes = ["76217002", "76116001", "80001001"]
+    donnees_synthetiques.generer_meteo(dossiers[1], 2, graine=1, poste=postes[1])
+    _station_egalites(donnees["meteo"], dossiers[2], postes[2])
+
+    res = stations.calculer_indicateurs_stations(dossiers, periodes, 1, None)
+    res = res.set_index([stations.COLONNE_STATION, "periode_debut", "indicateur"])["valeur"]
+    for d, poste in zip(dossiers, postes):
+        daily = meteo.resumer_journalier(meteo.charger_dossier(d, 1, None))
+        for a, b in periodes:
+            attendu = meteo.indicateurs_periode(daily, a, b)
+            for nom in meteo.INDICATEURS_PERIODE:
+                x, y = float(attendu[nom]), res[(poste, a, nom)]
+                assert np.isclose(x, y, rtol=1e-9, atol=1e-9, equal_nan=True), (poste, a, nom, x, y)
+
+
+def test_station_par_poste_sinon_par_dossier(donnees, tmp_path):
+    """Un CSV à deux postes donne deux stations ; un CSV sans NUM_POSTE prend le nom de son dossier."""
+    deux_postes = tmp_path / "departement"
+    deux_postes.mkdir()
+    df = pd.read_csv(donnees["meteo"][0], sep=";", dtype=str)
+    autre = df.assign(NUM_POSTE="76116001")
+    pd.concat([df, autre]).to_csv(deux_postes / "H_76.csv", sep=";", index=False)
+    sans_poste = tmp_path / "sans_poste"
+    sans_poste.mkdir()
+    df.drop(columns=["NUM_POSTE"]).to_csv(sans_poste / "H_76.csv", sep=";", index=False)
+
+    par_station = stations.charger_stations([deux_postes, sans_poste], 1, None)
+    comptes = par_station[stations.COLONNE_STATION].value_counts()
+    assert comptes.to_dict() == {"76217002": len(df), "76116001": len(df), "sans_poste": len(df)}
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+import codeetatdemer as houle
+from balayage import RHO, G
+from tempetes import IndexEvenements, agreger_catalogue, catalogue, detecter
+
+
+@pytest.fixture(scope="module")
+def hs(donnees) -> pd.Series:
+    return houle.lire_houle(donnees["houle"]).set_index("time")["hs"]
+
+
+def _evenements_boucle(serie: pd.Series, seuil: float, separation: pd.Timedelta, pas: pd.Timedelta) -> list:
+    """Dépassements parcourus un à un : un événement se prolonge tant que l'écart au précédent est <= separation."""
+    evenements = []
+    for t, v in serie.dropna().sort_index().items():
+        if not v > seuil:
+            continue
+        ev = evenements[-1] if evenements else None
+        if ev is None or t - ev["fin"] > separation:
+            ev = {"debut": t, "fin": t, "temps_pic": t, "pic": v, "nb_depassements": 0, "excedent": 0.0, "hs2": 0.0}
+            evenements.append(ev)
+        ev["fin"] = t
+        if v > ev["pic"]:
+            ev["temps_pic"], ev["pic"] = t, v
+        ev["nb_depassements"] += 1
+        ev["excedent"] += v - seuil
+        ev["hs2"] += v * v
+    for ev in evenements:
+        ev["duree_h"] = (ev["fin"] - ev["debut"] + pas) / pd.Timedelta(hours=1)
+        ev["excedent_cumule"] = ev.pop("excedent") * (pas / pd.Timedelta(hours=1))
+    return evenements
+
+
+@pytest.mark.parametrize("seuil, separation", [(2.5, pd.Timedelta(hours=24)), (3.0, pd.Timedelta(hours=6)), (1.8, pd.Timedelta(0))])
+def test_detection_comme_boucle(hs, seuil, separation):
+    serie = hs.astype(float).round(3)  # hauteurs lues au mm (float32 en mémoire)
+    ev = detecter(hs, seuil, separation, pd.Timedelta(hours=1))
+    attendu = _evenements_boucle(serie, seuil, separation, pd.Timedelta(hours=1))
+    assert len(ev) == len(attendu) > 0
+    for ligne, a in zip(ev.to_dict("records"), attendu):
+        for col in ["debut", "fin", "temps_pic", "pic", "nb_depassements", "duree_h"]:
+            assert ligne[col] == a[col], col
+        assert np.isclose(ligne["excedent_cumule"], a["excedent_cumule"], rtol=1e-9)
+
+
+def test_detection_serie_desordonnee_et_vide(hs):
+    serie = hs.iloc[:2000]
+    pd.testing.assert_frame_equal(
+        detecter(serie.sample(frac=1, random_state=0), 2.0, pd.Timedelta(hours=12), pd.Timedelta(hours=1)),
+        detecter(serie, 2.0, pd.Timedelta(hours=12), pd.Timedelta(hours=1)),
+    )
+    assert detecter(serie, 100.0, pd.Timedelta(hours=12), pd.Timedelta(hours=1)).empty
+
+
+def test_agregats_comme_filtrage(hs, periodes):
+    detection = {"houle": ("houle", "hs", 2.5, pd.Timedelta(hours=24), pd.Timedelta(hours=1))}
+    cat = catalogue({"houle": hs.to_frame()}, detection)
+    attendu = _evenements_boucle(hs.astype(float).round(3), 2.5, pd.Timedelta(hours=24), pd.Timedelta(hours=1))
+    np.testing.assert_allclose(cat["energie_Jm2"], [RHO * G * a["hs2"] / 8 for a in attendu], rtol=1e-9)
+
+    rng = np.random.default_rng(1)
+    fen = list(periodes) + [(str(t), str(t + pd.Timedelta(hours=int(h)))) for t, h in
+                            zip(rng.choice(hs.index, 20), rng.integers(0, 200, 20))]
+    index = IndexEvenements(cat.drop(columns=["variable", "seuil"]))
+    res = agreger_catalogue(cat, fen)
+    for ligne, (a, b) in zip(res.to_dict("records"), fen):
+        sel = cat[(cat["fin"] >= pd.Timestamp(a)) & (cat["debut"] <= pd.Timestamp(b))]
+        assert ligne["nb_evenements"] == len(sel)
+        assert len(index.recoupant(a, b)) == len(sel)
+        assert np.isclose(ligne["pic_max"], sel["pic"].max() if len(sel) else np.nan, equal_nan=True)
+        assert np.isclose(ligne["duree_totale_h"], sel["duree_h"].sum())
+        assert np.isclose(ligne["excedent_cumule"], sel["excedent_cumule"].sum())
+        assert np.isclose(ligne["energie_Jm2"], sel["energie_Jm2"].sum())